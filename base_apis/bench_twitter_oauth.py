@@ -0,0 +1,102 @@
+"""
+Microbenchmark for OAuth1Signer.
+
+Checks that the cached signer produces headers byte-identical to the original
+per-request implementation (kept below as ``legacy_oauth_header``) and reports
+signatures/sec for both.
+
+    python bench_twitter_oauth.py [--iterations 20000]
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import secrets
+import string
+import time
+import urllib.parse
+from typing import Optional, Dict
+
+from twitter_oauth import OAuth1Signer
+
+CONSUMER_KEY = 'xvz1evFS4wEEPTGEFPHBog'
+CONSUMER_SECRET = 'kAcSOqF21Fu85e7zjz7ZN2U4ZRhfV3WpwPAoE3Z7kBw'
+TOKEN = '370773112-GmHxMAgYyLbNEtIKZeRNFsMKPR9EyMZeS9weJAEb'
+TOKEN_SECRET = 'LswwdoUaIvS8ltyTt5jkRh4J50vUPVVHtR2YPi5kE'
+
+SAMPLE_REQUESTS = [
+    ('POST', 'https://api.x.com/2/tweets', None),
+    ('GET', 'https://api.x.com/2/tweets/search/recent',
+     {'query': 'python programming -is:retweet', 'max_results': '100', 'tweet.fields': 'created_at,author_id'}),
+    ('POST', 'https://upload.twitter.com/1.1/media/upload.json',
+     {'command': 'APPEND', 'media_id': '1455952740635586573', 'segment_index': '7'}),
+    ('GET', 'https://api.x.com/2/users/by', {'usernames': 'github,python,ünïcode~user'}),
+]
+
+
+def _percent_encode(text: str) -> str:
+    return urllib.parse.quote(str(text), safe='')
+
+
+def legacy_oauth_header(method: str, url: str, params: Optional[Dict[str, str]] = None,
+                        timestamp: Optional[str] = None, nonce: Optional[str] = None) -> str:
+    """The signing stack TwitterAPI used before OAuth1Signer, verbatim apart from overrides"""
+    if params is None:
+        params = {}
+    oauth_params = {
+        'oauth_consumer_key': CONSUMER_KEY,
+        'oauth_token': TOKEN,
+        'oauth_signature_method': 'HMAC-SHA1',
+        'oauth_timestamp': timestamp or str(int(time.time())),
+        'oauth_nonce': nonce or ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(32)),
+        'oauth_version': '1.0'
+    }
+    all_params = {**oauth_params, **params}
+    sorted_params = sorted(all_params.items())
+    param_string = '&'.join([f"{_percent_encode(k)}={_percent_encode(v)}" for k, v in sorted_params])
+    base_string = f"{method.upper()}&{_percent_encode(url)}&{_percent_encode(param_string)}"
+    signing_key = f"{_percent_encode(CONSUMER_SECRET)}&{_percent_encode(TOKEN_SECRET)}"
+    signature = base64.b64encode(hmac.new(signing_key.encode('utf-8'), base_string.encode('utf-8'),
+                                          hashlib.sha1).digest()).decode('utf-8')
+    oauth_params['oauth_signature'] = signature
+    return "OAuth " + ','.join(f'{_percent_encode(k)}="{_percent_encode(v)}"' for k, v in oauth_params.items())
+
+
+def check_identical(signer: OAuth1Signer, rounds: int = 200) -> None:
+    for i in range(rounds):
+        for method, url, params in SAMPLE_REQUESTS:
+            timestamp = str(1700000000 + i)
+            nonce = signer.generate_nonce()
+            expected = legacy_oauth_header(method, url, params, timestamp, nonce)
+            actual = signer.sign(method, url, params, timestamp, nonce)
+            if expected != actual:
+                raise AssertionError(f"Header mismatch for {method} {url}:\n{expected}\n{actual}")
+
+
+def measure(label: str, sign, iterations: int) -> float:
+    start = time.perf_counter()
+    for i in range(iterations):
+        method, url, params = SAMPLE_REQUESTS[i % len(SAMPLE_REQUESTS)]
+        sign(method, url, params)
+    elapsed = time.perf_counter() - start
+    rate = iterations / elapsed
+    print(f"{label:<10} {rate:>12,.0f} signatures/sec")
+    return rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    signer = OAuth1Signer(CONSUMER_KEY, CONSUMER_SECRET, TOKEN, TOKEN_SECRET)
+    check_identical(signer)
+    print("Headers byte-identical to the legacy implementation")
+
+    legacy = measure('legacy', legacy_oauth_header, args.iterations)
+    cached = measure('signer', signer.sign, args.iterations)
+    print(f"speed-up   {cached / legacy:>12.2f}x")
+
+
+if __name__ == '__main__':
+    main()
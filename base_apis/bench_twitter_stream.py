@@ -0,0 +1,153 @@
+"""
+Local exercise of the filtered-stream consumer.
+
+Starts a stand-in for the /2/tweets/search/stream endpoints that keeps rules in
+memory and streams newline-delimited tweets (interleaved with keep-alive lines)
+in small, deliberately misaligned chunks. Every connection is dropped after
+--per-connection tweets, so the consumer has to reconnect with backoff. A slow
+consumer (--consumer-delay) shows the bounded queue pushing back on the server.
+
+    python bench_twitter_stream.py [--tweets 5000] [--per-connection 1000] [--queue-size 100] [--consumer-delay 0]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# The client refuses to start without credentials; the stand-in never checks them
+for _var in ('TWITTER_CONSUMER_KEY', 'TWITTER_CONSUMER_SECRET',
+             'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET', 'TWITTER_BEARER_TOKEN'):
+    os.environ.setdefault(_var, 'bench')
+
+from twitter import TwitterAPI  # noqa: E402
+from twitter_stream import FilteredStream  # noqa: E402
+
+
+class StandInStreamHandler(BaseHTTPRequestHandler):
+    """Rules CRUD plus a chunked NDJSON stream that drops every per_connection tweets"""
+
+    protocol_version = 'HTTP/1.1'
+    rules = {}
+    next_rule_id = 1
+    next_tweet_id = 1
+    per_connection = 1000
+    stats = {'connections': 0, 'sent': 0, 'rule_requests': 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rules_payload(self) -> dict:
+        return {'data': [{'id': rule_id, **rule} for rule_id, rule in self.rules.items()],
+                'meta': {'result_count': len(self.rules)}}
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path.endswith('/rules'):
+            return self._reply(200, self._rules_payload())
+        if path.endswith('/stream'):
+            return self._stream()
+        return self._reply(404, {'error': 'not found'})
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        with self.lock:
+            self.stats['rule_requests'] += 1
+            for rule_id in body.get('delete', {}).get('ids', []):
+                self.rules.pop(rule_id, None)
+            for rule in body.get('add', []):
+                rule_id = str(StandInStreamHandler.next_rule_id)
+                StandInStreamHandler.next_rule_id += 1
+                self.rules[rule_id] = rule
+        return self._reply(201 if body.get('add') else 200, self._rules_payload())
+
+    def _write_chunk(self, data: bytes) -> None:
+        self.wfile.write(f'{len(data):x}\r\n'.encode() + data + b'\r\n')
+
+    def _stream(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        with self.lock:
+            self.stats['connections'] += 1
+        matching = [{'id': rule_id, 'tag': rule.get('tag')} for rule_id, rule in self.rules.items()]
+        try:
+            pending = b''
+            for i in range(self.per_connection):
+                with self.lock:
+                    tweet_id = StandInStreamHandler.next_tweet_id
+                    StandInStreamHandler.next_tweet_id += 1
+                    self.stats['sent'] += 1
+                pending += json.dumps({'data': {'id': str(tweet_id), 'text': f'stand-in tweet {tweet_id}'},
+                                       'matching_rules': matching}).encode() + b'\r\n'
+                if i % 50 == 0:
+                    pending += b'\r\n'  # keep-alive
+                # Flush at odd sizes so messages straddle chunk boundaries
+                while len(pending) >= 777:
+                    self._write_chunk(pending[:777])
+                    pending = pending[777:]
+            if pending:
+                self._write_chunk(pending)
+            # End without the terminating chunk: the client sees a dropped connection
+            self.close_connection = True
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+
+def start_stand_in(per_connection: int) -> ThreadingHTTPServer:
+    StandInStreamHandler.per_connection = per_connection
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInStreamHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tweets', type=int, default=5000, help='messages to consume before stopping')
+    parser.add_argument('--per-connection', type=int, default=1000)
+    parser.add_argument('--queue-size', type=int, default=100)
+    parser.add_argument('--consumer-delay', type=float, default=0.0, help='seconds spent per message')
+    args = parser.parse_args()
+
+    server = start_stand_in(args.per_connection)
+    try:
+        with TwitterAPI() as api:
+            api.base_url = f'http://127.0.0.1:{server.server_port}'
+            stream = FilteredStream(api, queue_size=args.queue_size)
+            print('sync 1:', stream.sync_rules({'python lang:en': 'python', 'rust lang:en': 'rust'}))
+            print('sync 2:', stream.sync_rules({'python lang:en': 'python', 'golang': 'go'}))
+            print('sync 3:', stream.sync_rules({'python lang:en': 'python', 'golang': 'go'}))
+
+            seen = set()
+            max_depth = 0
+            start = time.perf_counter()
+            with stream:
+                for message in stream:
+                    seen.add(message['data']['id'])
+                    max_depth = max(max_depth, stream.queue.qsize())
+                    if args.consumer_delay:
+                        time.sleep(args.consumer_delay)
+                    if len(seen) >= args.tweets:
+                        break
+            elapsed = time.perf_counter() - start
+            print(f"consumed={len(seen)} in {elapsed:.2f}s ({len(seen) / elapsed:,.0f} msg/s)  "
+                  f"max queue depth={max_depth}/{args.queue_size}")
+            print(f"client: {stream.stats}  server: {StandInStreamHandler.stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Throughput benchmark for chunked Twitter media uploads.
+
+Starts a local stand-in for upload.twitter.com that answers INIT / APPEND /
+FINALIZE with a configurable per-request latency (and optional random APPEND
+failures), then uploads the same file sequentially and with a pool of workers.
+
+    python bench_twitter_upload.py [--size-mb 64] [--latency 0.05] [--workers 1 4 8] [--fail-rate 0.02]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The client refuses to start without credentials; the stand-in never checks them
+for _var in ('TWITTER_CONSUMER_KEY', 'TWITTER_CONSUMER_SECRET',
+             'TWITTER_ACCESS_TOKEN', 'TWITTER_ACCESS_TOKEN_SECRET'):
+    os.environ.setdefault(_var, 'bench')
+
+from twitter import TwitterAPI  # noqa: E402
+
+
+class StandInUploadHandler(BaseHTTPRequestHandler):
+    """Minimal media/upload.json: enough of INIT / APPEND / FINALIZE for the client"""
+
+    protocol_version = 'HTTP/1.1'
+    latency = 0.0
+    fail_rate = 0.0
+    stats = {'appends': 0, 'failed_appends': 0, 'bytes': 0}
+    lock = threading.Lock()
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.latency)
+        if b'APPEND' in body[:4096]:
+            with self.lock:
+                if random.random() < self.fail_rate:
+                    self.stats['failed_appends'] += 1
+                    return self._reply(503, {'error': 'stand-in failure'})
+                self.stats['appends'] += 1
+                self.stats['bytes'] += len(body)
+            return self._reply(200, {})
+        if b'FINALIZE' in body:
+            return self._reply(200, {'media_id': 1, 'media_id_string': '1'})
+        # INIT
+        return self._reply(202, {'media_id': 1, 'media_id_string': '1', 'expires_after_secs': 86400})
+
+
+def start_stand_in(latency: float, fail_rate: float) -> ThreadingHTTPServer:
+    StandInUploadHandler.latency = latency
+    StandInUploadHandler.fail_rate = fail_rate
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInUploadHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds added to every request')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of APPENDs answered with 503')
+    args = parser.parse_args()
+
+    server = start_stand_in(args.latency, args.fail_rate)
+    size = args.size_mb * 1024 * 1024
+    with tempfile.NamedTemporaryFile(suffix='.mp4', delete=False) as media:
+        media.write(os.urandom(size))
+    try:
+        with TwitterAPI() as api:
+            api.upload_url = f'http://127.0.0.1:{server.server_port}/1.1/media/upload.json'
+            # Every run uploads the same file: with the journal, later runs would reuse the first media_id
+            api.upload_journal = None
+            for workers in args.workers:
+                StandInUploadHandler.stats.update(appends=0, failed_appends=0, bytes=0)
+                start = time.perf_counter()
+                media_id = api.upload_media_chunked(media.name, 'video/mp4', workers=workers)
+                elapsed = time.perf_counter() - start
+                stats = StandInUploadHandler.stats
+                print(f"workers={workers:<3} {'ok' if media_id else 'FAILED':<6} "
+                      f"{elapsed:6.2f}s  {args.size_mb / elapsed:8.1f} MB/s  "
+                      f"segments={stats['appends']} retried={stats['failed_appends']}")
+    finally:
+        os.unlink(media.name)
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
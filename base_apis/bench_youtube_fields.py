@@ -0,0 +1,168 @@
+"""
+Payload benchmark for field projections on the YouTube tools.
+
+A local stand-in for the Data API returns full-size resources (shaped like
+real ``videos.list`` / ``channels.list`` / ``search.list`` items, with long
+descriptions, thumbnails and localizations) and honours the ``part`` and
+``fields`` parameters the way the API does. Each call is made through
+YouTubeUploader with and without the MCP formatters' field lists, and the
+bytes on the wire, JSON parse time and end-to-end call time are reported.
+
+    python bench_youtube_fields.py [--runs 20] [--videos 50]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, urlparse
+
+from field_mask import project
+from youtube import CHANNEL_INFO_FIELDS, SEARCH_RESULT_FIELDS, VIDEO_DETAIL_FIELDS, YouTubeUploader
+
+DESCRIPTION = ("Full walkthrough of the build, with timestamps, links to every part used and the errata "
+               "from the comments. ") * 30
+
+
+def _thumbnails() -> dict:
+    sizes = {'default': (120, 90), 'medium': (320, 180), 'high': (480, 360), 'standard': (640, 480),
+             'maxres': (1280, 720)}
+    return {name: {'url': f'https://i.ytimg.com/vi/bench/{name}.jpg', 'width': w, 'height': h}
+            for name, (w, h) in sizes.items()}
+
+
+def video_resource(video_id: str) -> dict:
+    snippet = {'publishedAt': '2026-01-01T00:00:00Z', 'channelId': 'UCbench', 'title': f'Video {video_id}',
+               'description': DESCRIPTION, 'thumbnails': _thumbnails(), 'channelTitle': 'Bench Channel',
+               'tags': [f'tag{i}' for i in range(25)], 'categoryId': '28', 'liveBroadcastContent': 'none',
+               'defaultLanguage': 'en', 'localized': {'title': f'Video {video_id}', 'description': DESCRIPTION},
+               'defaultAudioLanguage': 'en'}
+    return {'kind': 'youtube#video', 'etag': 'etag', 'id': video_id, 'snippet': snippet,
+            'contentDetails': {'duration': 'PT21M3S', 'dimension': '2d', 'definition': 'hd', 'caption': 'true',
+                               'licensedContent': True, 'contentRating': {}, 'projection': 'rectangular',
+                               'regionRestriction': {'blocked': ['AA', 'BB', 'CC']}},
+            'status': {'uploadStatus': 'processed', 'privacyStatus': 'public', 'license': 'youtube',
+                       'embeddable': True, 'publicStatsViewable': True, 'madeForKids': False},
+            'statistics': {'viewCount': '123456', 'likeCount': '4321', 'favoriteCount': '0', 'commentCount': '210'}}
+
+
+def channel_resource() -> dict:
+    return {'kind': 'youtube#channel', 'etag': 'etag', 'id': 'UCbench',
+            'snippet': {'title': 'Bench Channel', 'description': DESCRIPTION, 'customUrl': '@bench',
+                        'publishedAt': '2015-01-01T00:00:00Z', 'thumbnails': _thumbnails(), 'country': 'US',
+                        'localized': {'title': 'Bench Channel', 'description': DESCRIPTION}},
+            'statistics': {'viewCount': '9999999', 'subscriberCount': '120000', 'hiddenSubscriberCount': False,
+                           'videoCount': '480'},
+            'brandingSettings': {'channel': {'title': 'Bench Channel', 'description': DESCRIPTION,
+                                             'keywords': 'bench test', 'unsubscribedTrailer': 'trailer',
+                                             'country': 'US'},
+                                 'image': {'bannerExternalUrl': 'https://yt3.googleusercontent.com/banner'}}}
+
+
+def search_resource(video_id: str) -> dict:
+    video = video_resource(video_id)
+    snippet = {k: video['snippet'][k] for k in ('publishedAt', 'channelId', 'title', 'description', 'thumbnails',
+                                                 'channelTitle', 'liveBroadcastContent')}
+    return {'kind': 'youtube#searchResult', 'etag': 'etag', 'id': {'kind': 'youtube#video', 'videoId': video_id},
+            'snippet': snippet}
+
+
+def parse_mask(mask: str, prefix: str = '') -> List[str]:
+    """YouTube ``fields`` syntax back to dotted paths: "items(id,snippet(title))" -> items.id, items.snippet.title"""
+    paths, depth, start = [], 0, 0
+    for i, char in enumerate(mask + ','):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            term = mask[start:i]
+            start = i + 1
+            if '(' in term:
+                name, inner = term.split('(', 1)
+                paths.extend(parse_mask(inner[:-1], f'{prefix}{name}.'))
+            elif term:
+                paths.append(prefix + term)
+    return paths
+
+
+class StandInDataApiHandler(BaseHTTPRequestHandler):
+    """videos / channels / search list calls with full-size items; keeps the last body per path"""
+    sent: Dict[str, bytes] = {}
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path.endswith('/videos'):
+            items = [video_resource(v) for v in query.get('id', '').split(',') if v]
+        elif url.path.endswith('/channels'):
+            items = [channel_resource()]
+        else:
+            items = [search_resource(f'v{i}') for i in range(int(query.get('maxResults', 5)))]
+        parts = set(query.get('part', '').split(',')) | {'kind', 'etag', 'id'}
+        items = [{k: v for k, v in item.items() if k in parts} for item in items]
+        response = {'kind': 'youtube#listResponse', 'etag': 'etag', 'items': items,
+                    'pageInfo': {'totalResults': len(items), 'resultsPerPage': len(items)}}
+        if 'fields' in query:
+            response = project(response, parse_mask(query['fields']))
+        body = json.dumps(response).encode()
+        StandInDataApiHandler.sent[url.path] = body
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def median_ms(func, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--videos', type=int, default=50, help='IDs per videos.list call')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInDataApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    from google.auth.credentials import AnonymousCredentials
+    uploader = YouTubeUploader(credentials=AnonymousCredentials())
+    uploader.quota = None
+    uploader.etag_cache = None
+    uploader.youtube._baseUrl = f'http://127.0.0.1:{server.server_port}/'
+    video_ids = [f'v{i}' for i in range(args.videos)]
+
+    calls = {
+        f'videos.list ({args.videos} IDs)': ('/videos', lambda f: uploader.get_videos_details(video_ids, fields=f),
+                                            VIDEO_DETAIL_FIELDS),
+        'channels.list': ('/channels', lambda f: uploader.get_channel_info(channel_id='UCbench', fields=f),
+                          CHANNEL_INFO_FIELDS),
+        'search.list (25 results)': ('/search', lambda f: uploader.search_videos('bench', 25, fields=f),
+                                     SEARCH_RESULT_FIELDS),
+    }
+    try:
+        print(f"{'call':<26}{'mode':<8}{'bytes':>10}{'parse ms':>10}{'call ms':>10}")
+        for name, (path, call, fields) in calls.items():
+            for mode, mask in (('full', None), ('fields', fields)):
+                call(mask)
+                body = next(v for k, v in StandInDataApiHandler.sent.items() if k.endswith(path))
+                parse = median_ms(lambda: json.loads(body), args.runs)
+                total = median_ms(lambda: call(mask), args.runs)
+                print(f"{name:<26}{mode:<8}{len(body):>10}{parse:>10.3f}{total:>10.2f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
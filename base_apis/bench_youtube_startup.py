@@ -0,0 +1,99 @@
+"""
+Cold-start benchmark for the YouTube client / MCP server.
+
+Each run is a fresh interpreter that imports the server module, builds the
+service and answers one ``get_video_details`` call against a local stand-in for
+the Data API, reporting time-to-import and time-to-first-tool-call. The
+``legacy`` mode reproduces the previous start-up path (Google client stack
+imported up front, ``build(..., cache_discovery=False)``) for comparison.
+
+    python bench_youtube_startup.py [--runs 5] [--modes legacy current]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Runs inside the child interpreter; prints timings as JSON
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+mode, base_url = sys.argv[1], sys.argv[2]
+if mode == 'legacy':
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+    from googleapiclient.discovery import build
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import MediaFileUpload
+try:
+    import youtube_mcp as server
+except ImportError:
+    server = None
+import youtube
+imported = time.perf_counter()
+
+from google.auth.credentials import AnonymousCredentials
+uploader = youtube.YouTubeUploader(credentials=AnonymousCredentials())
+if mode == 'legacy':
+    uploader.youtube = build('youtube', 'v3', credentials=uploader.credentials, cache_discovery=False)
+uploader.youtube._baseUrl = base_url
+if server is not None:
+    import asyncio
+    server.youtube_uploader = uploader
+    result = asyncio.run(server.get_video_details('bench'))
+else:
+    result = uploader.get_video_details('bench')
+done = time.perf_counter()
+assert 'bench' in str(result), result
+print(json.dumps({'import': imported - start, 'first_call': done - start, 'mcp': server is not None}))
+"""
+
+
+class StandInDataApiHandler(BaseHTTPRequestHandler):
+    """Answers videos.list with one canned video"""
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        body = json.dumps({'items': [{'id': 'bench', 'snippet': {'title': 'bench'}, 'statistics': {}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def run_child(mode: str, base_url: str) -> dict:
+    output = subprocess.run([sys.executable, '-c', CHILD, mode, base_url], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--modes', nargs='+', default=['legacy', 'current'], choices=['legacy', 'current'])
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInDataApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f'http://127.0.0.1:{server.server_port}/'
+    try:
+        for mode in args.modes:
+            runs = [run_child(mode, base_url) for _ in range(args.runs)]
+            target = 'youtube_mcp' if runs[0]['mcp'] else 'youtube'
+            print(f"{mode:<8} import {target}: {statistics.median(r['import'] for r in runs) * 1000:7.1f} ms   "
+                  f"first tool call: {statistics.median(r['first_call'] for r in runs) * 1000:7.1f} ms   "
+                  f"(median of {args.runs})")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
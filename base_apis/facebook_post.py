@@ -1,12 +1,24 @@
 import requests
 
-def post_to_facebook(text, page_access_token, page_id):
+from field_mask import graph_fields
+
+# Fields get_facebook_post asks for unless told otherwise
+DEFAULT_POST_FIELDS = ['id', 'message', 'created_time', 'permalink_url']
+
+def _with_fields(payload, fields):
+    # Graph returns only the requested fields (dotted paths, e.g. "from.name")
+    if fields:
+        payload['fields'] = graph_fields(fields)
+    return payload
+
+def post_to_facebook(text, page_access_token, page_id, fields=None):
     """
     Posts a text message to a Facebook Page.
     Args:
         text (str): The message to post.
         page_access_token (str): The Page Access Token.
         page_id (str): The Facebook Page ID.
+        fields (list): Optional fields of the new post to return (read-after-write).
     Returns:
         dict: The response from the Facebook Graph API.
     """
@@ -15,15 +27,32 @@ def post_to_facebook(text, page_access_token, page_id):
         'message': text,
         'access_token': page_access_token
     }
-    response = requests.post(url, data=payload)
+    response = requests.post(url, data=_with_fields(payload, fields))
     return response.json()
 
-def post_local_image_to_facebook(caption, image_path, page_access_token, page_id):
-    url = f"https://graph.facebook.com/{page_id}/photos"
+def get_facebook_post(post_id, page_access_token, fields=None):
+    """
+    Reads a post, asking the Graph API for only the given fields.
+    Args:
+        post_id (str): The ID of the post.
+        page_access_token (str): The Page Access Token.
+        fields (list): Dotted field paths, e.g. ["id", "from.name"] (default: DEFAULT_POST_FIELDS).
+    Returns:
+        dict: The response from the Facebook Graph API.
+    """
+    url = f"https://graph.facebook.com/{post_id}"
     payload = {
-        'caption': caption,
         'access_token': page_access_token
     }
+    response = requests.get(url, params=_with_fields(payload, fields or DEFAULT_POST_FIELDS))
+    return response.json()
+
+def post_local_image_to_facebook(caption, image_path, page_access_token, page_id, fields=None):
+    url = f"https://graph.facebook.com/{page_id}/photos"
+    payload = _with_fields({
+        'caption': caption,
+        'access_token': page_access_token
+    }, fields)
     files = {
         'source': open(image_path, 'rb')
     }
@@ -46,12 +75,12 @@ def delete_facebook_post(post_id, page_access_token):
     response = requests.delete(url, params=payload)
     return response.json()
 
-def comment_on_post(post_id, comment_text, page_access_token):
+def comment_on_post(post_id, comment_text, page_access_token, fields=None):
     url = f"https://graph.facebook.com/{post_id}/comments"
-    payload = {
+    payload = _with_fields({
         'message': comment_text,
         'access_token': page_access_token
-    }
+    }, fields)
     response = requests.post(url, data=payload)
     return response.json()
 
@@ -0,0 +1,81 @@
+"""
+Field projections: callers name the response fields they read as dotted paths
+("snippet.title", "statistics.viewCount") and these helpers turn them into the
+smallest request the API allows - ``part`` + ``fields`` for the YouTube Data
+API, ``fields`` for the Graph API.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FieldTree = Dict[str, Any]
+
+# Returned with every YouTube resource whether or not they are asked for
+_YOUTUBE_ENVELOPE = ('kind', 'etag')
+
+
+def field_tree(fields: Iterable[str]) -> FieldTree:
+    """Nest dotted paths: ["a.b", "a.c", "d"] -> {"a": {"b": {}, "c": {}}, "d": {}}"""
+    tree: FieldTree = {}
+    paths = sorted((tuple(path.strip().split('.')) for path in fields), key=len)
+    requested = set(paths)
+    for names in paths:
+        if not all(names):
+            raise ValueError(f"Invalid field path: {'.'.join(names)!r}")
+        # A bare parent ("snippet") already covers its children ("snippet.title")
+        if any(names[:depth] in requested for depth in range(1, len(names))):
+            continue
+        node = tree
+        for name in names:
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _format(tree: FieldTree, open_: str, close: str) -> str:
+    parts = []
+    for name, children in tree.items():
+        parts.append(f"{name}{open_}{_format(children, open_, close)}{close}" if children else name)
+    return ','.join(parts)
+
+
+def youtube_params(fields: Iterable[str], list_fields: Iterable[str] = ('nextPageToken',)) -> Tuple[str, str]:
+    """
+    ``part`` and ``fields`` parameters for a YouTube ``*.list`` call that
+    returns only ``fields`` of each item (plus ``list_fields`` of the page).
+
+    ``part`` is derived from the top-level names, so e.g. ``statistics.viewCount``
+    alone requests just the statistics part.
+    """
+    tree = field_tree(fields)
+    part = ','.join(name for name in tree if name not in _YOUTUBE_ENVELOPE)
+    if not part:
+        raise ValueError("Projection selects no resource parts")
+    mask = ','.join([f"items({_format(tree, '(', ')')})", *list_fields])
+    return part, mask
+
+
+def graph_fields(fields: Iterable[str]) -> str:
+    """Graph API ``fields`` value: ["id", "from.name"] -> "id,from{name}" """
+    return _format(field_tree(fields), '{', '}')
+
+
+def project(resource: Any, fields: Optional[Iterable[str]]) -> Any:
+    """Apply a projection locally, as the server would (lists are projected element-wise)"""
+    if fields is None:
+        return resource
+    return _project(resource, field_tree(fields))
+
+
+def _project(value: Any, tree: FieldTree) -> Any:
+    if not tree:
+        return value
+    if isinstance(value, list):
+        return [_project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {name: _project(value[name], children) for name, children in tree.items() if name in value}
+
+
+def with_fields(fields: Iterable[str], *required: str) -> List[str]:
+    """``fields`` plus paths the client itself depends on (e.g. the ``id`` used to match results)"""
+    merged = list(fields)
+    merged.extend(path for path in required if path not in merged)
+    return merged
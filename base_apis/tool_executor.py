@@ -0,0 +1,117 @@
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Concurrent calls allowed per kind of tool. Uploads hold a thread for minutes,
+# so they get their own small budget and can't starve quick reads.
+DEFAULT_LIMITS: Dict[str, int] = {
+    'upload': 2,
+    'write': 2,
+    'read': 6,
+}
+
+
+def _new_stats() -> Dict[str, float]:
+    return {'queued': 0, 'running': 0, 'started': 0, 'completed': 0, 'failed': 0,
+            'cancelled': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+
+
+class ToolExecutor:
+    """
+    Runs the blocking work of async MCP tools on a shared thread pool.
+
+    Each call names a *kind* with its own concurrency limit; calls over the
+    limit wait (without holding a thread) and their wait time is recorded. When
+    the awaiting task is cancelled - e.g. the client disconnected or cancelled
+    the request - work that has not started is dropped, and work that is
+    running gets its ``cancel_event`` set so cooperative functions can stop.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, thread_name_prefix: str = 'mcp-tool'):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self._pool = ThreadPoolExecutor(max_workers=sum(self.limits.values()),
+                                        thread_name_prefix=thread_name_prefix)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _kind(self, kind: str):
+        if kind not in self.limits:
+            raise ValueError(f"Unknown tool kind: {kind}")
+        if kind not in self._semaphores:
+            self._semaphores[kind] = asyncio.Semaphore(self.limits[kind])
+            self._stats[kind] = _new_stats()
+        return self._semaphores[kind], self._stats[kind]
+
+    async def run(self, kind: str, func: Callable[..., Any], *args,
+                  cancel_event: Optional[threading.Event] = None, **kwargs) -> Any:
+        """
+        Await ``func(*args, **kwargs)`` on the pool under ``kind``'s limit.
+
+        Pass a ``threading.Event`` that ``func`` checks as ``cancel_event`` to
+        let a long call stop early once its caller has gone away.
+        """
+        semaphore, stats = self._kind(kind)
+        enqueued = time.monotonic()
+        stats['queued'] += 1
+        try:
+            await semaphore.acquire()
+        except asyncio.CancelledError:
+            stats['queued'] -= 1
+            stats['cancelled'] += 1
+            raise
+        wait = time.monotonic() - enqueued
+        stats['queued'] -= 1
+        stats['running'] += 1
+        stats['started'] += 1
+        stats['total_wait'] += wait
+        stats['max_wait'] = max(stats['max_wait'], wait)
+        loop = asyncio.get_running_loop()
+        future = self._pool.submit(functools.partial(func, *args, **kwargs))
+
+        def release(_=None) -> None:
+            stats['running'] -= 1
+            semaphore.release()
+
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            stats['cancelled'] += 1
+            if cancel_event is not None:
+                cancel_event.set()
+            if future.cancel() or future.done():
+                release()
+            else:
+                # Still running: keep its slot until the thread actually lets go
+                future.add_done_callback(lambda _: loop.call_soon_threadsafe(release))
+            raise
+        except Exception:
+            stats['failed'] += 1
+            release()
+            raise
+        stats['completed'] += 1
+        release()
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, in-flight count and wait times per kind"""
+        report: Dict[str, Dict[str, Any]] = {}
+        for kind, limit in self.limits.items():
+            stats = self._stats.get(kind) or _new_stats()
+            started = stats['started']
+            report[kind] = {
+                'limit': limit,
+                'queued': stats['queued'],
+                'running': stats['running'],
+                'completed': stats['completed'],
+                'failed': stats['failed'],
+                'cancelled': stats['cancelled'],
+                'avg_wait_ms': round(stats['total_wait'] / started * 1000, 1) if started else 0.0,
+                'max_wait_ms': round(stats['max_wait'] * 1000, 1),
+            }
+        return report
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
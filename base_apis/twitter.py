@@ -1,22 +1,23 @@
 import os
-import requests
 import json
-import hashlib
-import hmac
-import base64
 import time
-import urllib.parse
-from typing import Optional, Dict, Any, List
-import secrets
-import string
+from typing import Optional, Dict, Any, List, Union
 from dotenv import load_dotenv
+from twitter_media import ChunkedUploader, UploadJournal, plan_upload, processing_step
+from twitter_oauth import OAuth1Signer
+from twitter_rate_store import credential_namespace
+from twitter_transport import TwitterTransport, PooledTransport
 
 load_dotenv()
 
 class TwitterAPI:
-    def __init__(self):
+    def __init__(self, transport: Optional[TwitterTransport] = None):
         """
         Initialize Twitter API client with OAuth 1.0 credentials from environment variables
+
+        Args:
+            transport: HTTP transport to send requests through. Defaults to a
+                keep-alive PooledTransport owned (and closed) by this client.
         """
         self.consumer_key = os.getenv('TWITTER_CONSUMER_KEY')
         self.consumer_secret = os.getenv('TWITTER_CONSUMER_SECRET')
@@ -27,70 +28,30 @@ class TwitterAPI:
             raise ValueError("Missing required Twitter API credentials in environment variables")
         
         self.base_url = "https://api.x.com"
+        self.upload_url = "https://upload.twitter.com/1.1/media/upload.json"
+        self.signer = OAuth1Signer(self.consumer_key, self.consumer_secret,
+                                   self.access_token, self.access_token_secret)
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else PooledTransport()
+        # Keeps this account's state apart in stores shared with other accounts
+        self.namespace = credential_namespace(self.consumer_key, self.access_token)
+        # Checkpoints for chunked uploads; set to None to disable resuming
+        self.upload_journal: Optional[UploadJournal] = UploadJournal(namespace=self.namespace)
         
-    def _generate_nonce(self, length: int = 32) -> str:
-        """Generate a random nonce for OAuth"""
-        return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(length))
-    
-    def _generate_timestamp(self) -> str:
-        """Generate current timestamp for OAuth"""
-        return str(int(time.time()))
+    def close(self) -> None:
+        """Close the underlying transport if this client created it"""
+        if self._owns_transport:
+            self.transport.close()
     
-    def _percent_encode(self, text: str) -> str:
-        """Percent encode text for OAuth"""
-        return urllib.parse.quote(str(text), safe='')
+    def __enter__(self):
+        return self
     
-    def _generate_signature_base_string(self, method: str, url: str, params: Dict[str, str]) -> str:
-        """Generate signature base string for OAuth"""
-        # Sort parameters
-        sorted_params = sorted(params.items())
-        param_string = '&'.join([f"{self._percent_encode(k)}={self._percent_encode(v)}" for k, v in sorted_params])
+    def __exit__(self, *exc_info) -> None:
+        self.close()
         
-        return f"{method.upper()}&{self._percent_encode(url)}&{self._percent_encode(param_string)}"
-    
-    def _generate_signing_key(self) -> str:
-        """Generate signing key for OAuth"""
-        return f"{self._percent_encode(self.consumer_secret)}&{self._percent_encode(self.access_token_secret)}"
-    
-    def _generate_signature(self, signature_base_string: str, signing_key: str) -> str:
-        """Generate OAuth signature"""
-        signature = hmac.new(
-            signing_key.encode('utf-8'),
-            signature_base_string.encode('utf-8'),
-            hashlib.sha1
-        ).digest()
-        return base64.b64encode(signature).decode('utf-8')
-    
     def _generate_oauth_header(self, method: str, url: str, params: Optional[Dict[str, str]] = None) -> str:
         """Generate OAuth 1.0 authorization header"""
-        if params is None:
-            params = {}
-            
-        oauth_params = {
-            'oauth_consumer_key': self.consumer_key,
-            'oauth_token': self.access_token,
-            'oauth_signature_method': 'HMAC-SHA1',
-            'oauth_timestamp': self._generate_timestamp(),
-            'oauth_nonce': self._generate_nonce(),
-            'oauth_version': '1.0'
-        }
-        
-        # Combine OAuth params with request params for signature
-        all_params = {**oauth_params, **params}
-        
-        # Generate signature
-        signature_base_string = self._generate_signature_base_string(method, url, all_params)
-        signing_key = self._generate_signing_key()
-        oauth_signature = self._generate_signature(signature_base_string, signing_key)
-        
-        oauth_params['oauth_signature'] = oauth_signature
-        
-        # Build authorization header
-        auth_header_params = []
-        for key, value in oauth_params.items():
-            auth_header_params.append(f'{self._percent_encode(key)}="{self._percent_encode(value)}"')
-        
-        return f"OAuth {','.join(auth_header_params)}"
+        return self.signer.sign(method, url, params)
     
     def create_tweet(self, text: str, media_ids: Optional[List[str]] = None) -> Dict[str, Any]:
         """Create a new tweet (optionally with media)."""
@@ -102,7 +63,7 @@ class TwitterAPI:
             'Content-Type': 'application/json',
             'Authorization': self._generate_oauth_header('POST', url)
         }
-        response = requests.post(url, headers=headers, json=payload)
+        response = self.transport.post(url, headers=headers, json=payload)
         try:
             return response.json()
         except Exception:
@@ -112,7 +73,7 @@ class TwitterAPI:
         """Delete a tweet by ID."""
         url = f"{self.base_url}/2/tweets/{tweet_id}"
         headers = {'Authorization': self._generate_oauth_header('DELETE', url)}
-        response = requests.delete(url, headers=headers)
+        response = self.transport.delete(url, headers=headers)
         try:
             return response.json()
         except Exception:
@@ -120,58 +81,62 @@ class TwitterAPI:
     
     def upload_media_simple(self, media_path: str, media_type: str) -> Dict[str, Any]:
         """Upload a small media file to Twitter and return the API response."""
-        url = "https://upload.twitter.com/1.1/media/upload.json"
+        url = self.upload_url
         headers = {'Authorization': self._generate_oauth_header('POST', url)}
         try:
             with open(media_path, 'rb') as media_file:
                 files = {'media': media_file}
-                response = requests.post(url, headers=headers, files=files)
+                response = self.transport.post(url, headers=headers, files=files)
                 return response.json() if response.ok else {
                     'error': f'HTTP {response.status_code}', 'text': response.text
                 }
         except Exception as exc:
             return {'error': str(exc)}
     
-    def upload_media_chunked(self, media_path: str, media_type: str) -> Optional[str]:
-        """Chunked upload for large files. Returns the media ID or None on failure."""
-        import os
+    def upload_media_chunked(self, media_path: str, media_type: str, workers: int = 1,
+                             chunk_size: Optional[int] = None) -> Optional[str]:
+        """
+        Chunked upload for large files. Returns the media ID or None on failure.
+
+        Progress is checkpointed in ``self.upload_journal``: retrying after a crash
+        or a failed APPEND resumes from the first missing segment of the same file.
+
+        Args:
+            media_path: Path to media file
+            media_type: MIME type of the media
+            workers: Number of APPEND segments sent concurrently (1 = sequential)
+            chunk_size: Segment size in bytes; picked from the file size when omitted
+        """
         try:
-            media_size = os.path.getsize(media_path)
-            init = self.upload_media_init(media_size, media_type)
-            media_id = init.get('media_id')
-            if not media_id:
-                return None
-            chunk_size = 1024 * 1024  # 1 MB
-            with open(media_path, 'rb') as f:
-                segment = 0
-                while chunk := f.read(chunk_size):
-                    if 'error' in self.upload_media_append(media_id, chunk, segment):
-                        return None
-                    segment += 1
-            finalize = self.upload_media_finalize(media_id)
-            return media_id if 'error' not in finalize else None
+            return self._chunked_uploader(workers, chunk_size).upload(media_path, media_type)
         except Exception:
             return None
     
-    def upload_media_init(self, total_bytes: int, media_type: str) -> Dict[str, Any]:
+    def _chunked_uploader(self, workers: int = 1, chunk_size: Optional[int] = None) -> ChunkedUploader:
+        return ChunkedUploader(self, workers=workers, chunk_size=chunk_size, journal=self.upload_journal)
+    
+    def upload_media_init(self, total_bytes: int, media_type: str,
+                          media_category: Optional[str] = None) -> Dict[str, Any]:
         """Initialize chunked media upload"""
-        url = "https://upload.twitter.com/1.1/media/upload.json"
+        url = self.upload_url
         params = {
             'command': 'INIT',
             'total_bytes': str(total_bytes),
             'media_type': media_type
         }
+        if media_category:
+            params['media_category'] = media_category
         
         headers = {
             'Authorization': self._generate_oauth_header('POST', url, params)
         }
         
-        response = requests.post(url, headers=headers, data=params)
+        response = self.transport.post(url, headers=headers, data=params)
         return response.json()
     
-    def upload_media_append(self, media_id: str, chunk: bytes, segment_index: int) -> Dict[str, Any]:
+    def upload_media_append(self, media_id: str, chunk: Union[bytes, memoryview], segment_index: int) -> Dict[str, Any]:
         """Append chunk to media upload"""
-        url = "https://upload.twitter.com/1.1/media/upload.json"
+        url = self.upload_url
         data = {
             'command': 'APPEND',
             'media_id': media_id,
@@ -184,7 +149,7 @@ class TwitterAPI:
         
         files = {'media': chunk}
         
-        response = requests.post(url, headers=headers, data=data, files=files)
+        response = self.transport.post(url, headers=headers, data=data, files=files)
         try:
             return response.json()
         except:
@@ -193,7 +158,7 @@ class TwitterAPI:
     
     def upload_media_finalize(self, media_id: str) -> Dict[str, Any]:
         """Finalize chunked media upload"""
-        url = "https://upload.twitter.com/1.1/media/upload.json"
+        url = self.upload_url
         data = {
             'command': 'FINALIZE',
             'media_id': media_id
@@ -203,38 +168,95 @@ class TwitterAPI:
             'Authorization': self._generate_oauth_header('POST', url, data)
         }
         
-        response = requests.post(url, headers=headers, data=data)
+        response = self.transport.post(url, headers=headers, data=data)
         return response.json()
     
-    def create_tweet_with_media(self, text: str, media_path: str, media_type: str) -> Dict[str, Any]:
+    def upload_media_status(self, media_id: str) -> Dict[str, Any]:
+        """Check the processing status of a finalized upload"""
+        url = self.upload_url
+        params = {
+            'command': 'STATUS',
+            'media_id': media_id
+        }
+        
+        headers = {
+            'Authorization': self._generate_oauth_header('GET', url, params)
+        }
+        
+        response = self.transport.get(url, headers=headers, params=params)
+        return response.json()
+    
+    def wait_for_processing(self, media_id: str, processing_info: Optional[Dict[str, Any]] = None,
+                            timeout: float = 600) -> bool:
+        """
+        Poll STATUS until Twitter has finished processing uploaded media
+        
+        Args:
+            media_id: ID returned by the upload
+            processing_info: processing_info from FINALIZE; STATUS is queried first when omitted
+            timeout: Give up after this many seconds
+            
+        Returns:
+            True once processing succeeded, False if it failed or timed out
+        """
+        if processing_info is None:
+            processing_info = self._status_processing_info(media_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            state, delay = processing_step(processing_info)
+            if state != 'pending':
+                return state == 'succeeded'
+            if time.monotonic() + delay > deadline:
+                return False
+            time.sleep(delay)
+            processing_info = self._status_processing_info(media_id)
+
+    def _status_processing_info(self, media_id: str) -> Optional[Dict[str, Any]]:
+        """processing_info from STATUS; None if the call failed"""
+        try:
+            return self.upload_media_status(media_id).get('processing_info')
+        except Exception:
+            return None
+    
+    def create_tweet_with_media(self, text: str, media_path: str, media_type: str,
+                                workers: int = 1) -> Dict[str, Any]:
         """
         Create a tweet with media attachment
         
+        The upload path is chosen up front from the file size and sniffed MIME type:
+        small still images use the one-shot upload, everything else the chunked one.
+        Video/GIF uploads are polled via STATUS until processing finishes, so the
+        tweet is not created against media that is still being transcoded.
+        
         Args:
             text: Tweet content
             media_path: Path to media file
-            media_type: Type of media
+            media_type: Type of media (used when the type cannot be sniffed)
+            workers: Concurrent APPEND segments for chunked uploads
             
         Returns:
             Dict containing the created tweet data
         """
-        # Try simple upload first (for smaller files)
-        try:
-            media_response = self.upload_media_simple(media_path, media_type)
+        plan = plan_upload(media_path, media_type)
+        
+        if plan.route == 'simple':
+            media_response = self.upload_media_simple(media_path, plan.media_type)
             if 'media_id' in media_response or 'media_id_string' in media_response:
                 media_id = media_response.get('media_id_string', media_response.get('media_id'))
                 return self.create_tweet(text, [str(media_id)])
-        except Exception:
-            # simple upload failed silently; fallback to chunked
-            pass
-        
-        # Fall back to chunked upload
-        media_id = self.upload_media_chunked(media_path, media_type)
+            # small images can still go through the chunked path
         
-        if media_id:
-            return self.create_tweet(text, [media_id])
-        else:
+        uploader = self._chunked_uploader(workers)
+        media_id = uploader.upload(media_path, plan.media_type, plan.media_category)
+        if not media_id:
             raise Exception("Failed to upload media")
+        processing_info = uploader.processing_info
+        # FINALIZE without processing_info: the media is ready to attach
+        if processing_info is not None and not self.wait_for_processing(media_id, processing_info):
+            # Otherwise every retry would get the same finalized-but-unusable media_id back
+            uploader.discard()
+            raise Exception("Media processing failed")
+        return self.create_tweet(text, [media_id])
 
 # Example usage and helper functions
 def example_usage():
@@ -0,0 +1,177 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
+
+# Per-request limits. The window lengths are deliberately conservative; callers
+# with a wider allowance can pass max_window_days.
+MAX_IDS_PER_REQUEST = 100
+MAX_WINDOW_DAYS: Dict[str, int] = {
+    'hourly': 7,
+    'hour': 7,
+    'day': 31,
+    'daily': 31,
+    'weekly': 90,
+    'total': 90,
+}
+DEFAULT_WINDOW_DAYS = 31
+_TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+class AnalyticsShard(NamedTuple):
+    ids: Tuple[str, ...]
+    start_time: str
+    end_time: str
+
+
+def _parse_time(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def plan_shards(ids: List[str], start_time: str, end_time: str, granularity: str = 'day',
+                max_ids: int = MAX_IDS_PER_REQUEST, max_window_days: Optional[int] = None) -> List[AnalyticsShard]:
+    """Split an ID list and date range into API-legal (ids, start, end) requests"""
+    unique_ids = list(dict.fromkeys(ids))
+    window = timedelta(days=max_window_days or MAX_WINDOW_DAYS.get(granularity, DEFAULT_WINDOW_DAYS))
+    start, end = _parse_time(start_time), _parse_time(end_time)
+    if end <= start:
+        raise ValueError("end_time must be after start_time")
+
+    windows: List[Tuple[str, str]] = []
+    cursor = start
+    while cursor < end:
+        window_end = min(cursor + window, end)
+        windows.append((cursor.strftime(_TIME_FORMAT), window_end.strftime(_TIME_FORMAT)))
+        cursor = window_end
+
+    return [AnalyticsShard(tuple(unique_ids[i:i + max_ids]), window_start, window_end)
+            for i in range(0, len(unique_ids), max_ids)
+            for window_start, window_end in windows]
+
+
+class AnalyticsResult:
+    """
+    Columnar analytics table merged from many shard responses.
+
+    ``columns`` maps a column name ('id', 'timestamp' and one per metric) to a
+    list of values; all lists have the same length. Shards that failed are kept
+    in ``failed_shards`` and can be re-run with ``AnalyticsEngine.retry``.
+    """
+
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {'id': [], 'timestamp': []}
+        self.failed_shards: Dict[AnalyticsShard, Dict[str, Any]] = {}
+        # (kind, fields, granularity) of the request, so failed shards can be retried
+        self.request: Optional[Tuple[str, Optional[str], str]] = None
+        self._row_index: Dict[Tuple[str, Optional[str]], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.columns['id'])
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_shards
+
+    def add_row(self, item_id: str, timestamp: Optional[str], metrics: Dict[str, Any]) -> None:
+        """Insert or overwrite the row for (id, timestamp)"""
+        key = (item_id, timestamp)
+        row = self._row_index.get(key)
+        if row is None:
+            row = len(self)
+            self._row_index[key] = row
+            for values in self.columns.values():
+                values.append(None)
+            self.columns['id'][row] = item_id
+            self.columns['timestamp'][row] = timestamp
+        for name, value in metrics.items():
+            if name not in self.columns:
+                self.columns[name] = [None] * len(self)
+            self.columns[name][row] = value
+
+    def add_response(self, response: Dict[str, Any], window_start: Optional[str] = None) -> None:
+        """
+        Flatten one API response into rows. Untimestamped (total) metrics are
+        stamped with the shard's window start so windows don't overwrite each other.
+        """
+        for item in response.get('data', []):
+            item_id = str(item.get('id') or item.get('media_key'))
+            series = item.get('timestamped_metrics')
+            if series is None:
+                self.add_row(item_id, window_start, item.get('metrics', {}))
+                continue
+            for point in series:
+                self.add_row(item_id, point.get('timestamp'), point.get('metrics', {}))
+
+    def rows(self) -> List[Dict[str, Any]]:
+        """Row-oriented view, mostly for printing"""
+        names = list(self.columns)
+        return [dict(zip(names, values)) for values in zip(*self.columns.values())]
+
+
+class AnalyticsEngine:
+    """
+    Fan-out driver for get_tweet_analytics / get_media_analytics.
+
+    Requests are sharded by ID count and window length, fetched concurrently on
+    a bounded pool (every request still spends from the shared rate budget, so
+    the pool simply queues when the window is exhausted) and merged into one
+    AnalyticsResult.
+    """
+
+    def __init__(self, api, workers: int = 4, max_ids: int = MAX_IDS_PER_REQUEST,
+                 max_window_days: Optional[int] = None):
+        self.api = api
+        self.workers = max(1, workers)
+        self.max_ids = max_ids
+        self.max_window_days = max_window_days
+
+    def _fetch_shard(self, kind: str, shard: AnalyticsShard, fields: Optional[str],
+                     granularity: str) -> Dict[str, Any]:
+        if kind == 'media':
+            return self.api.get_media_analytics(list(shard.ids), shard.start_time, shard.end_time,
+                                                fields, granularity)
+        return self.api.get_tweet_analytics(list(shard.ids), shard.start_time, shard.end_time,
+                                            fields, granularity)
+
+    def _run(self, result: AnalyticsResult, kind: str, shards: List[AnalyticsShard],
+             fields: Optional[str], granularity: str) -> AnalyticsResult:
+        def fetch(shard: AnalyticsShard) -> Tuple[AnalyticsShard, Dict[str, Any]]:
+            try:
+                return shard, self._fetch_shard(kind, shard, fields, granularity)
+            except Exception as exc:
+                return shard, {'error': str(exc)}
+
+        with ThreadPoolExecutor(max_workers=min(self.workers, max(1, len(shards))),
+                                thread_name_prefix='twitter-analytics') as pool:
+            for shard, response in pool.map(fetch, shards):
+                # The API omits ``data`` when a window has no metrics: that shard is empty, not failed
+                if 'error' in response:
+                    result.failed_shards[shard] = response
+                else:
+                    result.failed_shards.pop(shard, None)
+                    result.add_response(response, shard.start_time)
+        result.request = (kind, fields, granularity)
+        return result
+
+    def fetch(self, ids: List[str], start_time: str, end_time: str, fields: Optional[str] = None,
+              granularity: str = 'day', kind: str = 'tweet') -> AnalyticsResult:
+        """
+        Fetch analytics for any number of IDs over any date range
+
+        Args:
+            ids: Tweet IDs (kind='tweet') or media keys (kind='media')
+            start_time: ISO 8601 start, e.g. 2024-01-01T00:00:00Z
+            end_time: ISO 8601 end
+            fields: analytics.fields / media_analytics.fields
+            granularity: Passed through to the API; also picks the window length
+            kind: 'tweet' or 'media'
+        """
+        shards = plan_shards(ids, start_time, end_time, granularity, self.max_ids, self.max_window_days)
+        return self._run(AnalyticsResult(), kind, shards, fields, granularity)
+
+    def retry(self, result: AnalyticsResult) -> AnalyticsResult:
+        """Re-fetch only the shards that failed, merging into the same result"""
+        if not result.failed_shards:
+            return result
+        kind, fields, granularity = result.request
+        return self._run(result, kind, list(result.failed_shards), fields, granularity)
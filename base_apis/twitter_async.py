@@ -0,0 +1,454 @@
+import os
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Mapping, AsyncIterator
+
+import httpx
+from dotenv import load_dotenv
+from twitter_media import ChunkedUploader, UploadJournal, plan_upload, processing_step
+from twitter_oauth import OAuth1Signer
+from twitter_rate_limits import parse_rate_limit_headers
+from twitter_cache import ResponseCache
+from twitter_pagination import apaginate
+from twitter_rate_store import RateLimitStore, credential_namespace
+
+load_dotenv()
+
+
+class AsyncTwitterTransport(ABC):
+    """
+    Async counterpart of TwitterTransport: AsyncTwitterAPI only needs ``request``
+    and ``aclose``, so tests can swap in their own implementation.
+    """
+
+    @abstractmethod
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send one request; keyword arguments are those of ``httpx.AsyncClient.request``"""
+
+    async def aclose(self) -> None:
+        """Release any pooled connections"""
+
+
+class AsyncPooledTransport(AsyncTwitterTransport):
+    """Keep-alive transport backed by a single ``httpx.AsyncClient``"""
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 timeout: float = 60.0, connect_timeout: float = 5.0):
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive_connections),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        return await self.client.request(method, url, **kwargs)
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class AsyncTwitterAPI:
+    """
+    asyncio Twitter client with the same method surface as TwitterAPI and
+    TwitterRateLimitedAPI. Rate-limit waits and retry back-off use
+    ``asyncio.sleep`` so they never block the event loop.
+    """
+
+    def __init__(self, transport: Optional[AsyncTwitterTransport] = None,
+                 rate_store: Optional[RateLimitStore] = None,
+                 cache: Optional[ResponseCache] = None):
+        self.consumer_key = os.getenv('TWITTER_CONSUMER_KEY')
+        self.consumer_secret = os.getenv('TWITTER_CONSUMER_SECRET')
+        self.access_token = os.getenv('TWITTER_ACCESS_TOKEN')
+        self.access_token_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
+
+        if not all([self.consumer_key, self.consumer_secret, self.access_token, self.access_token_secret]):
+            raise ValueError("Missing required Twitter API credentials in environment variables")
+
+        self.base_url = "https://api.x.com"
+        self.upload_url = "https://upload.twitter.com/1.1/media/upload.json"
+        self.signer = OAuth1Signer(self.consumer_key, self.consumer_secret,
+                                   self.access_token, self.access_token_secret)
+        self._owns_transport = transport is None
+        self.transport = transport if transport is not None else AsyncPooledTransport()
+        # Keeps this account's state apart in stores shared with other accounts
+        self.namespace = credential_namespace(self.consumer_key, self.access_token)
+        self.rate_store = rate_store or RateLimitStore(namespace=self.namespace)
+        self.cache: Optional[ResponseCache] = cache if cache is not None else ResponseCache()
+        # Checkpoints of chunked uploads (shared with TwitterAPI); set to None to disable resuming
+        self.upload_journal: Optional[UploadJournal] = UploadJournal(namespace=self.namespace)
+
+    async def aclose(self) -> None:
+        """Close the underlying transport if this client created it"""
+        if self._owns_transport:
+            await self.transport.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    def _generate_oauth_header(self, method: str, url: str, params: Optional[Dict[str, str]] = None) -> str:
+        """Generate OAuth 1.0 authorization header"""
+        return self.signer.sign(method, url, params)
+
+    @staticmethod
+    def _json_or_error(response: httpx.Response) -> Dict[str, Any]:
+        try:
+            return response.json()
+        except Exception:
+            return {"error": "Invalid JSON", "status_code": response.status_code, "text": response.text}
+
+    # ------------------ Non-rate-limited endpoints ------------------
+
+    async def create_tweet(self, text: str, media_ids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Create a new tweet (optionally with media)."""
+        url = f"{self.base_url}/2/tweets"
+        payload: Dict[str, Any] = {"text": text}
+        if media_ids:
+            payload["media"] = {"media_ids": media_ids}
+        headers = {
+            'Content-Type': 'application/json',
+            'Authorization': self._generate_oauth_header('POST', url)
+        }
+        response = await self.transport.request('POST', url, headers=headers, json=payload)
+        return self._json_or_error(response)
+
+    async def delete_tweet(self, tweet_id: str) -> Dict[str, Any]:
+        """Delete a tweet by ID."""
+        url = f"{self.base_url}/2/tweets/{tweet_id}"
+        headers = {'Authorization': self._generate_oauth_header('DELETE', url)}
+        response = await self.transport.request('DELETE', url, headers=headers)
+        return self._json_or_error(response)
+
+    async def upload_media_simple(self, media_path: str, media_type: str) -> Dict[str, Any]:
+        """Upload a small media file to Twitter and return the API response."""
+        url = self.upload_url
+        headers = {'Authorization': self._generate_oauth_header('POST', url)}
+        try:
+            content = await asyncio.to_thread(_read_file, media_path)
+            response = await self.transport.request('POST', url, headers=headers,
+                                                    files={'media': content})
+            return response.json() if response.is_success else {
+                'error': f'HTTP {response.status_code}', 'text': response.text
+            }
+        except Exception as exc:
+            return {'error': str(exc)}
+
+    async def upload_media_chunked(self, media_path: str, media_type: str, workers: int = 1,
+                                   chunk_size: Optional[int] = None) -> Optional[str]:
+        """
+        Chunked upload for large files. Returns the media ID or None on failure.
+
+        Same segmenting, retries and journal as TwitterAPI.upload_media_chunked:
+        ChunkedUploader runs in a worker thread and its requests go out on this loop.
+        """
+        try:
+            uploader = self._chunked_uploader(workers, chunk_size)
+            return await asyncio.to_thread(uploader.upload, media_path, media_type)
+        except Exception:
+            return None
+
+    def _chunked_uploader(self, workers: int = 1, chunk_size: Optional[int] = None) -> ChunkedUploader:
+        return ChunkedUploader(_BlockingUploadCalls(self, asyncio.get_running_loop()), workers=workers,
+                               chunk_size=chunk_size, journal=self.upload_journal)
+
+    async def upload_media_init(self, total_bytes: int, media_type: str,
+                                media_category: Optional[str] = None) -> Dict[str, Any]:
+        """Initialize chunked media upload"""
+        url = self.upload_url
+        params = {
+            'command': 'INIT',
+            'total_bytes': str(total_bytes),
+            'media_type': media_type
+        }
+        if media_category:
+            params['media_category'] = media_category
+        headers = {'Authorization': self._generate_oauth_header('POST', url, params)}
+        response = await self.transport.request('POST', url, headers=headers, data=params)
+        return response.json()
+
+    async def upload_media_append(self, media_id: str, chunk: bytes, segment_index: int) -> Dict[str, Any]:
+        """Append chunk to media upload"""
+        url = self.upload_url
+        data = {
+            'command': 'APPEND',
+            'media_id': media_id,
+            'segment_index': str(segment_index)
+        }
+        headers = {'Authorization': self._generate_oauth_header('POST', url, data)}
+        response = await self.transport.request('POST', url, headers=headers, data=data,
+                                                files={'media': chunk})
+        try:
+            return response.json()
+        except Exception:
+            # APPEND command might not return JSON, just return success indicator
+            return {'status': 'success'} if response.status_code == 200 else {'error': 'append_failed'}
+
+    async def upload_media_finalize(self, media_id: str) -> Dict[str, Any]:
+        """Finalize chunked media upload"""
+        url = self.upload_url
+        data = {
+            'command': 'FINALIZE',
+            'media_id': media_id
+        }
+        headers = {'Authorization': self._generate_oauth_header('POST', url, data)}
+        response = await self.transport.request('POST', url, headers=headers, data=data)
+        return response.json()
+
+    async def upload_media_status(self, media_id: str) -> Dict[str, Any]:
+        """Check the processing status of a finalized upload"""
+        url = self.upload_url
+        params = {
+            'command': 'STATUS',
+            'media_id': media_id
+        }
+        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
+        response = await self.transport.request('GET', url, headers=headers, params=params)
+        return response.json()
+
+    async def wait_for_processing(self, media_id: str, processing_info: Optional[Dict[str, Any]] = None,
+                                  timeout: float = 600) -> bool:
+        """Poll STATUS (sleeping on the event loop) until media processing finishes"""
+        if processing_info is None:
+            processing_info = await self._status_processing_info(media_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            state, delay = processing_step(processing_info)
+            if state != 'pending':
+                return state == 'succeeded'
+            if time.monotonic() + delay > deadline:
+                return False
+            await asyncio.sleep(delay)
+            processing_info = await self._status_processing_info(media_id)
+
+    async def _status_processing_info(self, media_id: str) -> Optional[Dict[str, Any]]:
+        """processing_info from STATUS; None if the call failed"""
+        try:
+            return (await self.upload_media_status(media_id)).get('processing_info')
+        except Exception:
+            return None
+
+    async def create_tweet_with_media(self, text: str, media_path: str, media_type: str,
+                                      workers: int = 1) -> Dict[str, Any]:
+        """Create a tweet with media attachment (see TwitterAPI.create_tweet_with_media)"""
+        plan = await asyncio.to_thread(plan_upload, media_path, media_type)
+
+        if plan.route == 'simple':
+            media_response = await self.upload_media_simple(media_path, plan.media_type)
+            if 'media_id' in media_response or 'media_id_string' in media_response:
+                media_id = media_response.get('media_id_string', media_response.get('media_id'))
+                return await self.create_tweet(text, [str(media_id)])
+
+        uploader = self._chunked_uploader(workers)
+        media_id = await asyncio.to_thread(uploader.upload, media_path, plan.media_type, plan.media_category)
+        if not media_id:
+            raise Exception("Failed to upload media")
+        processing_info = uploader.processing_info
+        if processing_info is not None and not await self.wait_for_processing(media_id, processing_info):
+            await asyncio.to_thread(uploader.discard)
+            raise Exception("Media processing failed")
+        return await self.create_tweet(text, [media_id])
+
+    # ------------------ Rate-limited endpoints ------------------
+
+    async def rate_limits(self) -> Dict[str, Dict[str, int]]:
+        """Last known budget per endpoint (read from SQLite in a worker thread)"""
+        return await asyncio.to_thread(self.rate_store.snapshot)
+
+    async def _check_rate_limit(self, endpoint: str, response_headers: Mapping[str, str]) -> None:
+        """Store rate limit information from headers (SQLite write, so in a worker thread)"""
+        await asyncio.to_thread(self.rate_store.update, endpoint, parse_rate_limit_headers(response_headers))
+
+    async def _wait_for_rate_limit(self, endpoint: str) -> bool:
+        """Spend one request from the shared budget, sleeping on the loop until it resets if empty"""
+        while True:
+            # BEGIN IMMEDIATE can block on other processes' writers: keep it off the loop
+            wait_time = await asyncio.to_thread(self.rate_store.acquire, endpoint)
+            if wait_time <= 0:
+                return True
+            await asyncio.sleep(wait_time + 1)
+
+    async def _handle_rate_limited_request(self, method: str, url: str, endpoint_name: str,
+                                           headers: Dict[str, str], **kwargs) -> Dict[str, Any]:
+        """Handle requests for rate-limited endpoints with retry logic"""
+        max_retries = 3
+        base_delay = 1
+
+        for attempt in range(max_retries):
+            try:
+                await self._wait_for_rate_limit(endpoint_name)
+
+                if method.upper() not in ('GET', 'POST', 'DELETE'):
+                    raise ValueError(f"Unsupported HTTP method: {method}")
+                response = await self.transport.request(method.upper(), url, headers=headers, **kwargs)
+
+                await self._check_rate_limit(endpoint_name, response.headers)
+
+                if response.status_code in (200, 201):
+                    return self._json_or_error(response)
+
+                elif response.status_code == 429:
+                    if attempt < max_retries - 1:
+                        await asyncio.sleep(base_delay * (2 ** attempt))
+                        continue
+                    return {"error": "Rate limit exceeded", "status_code": 429}
+
+                else:
+                    return {"error": f"HTTP {response.status_code}", "text": response.text}
+
+            except Exception as e:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(base_delay * (2 ** attempt))
+                else:
+                    return {"error": str(e)}
+
+        return {"error": "Max retries exceeded"}
+
+    async def _cached_get(self, url: str, endpoint_name: str, params: Dict[str, str],
+                          cache_name: Optional[str] = None) -> Dict[str, Any]:
+        """GET a rate-limited endpoint through the response cache (if any)"""
+        async def fetch() -> Dict[str, Any]:
+            headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
+            return await self._handle_rate_limited_request('GET', url, endpoint_name, headers, params=params)
+        if self.cache is None:
+            return await fetch()
+        return await self.cache.aget_or_fetch(cache_name or endpoint_name, url, params, fetch,
+                                              namespace=self.namespace)
+
+    async def search_tweets(self, query: str, max_results: int = 10, tweet_fields: Optional[str] = None,
+                            next_token: Optional[str] = None) -> Dict[str, Any]:
+        """Search for recent tweets (RATE LIMITED)"""
+        url = f"{self.base_url}/2/tweets/search/recent"
+        params = {'query': query, 'max_results': str(max_results)}
+        if tweet_fields:
+            params['tweet.fields'] = tweet_fields
+        if next_token:
+            params['next_token'] = next_token
+        return await self._cached_get(url, 'search_tweets', params)
+
+    async def get_list_tweets(self, list_id: str, max_results: int = 10,
+                              pagination_token: Optional[str] = None) -> Dict[str, Any]:
+        """Get tweets from a specific list (RATE LIMITED)"""
+        url = f"{self.base_url}/2/lists/{list_id}/tweets"
+        params = {'max_results': str(max_results)}
+        if pagination_token:
+            params['pagination_token'] = pagination_token
+        return await self._cached_get(url, f'list_tweets_{list_id}', params, cache_name='list_tweets')
+
+    def aiter_search_tweets(self, query: str, max_results: int = 100, tweet_fields: Optional[str] = None,
+                            limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async iterator over every tweet matching a search (see TwitterRateLimitedAPI.iter_search_tweets)"""
+        return apaginate(lambda token: self.search_tweets(query, max_results, tweet_fields, next_token=token),
+                         lambda: self.rate_store.get('search_tweets'), limit)
+
+    def aiter_list_tweets(self, list_id: str, max_results: int = 100,
+                          limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async iterator over every tweet of a list"""
+        return apaginate(lambda token: self.get_list_tweets(list_id, max_results, pagination_token=token),
+                         lambda: self.rate_store.get(f'list_tweets_{list_id}'), limit)
+
+    async def get_user_by_username(self, username: str, user_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Get user information by username (RATE LIMITED)"""
+        url = f"{self.base_url}/2/users/by/username/{username}"
+        params: Dict[str, str] = {}
+        if user_fields:
+            params['user.fields'] = user_fields
+        return await self._cached_get(url, 'user_by_username', params)
+
+    async def get_users_by_usernames(self, usernames: List[str], user_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Get multiple users by their usernames (RATE LIMITED)"""
+        url = f"{self.base_url}/2/users/by"
+        params = {'usernames': ','.join(usernames)}
+        if user_fields:
+            params['user.fields'] = user_fields
+        return await self._cached_get(url, 'users_by_usernames', params)
+
+    async def get_rate_limit_status(self) -> Dict[str, Any]:
+        """Get current rate limit status for all tracked endpoints"""
+        return {
+            "rate_limits": await self.rate_limits(),
+            "current_time": int(time.time()),
+            "current_time_str": time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            # Counting DiskCacheBackend entries is a SQLite query too
+            "cache": await asyncio.to_thread(self.cache.stats) if self.cache is not None else None
+        }
+
+    async def get_tweet_analytics(self, tweet_ids: List[str], start_time: str, end_time: str,
+                                  analytics_fields: Optional[str] = None, granularity: str = 'day') -> Dict[str, Any]:
+        url = "https://api.twitter.com/2/tweets/analytics"
+        params = {
+            'ids': ','.join(tweet_ids),
+            'start_time': start_time,
+            'end_time': end_time,
+            'granularity': granularity
+        }
+        if analytics_fields:
+            params['analytics.fields'] = analytics_fields
+        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
+        return await self._handle_rate_limited_request('GET', url, 'tweet_analytics', headers, params=params)
+
+    async def get_media_analytics(self, media_keys: List[str], start_time: str, end_time: str,
+                                  media_analytics_fields: Optional[str] = None, granularity: str = 'day') -> Dict[str, Any]:
+        url = "https://api.twitter.com/2/media/analytics"
+        params = {
+            'media_keys': ','.join(media_keys),
+            'start_time': start_time,
+            'end_time': end_time,
+            'granularity': granularity
+        }
+        if media_analytics_fields:
+            params['media_analytics.fields'] = media_analytics_fields
+        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
+        return await self._handle_rate_limited_request('GET', url, 'media_analytics', headers, params=params)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class _BlockingUploadCalls:
+    """
+    The INIT / APPEND / FINALIZE calls ChunkedUploader makes, as blocking calls
+    that run the AsyncTwitterAPI coroutines on its loop. Only usable from threads
+    other than the loop's own (ChunkedUploader's caller and workers).
+    """
+
+    def __init__(self, api: 'AsyncTwitterAPI', loop: asyncio.AbstractEventLoop):
+        self.api = api
+        self.loop = loop
+
+    def _call(self, coro) -> Dict[str, Any]:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def upload_media_init(self, total_bytes: int, media_type: str,
+                          media_category: Optional[str] = None) -> Dict[str, Any]:
+        return self._call(self.api.upload_media_init(total_bytes, media_type, media_category))
+
+    def upload_media_append(self, media_id: str, chunk: memoryview, segment_index: int) -> Dict[str, Any]:
+        # httpx multipart takes bytes, not memoryviews; copy here rather than on the loop
+        return self._call(self.api.upload_media_append(media_id, bytes(chunk), segment_index))
+
+    def upload_media_finalize(self, media_id: str) -> Dict[str, Any]:
+        return self._call(self.api.upload_media_finalize(media_id))
+
+
+# Example usage
+async def example_async_usage():
+    """Run a handful of lookups concurrently on one event loop"""
+    async with AsyncTwitterAPI() as twitter:
+        results = await asyncio.gather(
+            twitter.search_tweets("python programming", max_results=10),
+            twitter.get_user_by_username("github"),
+            twitter.get_users_by_usernames(["github", "python"]),
+        )
+        for result in results:
+            print(result)
+        print(await twitter.get_rate_limit_status())
+
+
+if __name__ == "__main__":
+    asyncio.run(example_async_usage())
@@ -0,0 +1,174 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Iterable
+
+# /2/users/by accepts at most 100 usernames per request
+MAX_USERNAMES_PER_REQUEST = 100
+DEFAULT_WINDOW_SECS = 0.01
+
+
+def _normalize(username: str) -> str:
+    return username.strip().lstrip('@').lower()
+
+
+def fan_out_users(names: List[str], response: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a /2/users/by response into per-username results shaped like
+    /2/users/by/username/:username ({"data": user} or {"errors": [...]}).
+    """
+    if 'data' not in response and 'errors' not in response:
+        # Transport / rate-limit failure: every caller sees the same error dict
+        return {name: response for name in names}
+    found = {_normalize(user.get('username', '')): user for user in response.get('data', [])}
+    errors = {_normalize(str(err.get('value', ''))): err for err in response.get('errors', [])}
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in names:
+        if name in found:
+            results[name] = {'data': found[name]}
+        else:
+            results[name] = {'errors': [errors.get(name, {
+                'value': name, 'detail': f'Could not find user with usernames: [{name}].',
+                'title': 'Not Found Error',
+            })]}
+    return results
+
+
+class UserLookupBatcher:
+    """
+    Dataloader-style coalescing of single-user lookups.
+
+    ``get_user_by_username`` calls made within ``window`` seconds of each other
+    (from any thread) are de-duplicated, merged into ``/2/users/by`` requests of
+    up to 100 names, and each caller gets its own result back. A sequential loop
+    should use ``get_users`` (or ``submit`` + ``Future.result``) so the lookups
+    actually overlap.
+    """
+
+    def __init__(self, api, window: float = DEFAULT_WINDOW_SECS,
+                 max_batch: int = MAX_USERNAMES_PER_REQUEST):
+        self.api = api
+        self.window = window
+        self.max_batch = min(max_batch, MAX_USERNAMES_PER_REQUEST)
+        self._pending: Dict[Optional[str], Dict[str, Future]] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def submit(self, username: str, user_fields: Optional[str] = None) -> Future:
+        """Queue a lookup and return a Future for its result"""
+        name = _normalize(username)
+        full_group = None
+        with self._lock:
+            group = self._pending.setdefault(user_fields, {})
+            future = group.get(name)
+            if future is None:
+                future = group[name] = Future()
+            if len(group) >= self.max_batch:
+                full_group = self._pending.pop(user_fields)
+            elif self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full_group:
+            self._resolve(full_group, user_fields)
+        return future
+
+    def get_user_by_username(self, username: str, user_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Drop-in replacement for TwitterRateLimitedAPI.get_user_by_username"""
+        return self.submit(username, user_fields).result()
+
+    def get_users(self, usernames: Iterable[str], user_fields: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Resolve many usernames at once; returns {normalized username: result}"""
+        futures = {_normalize(name): self.submit(name, user_fields) for name in usernames}
+        self.flush()
+        return {name: future.result() for name, future in futures.items()}
+
+    def flush(self) -> None:
+        """Send everything queued so far"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        for user_fields, group in pending.items():
+            self._resolve(group, user_fields)
+
+    def _resolve(self, group: Dict[str, Future], user_fields: Optional[str]) -> None:
+        names = list(group)
+        for start in range(0, len(names), MAX_USERNAMES_PER_REQUEST):
+            chunk = names[start:start + MAX_USERNAMES_PER_REQUEST]
+            try:
+                results = fan_out_users(chunk, self.api.get_users_by_usernames(chunk, user_fields))
+            except Exception as exc:
+                for name in chunk:
+                    group[name].set_exception(exc)
+                continue
+            for name in chunk:
+                group[name].set_result(results[name])
+
+
+class AsyncUserLookupBatcher:
+    """UserLookupBatcher for AsyncTwitterAPI: coalesces lookups from concurrent coroutines"""
+
+    def __init__(self, api, window: float = DEFAULT_WINDOW_SECS,
+                 max_batch: int = MAX_USERNAMES_PER_REQUEST):
+        self.api = api
+        self.window = window
+        self.max_batch = min(max_batch, MAX_USERNAMES_PER_REQUEST)
+        self._pending: Dict[Optional[str], Dict[str, asyncio.Future]] = {}
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+    def submit(self, username: str, user_fields: Optional[str] = None) -> asyncio.Future:
+        """Queue a lookup and return a Future for its result (call from the event loop)"""
+        loop = asyncio.get_running_loop()
+        name = _normalize(username)
+        group = self._pending.setdefault(user_fields, {})
+        future = group.get(name)
+        if future is None:
+            future = group[name] = loop.create_future()
+        if len(group) >= self.max_batch:
+            self._spawn(self._resolve(self._pending.pop(user_fields), user_fields))
+        elif self._handle is None:
+            self._handle = loop.call_later(self.window, self.flush)
+        return future
+
+    async def get_user_by_username(self, username: str, user_fields: Optional[str] = None) -> Dict[str, Any]:
+        """Drop-in replacement for AsyncTwitterAPI.get_user_by_username"""
+        return await asyncio.shield(self.submit(username, user_fields))
+
+    async def get_users(self, usernames: Iterable[str], user_fields: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Resolve many usernames at once; returns {normalized username: result}"""
+        futures = {_normalize(name): self.submit(name, user_fields) for name in usernames}
+        self.flush()
+        return {name: await future for name, future in futures.items()}
+
+    def flush(self) -> None:
+        """Send everything queued so far"""
+        pending, self._pending = self._pending, {}
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        for user_fields, group in pending.items():
+            self._spawn(self._resolve(group, user_fields))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, group: Dict[str, asyncio.Future], user_fields: Optional[str]) -> None:
+        names = list(group)
+        chunks = [names[i:i + MAX_USERNAMES_PER_REQUEST] for i in range(0, len(names), MAX_USERNAMES_PER_REQUEST)]
+        responses = await asyncio.gather(*(self.api.get_users_by_usernames(chunk, user_fields) for chunk in chunks),
+                                         return_exceptions=True)
+        for chunk, response in zip(chunks, responses):
+            if isinstance(response, BaseException):
+                for name in chunk:
+                    if not group[name].done():
+                        group[name].set_exception(response)
+                continue
+            results = fan_out_users(chunk, response)
+            for name in chunk:
+                if not group[name].done():
+                    group[name].set_result(results[name])
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Optional, Dict, Any, List, Iterable, Callable, Union
+
+# Per-user write budgets (requests per 15 minutes). The real numbers arrive in the
+# response headers; these only seed the shared store so the first burst is paced too.
+WRITE_LIMITS: Dict[str, int] = {
+    'create_tweet': 200,
+    'delete_tweet': 50,
+}
+WRITE_WINDOW_SECS = 15 * 60
+PROGRESS_INTERVAL_SECS = 5.0
+
+
+def operation_key(op: Dict[str, Any]) -> str:
+    """
+    Stable identity of an operation, used to skip it when a run is resumed.
+    Creates are keyed on their content so a retried run never double-posts.
+    """
+    if op.get('key'):
+        return str(op['key'])
+    if op['action'] == 'delete':
+        return f"delete:{op['tweet_id']}"
+    content = json.dumps([op.get('text', ''), op.get('media_ids') or []])
+    return 'create:' + hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+class BulkJournal:
+    """
+    Append-only JSON Lines record of finished operations.
+
+    One line per item, written as soon as the item completes, so a crashed or
+    interrupted run can be restarted with the same journal and only the
+    operations without a successful line are sent again. Creates whose request
+    failed in flight are recorded as ``unknown``: they may have been posted, so
+    a rerun leaves them for the caller to reconcile. The file doubles as the
+    per-item report.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _latest(self) -> Dict[str, Dict[str, Any]]:
+        """Last meaningful record per operation key (a success is never overridden)"""
+        latest: Dict[str, Dict[str, Any]] = {}
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn last line from a crash
+                        continue
+                    if not latest.get(record['key'], {}).get('ok'):
+                        latest[record['key']] = record
+        except OSError:
+            pass
+        return latest
+
+    def completed(self) -> Dict[str, Dict[str, Any]]:
+        """Successful results recorded so far, by operation key"""
+        return {key: record for key, record in self._latest().items() if record.get('ok')}
+
+    def unknown(self) -> Dict[str, Dict[str, Any]]:
+        """Operations whose last attempt may or may not have been applied, by operation key"""
+        return {key: record for key, record in self._latest().items() if record.get('unknown')}
+
+    def record(self, result: Dict[str, Any]) -> None:
+        line = json.dumps(result, ensure_ascii=False) + '\n'
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+
+
+def print_progress(stats: Dict[str, Any]) -> None:
+    """Default progress reporter (stderr: stdout carries the MCP stdio protocol)"""
+    total = f"/{stats['total']}" if stats.get('total') else ''
+    print(f"[bulk] {stats['done']}{total} done  ok={stats['ok']} failed={stats['failed']} "
+          f"skipped={stats['skipped']}  {stats['rate']:.2f} ops/s  elapsed={stats['elapsed']:.0f}s", file=sys.stderr)
+
+
+class BulkTweetRunner:
+    """
+    Runs many create/delete operations with bounded concurrency.
+
+    Operations are dicts: ``{'action': 'create', 'text': ..., 'media_ids': [...]}``
+    or ``{'action': 'delete', 'tweet_id': ...}`` (an optional ``key`` overrides
+    the resume identity). Every request spends from the client's shared rate
+    store, so workers queue behind the 15-minute write budget instead of
+    collecting 429s; a failed item is recorded and the run carries on.
+    """
+
+    def __init__(self, api, workers: int = 4, journal: Optional[Union[BulkJournal, str]] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = print_progress,
+                 progress_interval: float = PROGRESS_INTERVAL_SECS):
+        """
+        Args:
+            api: TwitterRateLimitedAPI (its rate store paces the writes)
+            workers: Operations in flight at once
+            journal: BulkJournal or path of one; enables resuming and the on-disk report
+            progress: Called with running stats every progress_interval seconds and at the end
+            progress_interval: Seconds between progress reports
+        """
+        self.api = api
+        self.workers = max(1, workers)
+        self.journal = BulkJournal(journal) if isinstance(journal, str) else journal
+        self.progress = progress
+        self.progress_interval = progress_interval
+        for endpoint, limit in WRITE_LIMITS.items():
+            api.rate_store.ensure(endpoint, limit, WRITE_WINDOW_SECS)
+
+    def _send(self, op: Dict[str, Any]) -> Dict[str, Any]:
+        api = self.api
+        if op['action'] == 'create':
+            url = f"{api.base_url}/2/tweets"
+            payload: Dict[str, Any] = {'text': op['text']}
+            if op.get('media_ids'):
+                payload['media'] = {'media_ids': op['media_ids']}
+            headers = {'Content-Type': 'application/json',
+                       'Authorization': api._generate_oauth_header('POST', url)}
+            # Sent once: after a transport error the tweet may exist, and a blind retry could post it twice
+            return api._handle_rate_limited_request('POST', url, 'create_tweet', headers, retry_errors=False,
+                                                    json=payload)
+        if op['action'] == 'delete':
+            url = f"{api.base_url}/2/tweets/{op['tweet_id']}"
+            headers = {'Authorization': api._generate_oauth_header('DELETE', url)}
+            return api._handle_rate_limited_request('DELETE', url, 'delete_tweet', headers)
+        raise ValueError(f"Unsupported bulk action: {op['action']}")
+
+    def _execute(self, op: Dict[str, Any], key: str) -> Dict[str, Any]:
+        started = time.time()
+        try:
+            response = self._send(op)
+        except Exception as e:
+            response = {'error': str(e)}
+        result: Dict[str, Any] = {'key': key, 'action': op.get('action'), 'ok': False,
+                                  'elapsed': round(time.time() - started, 3)}
+        data = response.get('data') if isinstance(response, dict) else None
+        if op.get('action') == 'create' and data and data.get('id'):
+            result.update(ok=True, tweet_id=data['id'])
+        elif op.get('action') == 'delete' and data and data.get('deleted'):
+            result.update(ok=True, tweet_id=str(op['tweet_id']))
+        else:
+            if op.get('tweet_id'):
+                result['tweet_id'] = str(op['tweet_id'])
+            if isinstance(response, dict) and response.get('transport_error'):
+                result['unknown'] = True
+            result['error'] = response
+        return result
+
+    def run(self, operations: Iterable[Dict[str, Any]], total: Optional[int] = None,
+            retry_unknown: bool = False) -> Dict[str, Any]:
+        """
+        Execute every operation and return the report
+
+        Args:
+            operations: Any iterable (a generator is consumed lazily)
+            total: Number of operations, if known, for progress output
+            retry_unknown: Resend operations the journal marks ``unknown`` (check
+                first that they were not applied, or they may run twice)
+
+        Returns:
+            {'ok', 'failed', 'unknown', 'skipped', 'elapsed', 'rate', 'results': [...]};
+            results holds one dict per operation in completion order. ``unknown``
+            counts creates that failed in flight, included in ``failed``. A repeat of an
+            operation earlier in the same run is not sent and is reported as
+            ``{'ok': False, 'skipped': True, 'duplicate': True}``.
+        """
+        completed = self.journal.completed() if self.journal else {}
+        if self.journal and not retry_unknown:
+            completed.update(self.journal.unknown())
+        results: List[Dict[str, Any]] = []
+        stats = {'done': 0, 'ok': 0, 'failed': 0, 'unknown': 0, 'skipped': 0, 'total': total, 'rate': 0.0,
+                 'elapsed': 0.0}
+        start = last_report = time.time()
+
+        def report(force: bool = False) -> None:
+            nonlocal last_report
+            now = time.time()
+            stats['elapsed'] = now - start
+            sent = stats['ok'] + stats['failed']
+            stats['rate'] = sent / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+            if self.progress and (force or now - last_report >= self.progress_interval):
+                last_report = now
+                self.progress(dict(stats))
+
+        def collect(future) -> None:
+            result = future.result()
+            results.append(result)
+            stats['ok' if result['ok'] else 'failed'] += 1
+            if result.get('unknown'):
+                stats['unknown'] += 1
+            stats['done'] += 1
+            if self.journal:
+                self.journal.record(result)
+            report()
+
+        in_flight = set()
+        seen = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='twitter-bulk') as pool:
+            for op in operations:
+                key = operation_key(op)
+                if key in completed:
+                    results.append({**completed[key], 'skipped': True})
+                    stats['skipped'] += 1
+                    stats['done'] += 1
+                    continue
+                if key in seen:
+                    # Nothing was sent for it; the first occurrence's result is the real one
+                    results.append({'key': key, 'ok': False, 'skipped': True, 'duplicate': True})
+                    stats['skipped'] += 1
+                    stats['done'] += 1
+                    continue
+                seen.add(key)
+                # Keep at most 2x workers queued so a huge generator isn't materialised
+                while len(in_flight) >= self.workers * 2:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(future)
+                in_flight.add(pool.submit(self._execute, op, key))
+            for future in in_flight:
+                collect(future)
+        report(force=True)
+        return {
+            'ok': stats['ok'],
+            'failed': stats['failed'],
+            'unknown': stats['unknown'],
+            'skipped': stats['skipped'],
+            'elapsed': round(stats['elapsed'], 3),
+            'rate': round(stats['rate'], 3),
+            'results': results,
+        }
@@ -0,0 +1,255 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+
+# Seconds a response stays fresh, per endpoint. Search/list results move quickly,
+# user profiles hardly at all.
+DEFAULT_TTLS: Dict[str, float] = {
+    'search_tweets': 60,
+    'list_tweets': 60,
+    'user_by_username': 15 * 60,
+    'users_by_usernames': 15 * 60,
+}
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+# Comma-separated parameters whose order (and case, for usernames) doesn't matter
+_SET_PARAMS = {'tweet.fields', 'user.fields', 'expansions', 'media.fields'}
+_CASELESS_SET_PARAMS = {'usernames'}
+
+
+class MemoryCacheBackend:
+    """
+    In-process TTL cache with least-recently-used eviction. Values are copied in
+    and out, so callers mutating a response can't change what later hits see.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            now = time.time()
+            for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+                del self._entries[key]
+            return len(self._entries)
+
+
+class DiskCacheBackend:
+    """
+    SQLite-backed cache that survives restarts and can be shared between
+    processes. Values must be JSON-serialisable; eviction is LRU by last access.
+    Clients of different accounts can share one file: ResponseCache keys carry
+    the credential namespace.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: int = 10 * DEFAULT_MAX_ENTRIES):
+        self.path = path or os.getenv('TWITTER_CACHE_DB',
+                                      os.path.join(os.path.dirname(__file__), '.twitter_cache.sqlite3'))
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+            'expires REAL NOT NULL, accessed REAL NOT NULL)')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute('SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] <= now:
+            conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE cache SET accessed = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute('INSERT OR REPLACE INTO cache (key, value, expires, accessed) VALUES (?, ?, ?, ?)',
+                     (key, json.dumps(value), now + ttl, now))
+        conn.execute('DELETE FROM cache WHERE expires <= ?', (now,))
+        conn.execute('DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed DESC '
+                     'LIMIT -1 OFFSET ?)', (self.max_entries,))
+
+    def clear(self) -> None:
+        self._connect().execute('DELETE FROM cache')
+
+    def __len__(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM cache WHERE expires > ?', (time.time(),)).fetchone()[0]
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """Canonical form of request parameters so equivalent requests share a cache key"""
+    normalized: Dict[str, str] = {}
+    for key, value in params.items():
+        value = str(value).strip()
+        if key in _CASELESS_SET_PARAMS:
+            value = ','.join(sorted({v.strip().lstrip('@').lower() for v in value.split(',') if v.strip()}))
+        elif key in _SET_PARAMS:
+            value = ','.join(sorted({v.strip() for v in value.split(',') if v.strip()}))
+        normalized[key] = value
+    return normalized
+
+
+class ResponseCache:
+    """
+    Read-through cache for rate-limited GET endpoints.
+
+    Responses are keyed on the account's credential namespace, the endpoint, URL
+    and normalized parameters (one account never sees another's results, e.g.
+    protected tweets) and kept for the endpoint's TTL. Error responses are never stored. Concurrent identical
+    requests share one in-flight fetch (threads and coroutines alike), and hit /
+    miss counters are exposed through ``stats``.
+    """
+
+    def __init__(self, backend=None, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, Future] = {}
+        self._async_inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(endpoint: str, url: str, params: Dict[str, Any], namespace: str = 'default') -> str:
+        return f"{namespace} {endpoint} {url} {json.dumps(normalize_params(params), sort_keys=True)}"
+
+    def _ttl(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def _cacheable(self, endpoint: str, result: Dict[str, Any]) -> bool:
+        return 'error' not in result and self._ttl(endpoint) > 0
+
+    def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def get_or_fetch(self, endpoint: str, url: str, params: Dict[str, Any],
+                     fetch: Callable[[], Dict[str, Any]], namespace: str = 'default') -> Dict[str, Any]:
+        """Return a fresh cached response, or call ``fetch`` (once per key across threads)"""
+        key = self.make_key(endpoint, url, params, namespace)
+        value = self._lookup(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            leader = self._inflight.get(key)
+            if leader is None:
+                future = self._inflight[key] = Future()
+            else:
+                self.coalesced += 1
+        if leader is not None:
+            return leader.result()
+
+        try:
+            result = fetch()
+            if self._cacheable(endpoint, result):
+                self.backend.set(key, result, self._ttl(endpoint))
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    async def aget_or_fetch(self, endpoint: str, url: str, params: Dict[str, Any],
+                            fetch: Callable[[], Awaitable[Dict[str, Any]]],
+                            namespace: str = 'default') -> Dict[str, Any]:
+        """
+        Async variant of get_or_fetch; coroutines asking for the same key await one
+        fetch. Backend reads and writes (SQLite for DiskCacheBackend) run in worker threads.
+        """
+        key = self.make_key(endpoint, url, params, namespace)
+        value = await asyncio.to_thread(self._lookup, key)
+        if value is not None:
+            return value
+
+        leader = self._async_inflight.get(key)
+        if leader is not None:
+            self.coalesced += 1
+            return await asyncio.shield(leader)
+
+        future = self._async_inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fetch()
+            if self._cacheable(endpoint, result):
+                await asyncio.to_thread(self.backend.set, key, result, self._ttl(endpoint))
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Mark retrieved so an unawaited leader failure doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._async_inflight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0,
+            'entries': len(self.backend),
+        }
+
+    def clear(self) -> None:
+        self.backend.clear()
@@ -0,0 +1,194 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List, Iterable
+
+TWEET_INDEX_DB = os.getenv('TWITTER_INDEX_DB',
+                           os.path.join(os.path.dirname(__file__), '.twitter_index.sqlite3'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tweets (
+    id         INTEGER PRIMARY KEY,
+    author_id  TEXT,
+    created_at TEXT,
+    text       TEXT NOT NULL DEFAULT '',
+    data       TEXT NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS tweets_fts USING fts5(text, content='tweets', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS tweets_ai AFTER INSERT ON tweets BEGIN
+    INSERT INTO tweets_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS tweets_au AFTER UPDATE OF text ON tweets BEGIN
+    INSERT INTO tweets_fts (tweets_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO tweets_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TABLE IF NOT EXISTS feeds (
+    feed      TEXT PRIMARY KEY,
+    newest_id INTEGER,
+    oldest_id INTEGER,
+    refreshed REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS feed_cursors (
+    feed           TEXT PRIMARY KEY,
+    synced_id      INTEGER,
+    next_token     TEXT,
+    pending_newest INTEGER
+);
+CREATE TABLE IF NOT EXISTS feed_tweets (
+    feed     TEXT NOT NULL,
+    tweet_id INTEGER NOT NULL,
+    PRIMARY KEY (feed, tweet_id)
+) WITHOUT ROWID;
+"""
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    return int(value) if value is not None else None
+
+
+def _str_or_none(value: Optional[int]) -> Optional[str]:
+    return str(value) if value is not None else None
+
+
+def search_feed(query: str) -> str:
+    """Feed key under which the results of a search query are recorded"""
+    return 'search:' + ' '.join(query.split())
+
+
+class TweetIndex:
+    """
+    Local SQLite store of every tweet the client has fetched.
+
+    Tweets are de-duplicated by ID (later fetches merge their fields into the
+    stored object) and their text is indexed with FTS5. Each *feed* - a search
+    query or a list - remembers which tweets it returned and the newest ID seen.
+    Its cursor records the ID up to which it is complete (the next ``since_id``)
+    and, while a refresh was cut short, the ``next_token`` to continue from, so
+    a capped refresh never leaves a hole in the feed.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: float = 30.0):
+        self.path = path or TWEET_INDEX_DB
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def add_tweets(self, tweets: Iterable[Dict[str, Any]], feed: Optional[str] = None) -> int:
+        """
+        Store tweets (the ``data`` list of a v2 response) and optionally record
+        them as members of ``feed``. Returns the number of tweets not seen before.
+        """
+        rows = [(int(t['id']), t.get('author_id'), t.get('created_at'), t.get('text', ''), json.dumps(t))
+                for t in tweets if t.get('id')]
+        if not rows:
+            return 0
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # rowcount, not total_changes: the FTS triggers' writes would be counted too
+            existing = [row for row in rows
+                        if conn.execute('INSERT OR IGNORE INTO tweets (id, author_id, created_at, text, data) '
+                                        'VALUES (?, ?, ?, ?, ?)', row).rowcount == 0]
+            added = len(rows) - len(existing)
+            if existing:
+                # Already indexed: merge in whatever fields this fetch asked for
+                conn.executemany(
+                    'UPDATE tweets SET author_id = coalesce(?, author_id), created_at = coalesce(?, created_at), '
+                    'text = ?, data = json_patch(data, ?) WHERE id = ?',
+                    [(author, created, text, data, tweet_id) for tweet_id, author, created, text, data in existing])
+            if feed is not None:
+                ids = [row[0] for row in rows]
+                conn.executemany('INSERT OR IGNORE INTO feed_tweets (feed, tweet_id) VALUES (?, ?)',
+                                 [(feed, tweet_id) for tweet_id in ids])
+                conn.execute(
+                    'INSERT INTO feeds (feed, newest_id, oldest_id) VALUES (?, ?, ?) '
+                    'ON CONFLICT (feed) DO UPDATE SET newest_id = max(coalesce(newest_id, 0), excluded.newest_id), '
+                    'oldest_id = min(coalesce(oldest_id, excluded.oldest_id), excluded.oldest_id)',
+                    (feed, max(ids), min(ids)))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return added
+
+    def mark_refreshed(self, feed: str, when: Optional[float] = None) -> None:
+        """Record that ``feed`` was brought up to date with the API"""
+        self._connect().execute(
+            'INSERT INTO feeds (feed, refreshed) VALUES (?, ?) '
+            'ON CONFLICT (feed) DO UPDATE SET refreshed = excluded.refreshed',
+            (feed, when if when is not None else time.time()))
+
+    def save_cursor(self, feed: str, synced_id: Optional[str], next_token: Optional[str] = None,
+                    pending_newest: Optional[str] = None) -> None:
+        """
+        Record that ``feed`` holds every tweet up to ``synced_id``. ``next_token``
+        and ``pending_newest`` describe an unfinished pagination above it: where
+        to continue and the newest ID that pagination started from.
+        """
+        self._connect().execute(
+            'INSERT OR REPLACE INTO feed_cursors (feed, synced_id, next_token, pending_newest) VALUES (?, ?, ?, ?)',
+            (feed, _int_or_none(synced_id), next_token, _int_or_none(pending_newest)))
+
+    def feed_state(self, feed: str) -> Optional[Dict[str, Any]]:
+        """newest_id / oldest_id / refreshed and the cursor of a feed, or None if it was never fetched"""
+        row = self._connect().execute(
+            'SELECT f.newest_id, f.oldest_id, f.refreshed, c.synced_id, c.next_token, c.pending_newest '
+            'FROM feeds f LEFT JOIN feed_cursors c ON c.feed = f.feed WHERE f.feed = ?', (feed,)).fetchone()
+        if row is None:
+            return None
+        return {
+            'newest_id': _str_or_none(row[0]),
+            'oldest_id': _str_or_none(row[1]),
+            'refreshed': row[2],
+            'synced_id': _str_or_none(row[3]),
+            'next_token': row[4],
+            'pending_newest': _str_or_none(row[5]),
+        }
+
+    def feed_tweets(self, feed: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Tweets recorded for a feed, newest first"""
+        rows = self._connect().execute(
+            'SELECT t.data FROM feed_tweets f JOIN tweets t ON t.id = f.tweet_id '
+            'WHERE f.feed = ? ORDER BY f.tweet_id DESC LIMIT ?',
+            (feed, -1 if limit is None else limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def search(self, match: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Full-text search over every indexed tweet, newest first.
+
+        ``match`` uses FTS5 query syntax (``python AND asyncio``, ``"exact phrase"``,
+        ``rust*``), not Twitter search operators.
+        """
+        rows = self._connect().execute(
+            'SELECT t.data FROM tweets_fts JOIN tweets t ON t.id = tweets_fts.rowid '
+            'WHERE tweets_fts MATCH ? ORDER BY t.id DESC LIMIT ?', (match, limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get(self, tweet_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute('SELECT data FROM tweets WHERE id = ?', (int(tweet_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __len__(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM tweets').fetchone()[0]
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,328 @@
+import hashlib
+import json
+import math
+import mimetypes
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple, NamedTuple
+
+# Twitter accepts APPEND segments of up to 5 MB
+MIN_CHUNK_SIZE = 1024 * 1024
+MAX_CHUNK_SIZE = 5 * 1024 * 1024
+MAX_SEGMENTS = 999
+CHUNK_ALIGNMENT = 256 * 1024
+# Aim for a few segments per worker so a slow segment doesn't leave the pool idle
+TARGET_SEGMENTS_PER_WORKER = 4
+
+JOURNAL_DIR = os.getenv('TWITTER_UPLOAD_JOURNAL_DIR',
+                        os.path.join(os.path.dirname(__file__), '.twitter_upload_journal'))
+# Don't try to resume a media_id that is about to expire on Twitter's side
+EXPIRY_MARGIN_SECS = 300
+# Assumed lifetime of a media_id when INIT/FINALIZE don't say (Twitter keeps uploads for 24h)
+DEFAULT_EXPIRES_AFTER_SECS = 24 * 60 * 60
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+
+# upload.json without INIT/APPEND only takes still images up to 5 MB
+SIMPLE_UPLOAD_MAX_BYTES = 5 * 1024 * 1024
+# Polling interval used when FINALIZE/STATUS omit check_after_secs
+DEFAULT_CHECK_AFTER_SECS = 1
+
+_MAGIC_NUMBERS = [
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'\x1aE\xdf\xa3', 'video/webm'),
+]
+
+
+class UploadPlan(NamedTuple):
+    route: str  # 'simple' or 'chunked'
+    media_type: str
+    media_category: str
+    total_bytes: int
+
+
+def choose_chunk_size(total_bytes: int, workers: int = 1) -> int:
+    """
+    Pick an APPEND segment size for a file.
+
+    Small files stay at 1 MB; larger ones grow the segment (up to the 5 MB API
+    maximum) so that each worker gets roughly TARGET_SEGMENTS_PER_WORKER segments
+    and the upload never exceeds MAX_SEGMENTS.
+    """
+    target = math.ceil(total_bytes / max(1, workers * TARGET_SEGMENTS_PER_WORKER))
+    target = max(target, math.ceil(total_bytes / MAX_SEGMENTS))
+    target = math.ceil(target / CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT
+    return min(MAX_CHUNK_SIZE, max(MIN_CHUNK_SIZE, target))
+
+
+def plan_segments(total_bytes: int, chunk_size: int) -> List[Tuple[int, int, int]]:
+    """Split a file into (segment_index, offset, length) tuples"""
+    return [(index, offset, min(chunk_size, total_bytes - offset))
+            for index, offset in enumerate(range(0, total_bytes, chunk_size))]
+
+
+def sniff_media_type(media_path: str, declared: Optional[str] = None) -> str:
+    """Detect the MIME type from the file header, falling back to the extension / declared type"""
+    with open(media_path, 'rb') as f:
+        head = f.read(16)
+    for magic, mime in _MAGIC_NUMBERS:
+        if head.startswith(magic):
+            return mime
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    if head[4:8] == b'ftyp':
+        return 'video/quicktime' if head[8:12] == b'qt  ' else 'video/mp4'
+    guessed, _ = mimetypes.guess_type(media_path)
+    return guessed or declared or 'application/octet-stream'
+
+
+def plan_upload(media_path: str, media_type: Optional[str] = None) -> UploadPlan:
+    """
+    Decide up front how a file should be uploaded.
+
+    Still images up to SIMPLE_UPLOAD_MAX_BYTES go through the one-shot upload;
+    GIFs, videos and larger images use INIT/APPEND/FINALIZE with a media_category
+    so Twitter processes them asynchronously.
+    """
+    total_bytes = os.path.getsize(media_path)
+    sniffed = sniff_media_type(media_path, media_type)
+    if sniffed == 'image/gif':
+        category = 'tweet_gif'
+    elif sniffed.startswith('video/'):
+        category = 'tweet_video'
+    else:
+        category = 'tweet_image'
+    simple = category == 'tweet_image' and total_bytes <= SIMPLE_UPLOAD_MAX_BYTES
+    return UploadPlan('simple' if simple else 'chunked', sniffed, category, total_bytes)
+
+
+def processing_step(processing_info: Optional[Dict[str, Any]]) -> Tuple[str, float]:
+    """
+    Interpret a FINALIZE/STATUS ``processing_info`` block.
+
+    Returns ``(state, delay)`` where state is 'succeeded', 'failed' or 'pending'
+    and delay is the server-suggested wait before the next STATUS call. A
+    missing block (an error response, or STATUS without processing state)
+    counts as failed: callers only poll media that FINALIZE said is processing.
+    """
+    if not processing_info:
+        return 'failed', 0
+    state = processing_info.get('state')
+    if state in ('succeeded', 'failed'):
+        return state, 0
+    return 'pending', processing_info.get('check_after_secs', DEFAULT_CHECK_AFTER_SECS)
+
+
+def content_digest(view: memoryview) -> str:
+    """SHA-256 of the (memory-mapped) file contents"""
+    digest = hashlib.sha256()
+    for offset in range(0, len(view), HASH_BLOCK_SIZE):
+        digest.update(view[offset:offset + HASH_BLOCK_SIZE])
+    return digest.hexdigest()
+
+
+class UploadJournal:
+    """
+    On-disk checkpoints for chunked uploads, one JSON file per account and file
+    content hash (a media_id is only valid for the account that INITed it).
+
+    Each entry records the media_id, when Twitter expires it, the segment size
+    and which segments were acknowledged, so an interrupted upload can continue
+    from the first missing segment (even from a new process). Entries are
+    rewritten atomically and dropped once they expire.
+    """
+
+    def __init__(self, directory: Optional[str] = None, namespace: str = 'default'):
+        self.directory = directory or JOURNAL_DIR
+        self.namespace = namespace
+        self._lock = threading.Lock()
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, f"{self.namespace}.{digest}.json")
+
+    def _write(self, entry: Dict[str, Any]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(entry['digest'])
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    def load(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Return the live entry for a content hash, or None"""
+        try:
+            with open(self._path(digest)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('expires_at', 0) - EXPIRY_MARGIN_SECS <= time.time():
+            self.discard(digest)
+            return None
+        entry['acked'] = set(entry.get('acked', []))
+        return entry
+
+    def start(self, digest: str, media_id: str, media_type: str, total_bytes: int,
+              chunk_size: int, expires_after_secs: int) -> Dict[str, Any]:
+        """Record a freshly INITed upload"""
+        entry = {
+            'digest': digest,
+            'media_id': media_id,
+            'media_type': media_type,
+            'total_bytes': total_bytes,
+            'chunk_size': chunk_size,
+            'expires_at': time.time() + expires_after_secs,
+            'acked': set(),
+            'finalized': False,
+        }
+        self.save(entry)
+        return entry
+
+    def save(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._write({**entry, 'acked': sorted(entry['acked'])})
+
+    def ack(self, entry: Dict[str, Any], segment_index: int) -> None:
+        """Mark one segment as acknowledged by the server"""
+        with self._lock:
+            entry['acked'].add(segment_index)
+            self._write({**entry, 'acked': sorted(entry['acked'])})
+
+    def mark_finalized(self, entry: Dict[str, Any], expires_after_secs: Optional[int] = None) -> None:
+        """Keep the finalized media_id around so a retried tweet can reuse it"""
+        entry['finalized'] = True
+        if expires_after_secs:
+            entry['expires_at'] = time.time() + expires_after_secs
+        self.save(entry)
+
+    def discard(self, digest: str) -> None:
+        try:
+            os.remove(self._path(digest))
+        except OSError:
+            pass
+
+    def prune(self) -> None:
+        """Remove every expired entry of this namespace"""
+        if not os.path.isdir(self.directory):
+            return
+        prefix = f"{self.namespace}."
+        for name in os.listdir(self.directory):
+            if name.startswith(prefix) and name.endswith('.json'):
+                self.load(name[len(prefix):-len('.json')])
+
+
+class ChunkedUploader:
+    """
+    INIT / APPEND / FINALIZE driver used by TwitterAPI.upload_media_chunked.
+
+    The file is memory-mapped and every segment is sent as a memoryview slice of
+    the mapping, so no per-segment copy is made on our side. With ``workers > 1``
+    segments are sent concurrently through a bounded thread pool. A failed APPEND
+    is retried on its own (with exponential back-off) instead of restarting the
+    whole upload. With a ``journal`` every acknowledged segment is checkpointed,
+    and a later upload of the same content resumes from the missing segments.
+    """
+
+    def __init__(self, api, workers: int = 1, chunk_size: Optional[int] = None,
+                 max_segment_retries: int = 3, retry_delay: float = 1.0,
+                 journal: Optional[UploadJournal] = None):
+        if chunk_size is not None and not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {MAX_CHUNK_SIZE} bytes")
+        self.api = api
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.max_segment_retries = max_segment_retries
+        self.retry_delay = retry_delay
+        self.journal = journal
+        # processing_info from the last FINALIZE, for callers that need to poll STATUS
+        self.processing_info: Optional[Dict[str, Any]] = None
+        self._digest: Optional[str] = None
+
+    def _append_segment(self, entry: Dict[str, Any], view: memoryview, segment: Tuple[int, int, int]) -> bool:
+        """Send one segment, retrying just this segment on failure"""
+        index, offset, length = segment
+        with view[offset:offset + length] as chunk:
+            for attempt in range(self.max_segment_retries + 1):
+                try:
+                    if 'error' not in self.api.upload_media_append(entry['media_id'], chunk, index):
+                        if self.journal:
+                            self.journal.ack(entry, index)
+                        return True
+                except Exception:
+                    pass
+                if attempt < self.max_segment_retries:
+                    time.sleep(self.retry_delay * (2 ** attempt))
+        return False
+
+    def _append_all(self, entry: Dict[str, Any], view: memoryview, segments: List[Tuple[int, int, int]]) -> bool:
+        if self.workers == 1 or len(segments) <= 1:
+            return all(self._append_segment(entry, view, segment) for segment in segments)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(segments)),
+                                thread_name_prefix='twitter-append') as pool:
+            results = list(pool.map(lambda segment: self._append_segment(entry, view, segment), segments))
+        return all(results)
+
+    def _resume_or_init(self, digest: Optional[str], media_size: int, media_type: str,
+                        media_category: Optional[str]) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Pick up a journaled upload of the same content, or INIT a new one; returns (entry, resumed)"""
+        if self.journal and digest:
+            entry = self.journal.load(digest)
+            if entry and entry['total_bytes'] == media_size and entry['media_type'] == media_type:
+                return entry, True
+
+        init = self.api.upload_media_init(media_size, media_type, media_category)
+        media_id = init.get('media_id_string') or init.get('media_id')
+        if not media_id:
+            return None, False
+        chunk_size = self.chunk_size or choose_chunk_size(media_size, self.workers)
+        if self.journal and digest:
+            return self.journal.start(digest, str(media_id), media_type, media_size, chunk_size,
+                                      int(init.get('expires_after_secs') or DEFAULT_EXPIRES_AFTER_SECS)), False
+        return {'media_id': str(media_id), 'chunk_size': chunk_size, 'acked': set(), 'finalized': False}, False
+
+    def _discard(self, digest: Optional[str]) -> None:
+        if self.journal and digest:
+            self.journal.discard(digest)
+
+    def discard(self) -> None:
+        """Forget the last upload's checkpoint, e.g. once Twitter failed to process the media"""
+        self._discard(self._digest)
+
+    def upload(self, media_path: str, media_type: str, media_category: Optional[str] = None) -> Optional[str]:
+        """Upload a file and return its media ID, or None on failure"""
+        self.processing_info = None
+        self._digest = None
+        media_size = os.path.getsize(media_path)
+        if media_size == 0:
+            return None
+        with open(media_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                digest = self._digest = content_digest(view) if self.journal else None
+                entry, resumed = self._resume_or_init(digest, media_size, media_type, media_category)
+                if entry is None:
+                    return None
+                if entry['finalized']:
+                    # Processing may still be running from the earlier attempt; check STATUS right away
+                    if media_category in ('tweet_video', 'tweet_gif'):
+                        self.processing_info = {'state': 'pending', 'check_after_secs': 0}
+                    return entry['media_id']
+                segments = [segment for segment in plan_segments(media_size, entry['chunk_size'])
+                            if segment[0] not in entry['acked']]
+                if not self._append_all(entry, view, segments):
+                    if resumed:
+                        # The journaled media_id may no longer be accepted; INIT afresh next time
+                        self._discard(digest)
+                    return None
+
+        finalize = self.api.upload_media_finalize(entry['media_id'])
+        if 'error' in finalize:
+            self._discard(digest)
+            return None
+        self.processing_info = finalize.get('processing_info')
+        if self.journal:
+            self.journal.mark_finalized(entry, finalize.get('expires_after_secs'))
+        return entry['media_id']
@@ -0,0 +1,107 @@
+import asyncio
+import json
+import time
+from typing import Optional, Dict, Any, Callable, Iterator, Iterable, AsyncIterator, Awaitable
+
+# Start spreading requests out once less than this share of the window's budget is left
+PACE_THRESHOLD = 0.5
+
+
+def pace_delay(rate_info: Optional[Dict[str, int]], now: Optional[float] = None) -> float:
+    """
+    Seconds to wait before the next page so the remaining budget lasts until the
+    window resets. Zero while more than PACE_THRESHOLD of the budget is left.
+    """
+    if not rate_info or 'remaining' not in rate_info or 'reset' not in rate_info:
+        return 0.0
+    remaining, limit = rate_info['remaining'], rate_info.get('limit')
+    if limit and remaining > limit * PACE_THRESHOLD:
+        return 0.0
+    time_left = rate_info['reset'] - (now if now is not None else time.time())
+    if time_left <= 0 or remaining <= 0:
+        # exhausted budgets are handled by the rate limiter itself
+        return 0.0
+    return time_left / remaining
+
+
+def _check_page(page: Dict[str, Any]) -> None:
+    if 'error' in page:
+        raise RuntimeError(f"Pagination stopped: {page}")
+
+
+def paginate(fetch_page: Callable[[Optional[str]], Dict[str, Any]],
+             rate_info: Optional[Callable[[], Optional[Dict[str, int]]]] = None,
+             limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily yield items from a v2 endpoint that pages with ``meta.next_token``.
+
+    Args:
+        fetch_page: Called with the pagination token (None for the first page)
+        rate_info: Returns the endpoint's current budget, used for pacing
+        limit: Stop after this many items
+
+    Only one page is held in memory at a time. Raises RuntimeError when a page
+    comes back as an error.
+    """
+    token: Optional[str] = None
+    count = 0
+    while True:
+        if token is not None and rate_info is not None:
+            delay = pace_delay(rate_info())
+            if delay:
+                time.sleep(delay)
+        page = fetch_page(token)
+        _check_page(page)
+        for item in page.get('data', []):
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+        token = page.get('meta', {}).get('next_token')
+        if not token:
+            return
+
+
+async def apaginate(fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]],
+                    rate_info: Optional[Callable[[], Optional[Dict[str, int]]]] = None,
+                    limit: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+    """Async-iterator version of ``paginate``; pacing uses asyncio.sleep"""
+    token: Optional[str] = None
+    count = 0
+    while True:
+        if token is not None and rate_info is not None:
+            delay = pace_delay(await asyncio.to_thread(rate_info))
+            if delay:
+                await asyncio.sleep(delay)
+        page = await fetch_page(token)
+        _check_page(page)
+        for item in page.get('data', []):
+            yield item
+            count += 1
+            if limit is not None and count >= limit:
+                return
+        token = page.get('meta', {}).get('next_token')
+        if not token:
+            return
+
+
+def write_jsonl(items: Iterable[Dict[str, Any]], path: str) -> int:
+    """Stream items to a JSON Lines file as they arrive; returns the number written"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+
+async def awrite_jsonl(items: AsyncIterator[Dict[str, Any]], path: str) -> int:
+    """Async counterpart of write_jsonl"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        async for item in items:
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
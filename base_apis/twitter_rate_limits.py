@@ -1,132 +1,87 @@
 import os
-import requests
 import json
-import hashlib
-import hmac
-import base64
 import time
-import urllib.parse
-from typing import Optional, Dict, Any, List
-import secrets
-import string
+from typing import Optional, Dict, Any, List, Mapping, Iterator, Callable
 from dotenv import load_dotenv
 from twitter import TwitterAPI
+from twitter_cache import ResponseCache
+from twitter_index import TweetIndex, search_feed
+from twitter_pagination import paginate
+from twitter_rate_store import RateLimitStore
+from twitter_transport import TwitterTransport
 
 load_dotenv()
 
+RATE_LIMIT_HEADERS = [
+    ('x-rate-limit-limit', 'limit'),
+    ('x-rate-limit-remaining', 'remaining'),
+    ('x-rate-limit-reset', 'reset'),
+    ('x-user-limit-24hour', 'user_limit_24hour'),
+    ('x-user-limit-24hour-remaining', 'user_limit_24hour_remaining'),
+]
+
+
+def parse_rate_limit_headers(response_headers: Mapping[str, str]) -> Dict[str, int]:
+    """Extract the x-rate-limit-* / x-user-limit-* values from response headers"""
+    info: Dict[str, int] = {}
+    for hdr, key in RATE_LIMIT_HEADERS:
+        if hdr in response_headers:
+            info[key] = int(response_headers[hdr])
+    return info
+
+
 class TwitterRateLimitedAPI(TwitterAPI):
     """
     Twitter API client for rate-limited endpoints with proper retry and backoff logic
     Inherits from the main TwitterAPI class for OAuth functionality
     """
     
-    def __init__(self):
-        super().__init__()
-        self.rate_limits = {}
-        
-    def _generate_nonce(self, length: int = 32) -> str:
-        """Generate a random nonce for OAuth"""
-        return ''.join(secrets.choice(string.ascii_letters + string.digits) for _ in range(length))
-    
-    def _generate_timestamp(self) -> str:
-        """Generate current timestamp for OAuth"""
-        return str(int(time.time()))
-    
-    def _percent_encode(self, text: str) -> str:
-        """Percent encode text for OAuth"""
-        return urllib.parse.quote(str(text), safe='')
+    def __init__(self, transport: Optional[TwitterTransport] = None,
+                 rate_store: Optional[RateLimitStore] = None,
+                 cache: Optional[ResponseCache] = None,
+                 index: Optional[TweetIndex] = None):
+        """
+        Args:
+            transport: HTTP transport (see TwitterAPI)
+            rate_store: Shared rate-limit budget. Defaults to the SQLite store at
+                TWITTER_RATE_LIMIT_DB, shared by every worker process on the host.
+            cache: Response cache for the read endpoints. Defaults to an in-memory
+                TTL/LRU cache; set ``self.cache = None`` to always hit the network.
+            index: Local full-text store that every fetched tweet is written to.
+                Defaults to the SQLite index at TWITTER_INDEX_DB; set
+                ``self.index = None`` to disable it.
+        """
+        super().__init__(transport)
+        self.rate_store = rate_store or RateLimitStore(namespace=self.namespace)
+        self.cache: Optional[ResponseCache] = cache if cache is not None else ResponseCache()
+        self.index: Optional[TweetIndex] = index if index is not None else TweetIndex()
     
-    def _generate_signature_base_string(self, method: str, url: str, params: Dict[str, str]) -> str:
-        """Generate signature base string for OAuth"""
-        # Sort parameters
-        sorted_params = sorted(params.items())
-        param_string = '&'.join([f"{self._percent_encode(k)}={self._percent_encode(v)}" for k, v in sorted_params])
+    @property
+    def rate_limits(self) -> Dict[str, Dict[str, int]]:
+        """Last known budget per endpoint"""
+        return self.rate_store.snapshot()
         
-        return f"{method.upper()}&{self._percent_encode(url)}&{self._percent_encode(param_string)}"
-    
-    def _generate_signing_key(self) -> str:
-        """Generate signing key for OAuth"""
-        return f"{self._percent_encode(self.consumer_secret)}&{self._percent_encode(self.access_token_secret)}"
-    
-    def _generate_signature(self, signature_base_string: str, signing_key: str) -> str:
-        """Generate OAuth signature"""
-        signature = hmac.new(
-            signing_key.encode('utf-8'),
-            signature_base_string.encode('utf-8'),
-            hashlib.sha1
-        ).digest()
-        return base64.b64encode(signature).decode('utf-8')
-    
-    def _generate_oauth_header(self, method: str, url: str, params: Optional[Dict[str, str]] = None) -> str:
-        """Generate OAuth 1.0 authorization header"""
-        if params is None:
-            params = {}
-            
-        oauth_params = {
-            'oauth_consumer_key': self.consumer_key,
-            'oauth_token': self.access_token,
-            'oauth_signature_method': 'HMAC-SHA1',
-            'oauth_timestamp': self._generate_timestamp(),
-            'oauth_nonce': self._generate_nonce(),
-            'oauth_version': '1.0'
-        }
-        
-        # Combine OAuth params with request params for signature
-        all_params = {**oauth_params, **params}
-        
-        # Generate signature
-        signature_base_string = self._generate_signature_base_string(method, url, all_params)
-        signing_key = self._generate_signing_key()
-        oauth_signature = self._generate_signature(signature_base_string, signing_key)
-        
-        oauth_params['oauth_signature'] = oauth_signature
-        
-        # Build authorization header
-        auth_header_params = []
-        for key, value in oauth_params.items():
-            auth_header_params.append(f'{self._percent_encode(key)}="{self._percent_encode(value)}"')
-        
-        return f"OAuth {','.join(auth_header_params)}"
-    
-    def _check_rate_limit(self, endpoint: str, response_headers: Dict[str, str]) -> None:
+    def _check_rate_limit(self, endpoint: str, response_headers: Mapping[str, str]) -> None:
         """Store rate limit information from headers without printing to stdout."""
-        info: Dict[str, int] = {}
-        for hdr, key in [
-            ('x-rate-limit-limit', 'limit'),
-            ('x-rate-limit-remaining', 'remaining'),
-            ('x-rate-limit-reset', 'reset'),
-            ('x-user-limit-24hour', 'user_limit_24hour'),
-            ('x-user-limit-24hour-remaining', 'user_limit_24hour_remaining'),
-        ]:
-            if hdr in response_headers:
-                info[key] = int(response_headers[hdr])
-        self.rate_limits[endpoint] = info
+        self.rate_store.update(endpoint, parse_rate_limit_headers(response_headers))
     
     def _wait_for_rate_limit(self, endpoint: str) -> bool:
-        """Wait for rate limit to reset if needed"""
-        if endpoint not in self.rate_limits:
-            return True
-            
-        rate_info = self.rate_limits[endpoint]
-        
-        # Check if we have remaining requests
-        if rate_info.get('remaining', 1) > 0:
-            return True
-            
-        # Check if we need to wait for reset
-        if 'reset' in rate_info:
-            reset_time = rate_info['reset']
-            current_time = int(time.time())
-            wait_time = reset_time - current_time
-            
-            if wait_time > 0:
-                time.sleep(wait_time + 1)
-                
-        return True
+        """Spend one request from the shared budget, waiting for the window to reset if it is empty"""
+        while True:
+            wait_time = self.rate_store.acquire(endpoint)
+            if wait_time <= 0:
+                return True
+            time.sleep(wait_time + 1)
     
     def _handle_rate_limited_request(self, method: str, url: str, endpoint_name: str, 
-                                   headers: Dict[str, str], **kwargs) -> Dict[str, Any]:
-        """Handle requests for rate-limited endpoints with retry logic"""
+                                   headers: Dict[str, str], retry_errors: bool = True, **kwargs) -> Dict[str, Any]:
+        """
+        Handle requests for rate-limited endpoints with retry logic
+
+        With ``retry_errors=False`` only 429s are retried: a transport error is
+        returned at once, flagged ``transport_error``, because a write that
+        failed in flight may still have been applied.
+        """
         max_retries = 3
         base_delay = 1
         
@@ -136,20 +91,15 @@ class TwitterRateLimitedAPI(TwitterAPI):
                 self._wait_for_rate_limit(endpoint_name)
                 
                 # Make the request
-                if method.upper() == 'GET':
-                    response = requests.get(url, headers=headers, **kwargs)
-                elif method.upper() == 'POST':
-                    response = requests.post(url, headers=headers, **kwargs)
-                elif method.upper() == 'DELETE':
-                    response = requests.delete(url, headers=headers, **kwargs)
-                else:
+                if method.upper() not in ('GET', 'POST', 'DELETE'):
                     raise ValueError(f"Unsupported HTTP method: {method}")
+                response = self.transport.request(method.upper(), url, headers=headers, **kwargs)
                 
                 # Store rate limit info (silent)
-                self._check_rate_limit(endpoint_name, dict(response.headers))
+                self._check_rate_limit(endpoint_name, response.headers)
                 
                 # Handle different response codes
-                if response.status_code == 200:
+                if response.status_code in (200, 201):
                     try:
                         return response.json()
                     except Exception:
@@ -165,6 +115,8 @@ class TwitterRateLimitedAPI(TwitterAPI):
                     return {"error": f"HTTP {response.status_code}", "text": response.text}
                     
             except Exception as e:
+                if not retry_errors:
+                    return {"error": str(e), "transport_error": True}
                 if attempt < max_retries - 1:
                     time.sleep(base_delay * (2 ** attempt))
                 else:
@@ -172,7 +124,32 @@ class TwitterRateLimitedAPI(TwitterAPI):
         
         return {"error": "Max retries exceeded"}
     
-    def search_tweets(self, query: str, max_results: int = 10, tweet_fields: Optional[str] = None) -> Dict[str, Any]:
+    def _cached_get(self, url: str, endpoint_name: str, params: Dict[str, str],
+                    cache_name: Optional[str] = None,
+                    on_fetch: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        GET a rate-limited endpoint through the response cache (if any).
+        ``on_fetch`` sees every response that actually came from the network.
+        """
+        def fetch() -> Dict[str, Any]:
+            headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
+            result = self._handle_rate_limited_request('GET', url, endpoint_name, headers, params=params)
+            if on_fetch is not None and 'error' not in result:
+                on_fetch(result)
+            return result
+        if self.cache is None:
+            return fetch()
+        return self.cache.get_or_fetch(cache_name or endpoint_name, url, params, fetch, namespace=self.namespace)
+    
+    def _indexer(self, feed: str) -> Optional[Callable[[Dict[str, Any]], None]]:
+        """on_fetch hook writing a page of tweets to the local index"""
+        if self.index is None:
+            return None
+        index = self.index
+        return lambda page: index.add_tweets(page.get('data', []), feed)
+    
+    def search_tweets(self, query: str, max_results: int = 10, tweet_fields: Optional[str] = None,
+                      next_token: Optional[str] = None, since_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Search for recent tweets (RATE LIMITED)
         
@@ -180,6 +157,8 @@ class TwitterRateLimitedAPI(TwitterAPI):
             query: Search query
             max_results: Maximum number of tweets to return
             tweet_fields: Comma-separated list of tweet fields to include
+            next_token: meta.next_token of the previous page
+            since_id: Only return tweets newer than this ID
             
         Returns:
             Dict containing search results
@@ -188,24 +167,122 @@ class TwitterRateLimitedAPI(TwitterAPI):
         params = {'query': query, 'max_results': str(max_results)}
         if tweet_fields:
             params['tweet.fields'] = tweet_fields
-        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
-        return self._handle_rate_limited_request('GET', url, 'search_tweets', headers, params=params)
+        if next_token:
+            params['next_token'] = next_token
+        if since_id:
+            params['since_id'] = since_id
+        return self._cached_get(url, 'search_tweets', params, on_fetch=self._indexer(search_feed(query)))
     
-    def get_list_tweets(self, list_id: str, max_results: int = 10) -> Dict[str, Any]:
+    def search_tweets_indexed(self, query: str, max_results: int = 10, tweet_fields: Optional[str] = None,
+                              max_age: float = 60, max_new: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Answer a search from the local index, fetching only what it doesn't cover
+        
+        The first call for a query fetches up to max_results tweets. Later calls
+        ask the API only for tweets newer than the ones already indexed
+        (``since_id``), and skip the network entirely when the query was refreshed
+        less than max_age seconds ago. A refresh stopped by max_new before it
+        reached ``since_id`` keeps its ``next_token``; the next refresh continues
+        from there, and ``since_id`` only moves up once that gap is closed.
+        
+        Args:
+            query: Search query (Twitter syntax)
+            max_results: Number of tweets to return, newest first
+            tweet_fields: Comma-separated list of tweet fields to include
+            max_age: Seconds an indexed query counts as up to date
+            max_new: Cap on new tweets fetched by one refresh (default: all)
+            
+        Returns:
+            Search-shaped dict; meta.source is 'index' when no request was made
+        """
+        if self.index is None:
+            return self.search_tweets(query, max_results, tweet_fields)
+        feed = search_feed(query)
+        state = self.index.feed_state(feed)
+        fetched = 0
+        refresh = state is None or time.time() - state['refreshed'] >= max_age
+        if refresh:
+            token: Optional[str] = None
+            newest: Optional[str] = None
+            since_id: Optional[str] = None
+            if state:
+                since_id = state['synced_id'] or state['newest_id']
+                if state['next_token']:
+                    # An earlier refresh hit max_new above since_id; fill that gap first
+                    token, newest = state['next_token'], state['pending_newest']
+            limit = max_new if since_id else max_results
+            while True:
+                page_size = min(100, max(10, limit - fetched)) if limit else 100
+                page = self.search_tweets(query, page_size, tweet_fields, next_token=token, since_id=since_id)
+                if 'error' in page:
+                    return page
+                meta = page.get('meta', {})
+                fetched += len(page.get('data', []))
+                newest = newest or meta.get('newest_id')
+                token = meta.get('next_token')
+                if not token or (limit and fetched >= limit):
+                    break
+            if since_id and token:
+                self.index.save_cursor(feed, since_id, token, newest)
+            else:
+                # Caught up with since_id (or the first fetch, which only wants the latest page)
+                self.index.save_cursor(feed, newest or since_id)
+            self.index.mark_refreshed(feed)
+        tweets = self.index.feed_tweets(feed, max_results)
+        return {
+            'data': tweets,
+            'meta': {
+                'result_count': len(tweets),
+                'newest_id': tweets[0]['id'] if tweets else None,
+                'oldest_id': tweets[-1]['id'] if tweets else None,
+                'source': 'api+index' if refresh else 'index',
+                'fetched': fetched,
+            },
+        }
+    
+    def get_list_tweets(self, list_id: str, max_results: int = 10,
+                        pagination_token: Optional[str] = None) -> Dict[str, Any]:
         """
         Get tweets from a specific list (RATE LIMITED)
         
         Args:
             list_id: ID of the list
             max_results: Maximum number of tweets to return
+            pagination_token: meta.next_token of the previous page
             
         Returns:
             Dict containing list tweets
         """
         url = f"{self.base_url}/2/lists/{list_id}/tweets"
         params = {'max_results': str(max_results)}
-        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
-        return self._handle_rate_limited_request('GET', url, f'list_tweets_{list_id}', headers, params=params)
+        if pagination_token:
+            params['pagination_token'] = pagination_token
+        return self._cached_get(url, f'list_tweets_{list_id}', params, cache_name='list_tweets',
+                                on_fetch=self._indexer(f'list:{list_id}'))
+    
+    def iter_search_tweets(self, query: str, max_results: int = 100, tweet_fields: Optional[str] = None,
+                           limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield every tweet matching a search, following meta.next_token
+        
+        Pages are fetched only as the caller consumes them and are paced against
+        the endpoint's remaining budget. Combine with twitter_pagination.write_jsonl
+        to stream results to disk with flat memory use.
+        
+        Args:
+            query: Search query
+            max_results: Page size (10-100)
+            tweet_fields: Comma-separated list of tweet fields to include
+            limit: Stop after this many tweets
+        """
+        return paginate(lambda token: self.search_tweets(query, max_results, tweet_fields, next_token=token),
+                        lambda: self.rate_store.get('search_tweets'), limit)
+    
+    def iter_list_tweets(self, list_id: str, max_results: int = 100,
+                         limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every tweet of a list (see iter_search_tweets)"""
+        return paginate(lambda token: self.get_list_tweets(list_id, max_results, pagination_token=token),
+                        lambda: self.rate_store.get(f'list_tweets_{list_id}'), limit)
     
     def get_user_by_username(self, username: str, user_fields: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -222,8 +299,7 @@ class TwitterRateLimitedAPI(TwitterAPI):
         params: Dict[str, str] = {}
         if user_fields:
             params['user.fields'] = user_fields
-        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
-        return self._handle_rate_limited_request('GET', url, 'user_by_username', headers, params=params)
+        return self._cached_get(url, 'user_by_username', params)
     
     def get_users_by_usernames(self, usernames: List[str], user_fields: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -240,15 +316,16 @@ class TwitterRateLimitedAPI(TwitterAPI):
         params = {'usernames': ','.join(usernames)}
         if user_fields:
             params['user.fields'] = user_fields
-        headers = {'Authorization': self._generate_oauth_header('GET', url, params)}
-        return self._handle_rate_limited_request('GET', url, 'users_by_usernames', headers, params=params)
+        return self._cached_get(url, 'users_by_usernames', params)
     
     def get_rate_limit_status(self) -> Dict[str, Any]:
         """Get current rate limit status for all tracked endpoints"""
         return {
             "rate_limits": self.rate_limits,
             "current_time": int(time.time()),
-            "current_time_str": time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())
+            "current_time_str": time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime()),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "indexed_tweets": len(self.index) if self.index is not None else None
         }
 
     def get_tweet_analytics(self, tweet_ids: List[str], start_time: str, end_time: str,
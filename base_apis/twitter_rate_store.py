@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict
+
+RATE_LIMIT_DB = os.getenv('TWITTER_RATE_LIMIT_DB',
+                          os.path.join(os.path.dirname(__file__), '.twitter_rate_limits.sqlite3'))
+# Twitter v2 windows are 15 minutes; used to roll a window forward before fresh headers arrive
+DEFAULT_WINDOW_SECS = 15 * 60
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    namespace TEXT NOT NULL,
+    endpoint  TEXT NOT NULL,
+    lim       INTEGER,
+    remaining INTEGER NOT NULL,
+    reset     INTEGER NOT NULL,
+    extra     TEXT NOT NULL DEFAULT '{}',
+    PRIMARY KEY (namespace, endpoint)
+)
+"""
+
+
+def credential_namespace(consumer_key: str, access_token: str) -> str:
+    """Stable, non-reversible key so different accounts sharing a store don't mix budgets"""
+    return hashlib.sha256(f"{consumer_key}:{access_token}".encode('utf-8')).hexdigest()[:16]
+
+
+class RateLimitStore:
+    """
+    Per-endpoint request budget shared by every thread and process that opens the
+    same SQLite file.
+
+    Budgets are seeded from the ``x-rate-limit-*`` headers and spent *before* a
+    request is sent (``acquire``), so N workers cannot each burn the same quota.
+    Every read-modify-write runs inside ``BEGIN IMMEDIATE``, which serialises
+    writers across processes; reset times persist, so a restart does not burst
+    into 429s.
+    """
+
+    def __init__(self, path: Optional[str] = None, namespace: str = 'default',
+                 window_secs: int = DEFAULT_WINDOW_SECS, timeout: float = 30.0):
+        self.path = path or RATE_LIMIT_DB
+        self.namespace = namespace
+        self.window_secs = window_secs
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._connect())
+
+    def acquire(self, endpoint: str) -> float:
+        """
+        Spend one request from the endpoint's budget.
+
+        Returns 0 when the request may be sent now, otherwise the number of seconds
+        until the window resets (nothing is spent in that case).
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT lim, remaining, reset FROM rate_limits WHERE namespace = ? AND endpoint = ?',
+                (self.namespace, endpoint)).fetchone()
+            if row is None:
+                # Never seen this endpoint: let the request through and learn from its headers
+                return 0.0
+            limit, remaining, reset = row
+            if reset <= now and limit is not None:
+                # The window has passed; refill and roll it forward until headers say otherwise
+                remaining = limit
+                while reset <= now:
+                    reset += self.window_secs
+            if remaining <= 0:
+                return max(0.0, reset - now)
+            conn.execute(
+                'UPDATE rate_limits SET remaining = ?, reset = ? WHERE namespace = ? AND endpoint = ?',
+                (remaining - 1, reset, self.namespace, endpoint))
+            return 0.0
+
+    def update(self, endpoint: str, info: Dict[str, int]) -> None:
+        """Reconcile the stored budget with the rate-limit headers of a response"""
+        if 'remaining' not in info or 'reset' not in info:
+            return
+        extra = {k: v for k, v in info.items() if k not in ('limit', 'remaining', 'reset')}
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT remaining, reset FROM rate_limits WHERE namespace = ? AND endpoint = ?',
+                (self.namespace, endpoint)).fetchone()
+            remaining = info['remaining']
+            if row is not None and row[1] == info['reset']:
+                # Same window: requests other workers already spent may not be reflected yet
+                remaining = min(row[0], remaining)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limits (namespace, endpoint, lim, remaining, reset, extra) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (self.namespace, endpoint, info.get('limit'), remaining, info['reset'], json.dumps(extra)))
+
+    def ensure(self, endpoint: str, limit: int, window_secs: Optional[int] = None) -> None:
+        """Seed a budget for an endpoint that does not report rate-limit headers"""
+        reset = int(time.time()) + (window_secs or self.window_secs)
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO rate_limits (namespace, endpoint, lim, remaining, reset) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, endpoint, limit, limit, reset))
+
+    def get(self, endpoint: str) -> Optional[Dict[str, int]]:
+        """Current budget of one endpoint, or None if it has never been seen"""
+        return self.snapshot().get(endpoint)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Current budget of every endpoint, shaped like the parsed headers"""
+        rows = self._connect().execute(
+            'SELECT endpoint, lim, remaining, reset, extra FROM rate_limits WHERE namespace = ?',
+            (self.namespace,)).fetchall()
+        result: Dict[str, Dict[str, int]] = {}
+        for endpoint, limit, remaining, reset, extra in rows:
+            info = {'remaining': remaining, 'reset': reset, **json.loads(extra)}
+            if limit is not None:
+                info['limit'] = limit
+            result[endpoint] = info
+        return result
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _ImmediateTransaction:
+    """``with`` block running BEGIN IMMEDIATE ... COMMIT/ROLLBACK on a connection"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
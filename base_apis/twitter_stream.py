@@ -0,0 +1,287 @@
+import json
+import os
+import queue
+import random
+import threading
+from typing import Optional, Dict, Any, List, Iterator, Iterable, Tuple, Union
+
+# Twitter sends a blank keep-alive line every ~20 seconds; three missed ones means a stall
+STREAM_READ_TIMEOUT = 90.0
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_STREAM_PARAMS = {'tweet.fields': 'created_at,author_id'}
+
+# Reconnect schedules recommended for the streaming endpoints:
+# network errors back off linearly, HTTP errors exponentially, 429s start at a minute.
+NETWORK_BACKOFF = (0.25, 16.0)
+HTTP_BACKOFF = (5.0, 320.0)
+RATE_LIMIT_BACKOFF = (60.0, 960.0)
+
+
+def reconnect_delay(kind: str, attempt: int, jitter: float = 0.25) -> float:
+    """
+    Seconds to wait before reconnect ``attempt`` (1-based) after a ``kind``
+    ('network', 'http' or 'rate_limit') failure, with +/- ``jitter`` spread so a
+    fleet of consumers doesn't reconnect in lockstep.
+    """
+    if kind == 'network':
+        base, cap = NETWORK_BACKOFF
+        delay = min(base * attempt, cap)
+    else:
+        base, cap = RATE_LIMIT_BACKOFF if kind == 'rate_limit' else HTTP_BACKOFF
+        delay = min(base * (2 ** (attempt - 1)), cap)
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+class NdjsonDecoder:
+    """
+    Incremental newline-delimited JSON parser.
+
+    ``feed`` accepts arbitrary byte chunks (lines may be split anywhere) and
+    returns the objects completed by that chunk. Blank keep-alive lines are skipped.
+    """
+
+    def __init__(self):
+        self._buffer = b''
+
+    def feed(self, chunk: bytes) -> List[Dict[str, Any]]:
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split(b'\n')
+        messages = []
+        for line in lines:
+            line = line.strip()
+            if line:
+                messages.append(json.loads(line))
+        return messages
+
+    def reset(self) -> None:
+        """Drop a partial line left over from a broken connection"""
+        self._buffer = b''
+
+
+def diff_rules(current: List[Dict[str, Any]],
+               desired: Union[Dict[str, Optional[str]], Iterable[str]]) -> Tuple[List[Dict[str, str]], List[str]]:
+    """
+    Work out the minimal change from the server's rules to ``desired``.
+
+    Args:
+        current: ``data`` of GET /2/tweets/search/stream/rules
+        desired: {rule value: tag or None}, or just rule values
+
+    Returns:
+        (rules to add, IDs of rules to delete). A rule whose tag changed is
+        deleted and re-added; unchanged rules are left alone.
+    """
+    if not isinstance(desired, dict):
+        desired = {value: None for value in desired}
+    existing = {(rule['value'], rule.get('tag')): rule['id'] for rule in current}
+    wanted = {(value, tag) for value, tag in desired.items()}
+    to_delete = [rule_id for key, rule_id in existing.items() if key not in wanted]
+    to_add = []
+    for value, tag in desired.items():
+        if (value, tag) not in existing:
+            rule = {'value': value}
+            if tag is not None:
+                rule['tag'] = tag
+            to_add.append(rule)
+    return to_add, to_delete
+
+
+class FilteredStream:
+    """
+    Long-lived consumer of the v2 filtered stream (/2/tweets/search/stream).
+
+    A background thread holds the connection open through the client's
+    transport, parses messages as bytes arrive and puts them on a bounded queue.
+    When the consumer falls behind the queue fills, the reader stops pulling
+    from the socket and TCP flow control pushes back on the server. Dropped
+    connections and stalls (no keep-alive within STREAM_READ_TIMEOUT) are
+    retried with backoff and jitter.
+
+    The stream endpoints only accept app-only auth, so a bearer token is
+    required (TWITTER_BEARER_TOKEN). Requests go to ``api.base_url``, which a
+    test can point at a local stand-in server.
+    """
+
+    def __init__(self, api, bearer_token: Optional[str] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 params: Optional[Dict[str, str]] = None, read_timeout: float = STREAM_READ_TIMEOUT,
+                 max_reconnects: Optional[int] = None):
+        """
+        Args:
+            api: TwitterAPI (or subclass) whose transport and base_url are used
+            bearer_token: App-only token; defaults to TWITTER_BEARER_TOKEN
+            queue_size: Messages buffered before the reader blocks
+            params: Query parameters of the stream request (fields, expansions)
+            read_timeout: Seconds without any bytes before the connection counts as stalled
+            max_reconnects: Give up after this many consecutive failures (default: never)
+        """
+        self.api = api
+        self.bearer_token = bearer_token or os.getenv('TWITTER_BEARER_TOKEN')
+        if not self.bearer_token:
+            raise ValueError("Missing TWITTER_BEARER_TOKEN (the filtered stream requires app-only auth)")
+        self.params = DEFAULT_STREAM_PARAMS if params is None else params
+        self.read_timeout = read_timeout
+        self.max_reconnects = max_reconnects
+        self.queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_size)
+        self.stats = {'messages': 0, 'connects': 0, 'reconnects': 0, 'errors': 0}
+        self.last_error: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._response = None
+
+    @property
+    def stream_url(self) -> str:
+        return f"{self.api.base_url}/2/tweets/search/stream"
+
+    @property
+    def rules_url(self) -> str:
+        return f"{self.stream_url}/rules"
+
+    def _headers(self) -> Dict[str, str]:
+        return {'Authorization': f'Bearer {self.bearer_token}'}
+
+    def get_rules(self) -> Dict[str, Any]:
+        """Rules currently attached to the stream"""
+        response = self.api.transport.get(self.rules_url, headers=self._headers())
+        if response.status_code != 200:
+            return {"error": f"HTTP {response.status_code}", "text": response.text}
+        return response.json()
+
+    def sync_rules(self, desired: Union[Dict[str, Optional[str]], Iterable[str]],
+                   dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Make the server's rules match ``desired`` with the fewest changes.
+
+        Only rules that were added, removed or re-tagged are sent, so an
+        unchanged rule set costs a single GET. Returns what was (or, with
+        dry_run, would be) added and deleted.
+        """
+        current = self.get_rules()
+        if 'error' in current:
+            return current
+        to_add, to_delete = diff_rules(current.get('data', []), desired)
+        result: Dict[str, Any] = {'added': to_add, 'deleted': to_delete}
+        if dry_run:
+            return result
+        headers = {**self._headers(), 'Content-Type': 'application/json'}
+        if to_delete:
+            response = self.api.transport.post(self.rules_url, headers=headers,
+                                               data=json.dumps({'delete': {'ids': to_delete}}))
+            if response.status_code != 200:
+                return {"error": f"HTTP {response.status_code}", "text": response.text}
+        if to_add:
+            response = self.api.transport.post(self.rules_url, headers=headers,
+                                               data=json.dumps({'add': to_add}))
+            if response.status_code not in (200, 201):
+                return {"error": f"HTTP {response.status_code}", "text": response.text}
+            result['response'] = response.json()
+        return result
+
+    def start(self) -> 'FilteredStream':
+        """Connect in the background; messages become available through ``get`` / iteration"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='twitter-filtered-stream', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Disconnect and stop the reader thread"""
+        self._stop.set()
+        response = self._response
+        if response is not None:
+            response.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def __enter__(self) -> 'FilteredStream':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Next stream message ({'data': tweet, 'matching_rules': [...]} or an
+        {'errors': [...]} notice). Returns None once the stream has stopped;
+        raises queue.Empty on timeout.
+        """
+        return self.queue.get(timeout=timeout)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            message = self.get()
+            if message is None:
+                return
+            yield message
+
+    def _put(self, message: Optional[Dict[str, Any]]) -> bool:
+        """Blocking put that still notices stop(); False if the stream was stopped"""
+        while not self._stop.is_set():
+            try:
+                self.queue.put(message, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        decoder = NdjsonDecoder()
+        attempt = 0
+        try:
+            while not self._stop.is_set():
+                received = self.stats['messages']
+                kind = self._consume(decoder)
+                if self._stop.is_set():
+                    break
+                if self.stats['messages'] > received:
+                    # The connection was healthy for a while; start the schedule over
+                    attempt = 0
+                attempt += 1
+                if self.max_reconnects is not None and attempt > self.max_reconnects:
+                    break
+                self.stats['reconnects'] += 1
+                self._stop.wait(reconnect_delay(kind, attempt))
+        finally:
+            # Unblock consumers; if the queue is full they will drain it and find this last
+            self._stop.set()
+            try:
+                self.queue.put(None, timeout=1)
+            except queue.Full:
+                pass
+
+    def _consume(self, decoder: NdjsonDecoder) -> str:
+        """
+        One connection's worth of reading. Returns the backoff kind to apply
+        before reconnecting (a clean close from the server counts as 'network').
+        """
+        decoder.reset()
+        try:
+            response = self.api.transport.get(self.stream_url, headers=self._headers(), params=self.params,
+                                              stream=True, timeout=(10.0, self.read_timeout))
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.last_error = {"error": str(e)}
+            return 'network'
+
+        self._response = response
+        try:
+            if response.status_code != 200:
+                self.stats['errors'] += 1
+                self.last_error = {"error": f"HTTP {response.status_code}", "text": response.text}
+                return 'rate_limit' if response.status_code == 429 else 'http'
+            self.stats['connects'] += 1
+            for chunk in response.iter_content(chunk_size=None):
+                for message in decoder.feed(chunk):
+                    if not self._put(message):
+                        return 'network'
+                    self.stats['messages'] += 1
+            return 'network'
+        except Exception as e:
+            if self._stop.is_set():
+                return 'network'
+            self.stats['errors'] += 1
+            self.last_error = {"error": str(e)}
+            return 'network'
+        finally:
+            self._response = None
+            response.close()
@@ -0,0 +1,82 @@
+from abc import ABC, abstractmethod
+
+import requests
+from requests.adapters import HTTPAdapter
+from typing import Optional, Dict, Any, Tuple, Union
+
+# (connect, read) timeout applied when a caller does not pass its own
+DEFAULT_TIMEOUT: Tuple[float, float] = (5.0, 60.0)
+
+# Hosts the Twitter clients talk to, with the pool size each one gets by default.
+# Uploads get a larger pool so parallel APPEND segments don't queue on a connection.
+DEFAULT_HOST_POOL_SIZES: Dict[str, int] = {
+    'https://api.x.com': 10,
+    'https://api.twitter.com': 10,
+    'https://upload.twitter.com': 16,
+}
+
+
+class TwitterTransport(ABC):
+    """
+    Interface used by TwitterAPI / TwitterRateLimitedAPI to send HTTP requests.
+
+    Implementations only need ``request``; the verb helpers and context manager
+    come for free. Tests can plug in their own transport (e.g. one pointing at a
+    local stand-in server) without touching the clients.
+    """
+
+    @abstractmethod
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send one request; keyword arguments are those of ``requests.Session.request``"""
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self) -> None:
+        """Release any pooled connections"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PooledTransport(TwitterTransport):
+    """
+    Keep-alive transport backed by a single ``requests.Session``.
+
+    Each host listed in ``host_pool_sizes`` gets its own adapter so the number of
+    kept-alive connections can be tuned per host; everything else falls back to
+    ``pool_maxsize``.
+    """
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 10,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 timeout: Union[float, Tuple[float, float], None] = DEFAULT_TIMEOUT,
+                 max_retries: int = 0):
+        self.timeout = timeout
+        self.session = requests.Session()
+        default_adapter = HTTPAdapter(pool_connections=pool_connections,
+                                      pool_maxsize=pool_maxsize,
+                                      max_retries=max_retries)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+
+        sizes = DEFAULT_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes
+        for prefix, size in sizes.items():
+            self.session.mount(prefix, HTTPAdapter(pool_connections=1, pool_maxsize=size,
+                                                   max_retries=max_retries))
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
@@ -1,15 +1,19 @@
+import json
 import os
 import sys
-import time
-import random
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-from googleapiclient.http import MediaFileUpload
+from field_mask import with_fields, youtube_params
+
+from youtube_analytics_store import AnalyticsStore, is_cacheable
+from youtube_comments import CommentRow, iter_comments
+from youtube_credentials import CredentialManager
+from youtube_discovery import build_service
+from youtube_etag_cache import ConditionalRequestCache
+from youtube_quota import QuotaLedger, QuotaScheduler, charge_on_send, track_exhaustion
+from youtube_upload import DEFAULT_CHUNK_SIZE, ChunkCallback, ProgressCallback, UploadSessionStore, resumable_insert
 
 # If modifying these SCOPES, delete the token.json file.
 SCOPES = [
@@ -20,56 +24,126 @@ SCOPES = [
     "https://www.googleapis.com/auth/youtube.force-ssl",
 ]
 
+# videos.list accepts up to 50 IDs per call for the same quota cost as one
+MAX_IDS_PER_VIDEOS_LIST = 50
+VIDEO_DETAIL_PARTS = "snippet,statistics,contentDetails,status"
+
+# Fields the MCP tool formatters read; the tools request only these
+SEARCH_RESULT_FIELDS = ["id.videoId", "snippet.title", "snippet.channelTitle", "snippet.description",
+                        "snippet.publishedAt"]
+VIDEO_DETAIL_FIELDS = ["id", "snippet.title", "snippet.channelTitle", "snippet.publishedAt", "snippet.description",
+                       "snippet.tags", "snippet.categoryId", "contentDetails.duration", "status.privacyStatus",
+                       "statistics.viewCount", "statistics.likeCount", "statistics.commentCount"]
+CHANNEL_INFO_FIELDS = ["id", "snippet.title", "snippet.description", "snippet.country", "snippet.publishedAt",
+                       "statistics.subscriberCount", "statistics.videoCount", "statistics.viewCount",
+                       "brandingSettings.channel.keywords"]
+
 CLIENT_SECRETS_FILE = os.path.join(os.path.dirname(__file__), "client_secret.json")
 TOKEN_FILE = os.path.join(os.path.dirname(__file__), "youtube_token.json")
 
 
+def _quota_project() -> str:
+    """Quota is per Google Cloud project: YOUTUBE_QUOTA_PROJECT, else the client secret's project_id"""
+    project = os.getenv("YOUTUBE_QUOTA_PROJECT")
+    if project:
+        return project
+    try:
+        with open(CLIENT_SECRETS_FILE) as f:
+            secrets = json.load(f)
+    except (OSError, ValueError):
+        return "default"
+    for section in secrets.values():
+        if isinstance(section, dict) and section.get("project_id"):
+            return section["project_id"]
+    return "default"
+
+
 class YouTubeUploader:
-    """Simple wrapper around the YouTube Data API v3 for uploading videos."""
+    """Simple wrapper around the YouTube Data API v3 for uploading videos.
 
-    def __init__(self):
-        self.youtube = self._get_authenticated_service()
+    The Google client libraries are imported, and the service authenticated and
+    built, on first use rather than at import / construction time, so importing
+    this module (and starting the MCP server) stays cheap.
+    """
+
+    def __init__(self, credentials=None):
+        """
+        Args:
+            credentials: google.auth credentials to use instead of the saved OAuth token
+        """
+        self.credentials = credentials
+        # Owns the saved OAuth token and refreshes it in the background (unused with explicit credentials)
+        self.credential_manager = CredentialManager(TOKEN_FILE, SCOPES)
+        self._youtube = None
+        self._yt_analytics = None
+        self._channel_id: Optional[str] = None
+        self._service_lock = threading.Lock()
+        self._http_local = threading.local()
+        # Resumable-session URIs of in-progress uploads; set to None to disable resuming
+        self.upload_sessions: Optional[UploadSessionStore] = UploadSessionStore()
+        # Daily Data API budget; set to None to stop tracking/limiting quota
+        self.quota: Optional[QuotaScheduler] = QuotaScheduler(QuotaLedger(project=_quota_project()))
+        # Seconds a call may wait for budget before QuotaExceededError (0: fail at once)
+        self.quota_wait = 0.0
+        # ETag + parsed body of GET responses, revalidated with If-None-Match; None disables it
+        self.etag_cache: Optional[ConditionalRequestCache] = ConditionalRequestCache()
+        # Per-day analytics rows; set to None to always query the full range
+        self.analytics_store: Optional[AnalyticsStore] = AnalyticsStore()
+
+    @property
+    def youtube(self):
+        """YouTube Data API service, authenticated and built on first access"""
+        if self._youtube is None:
+            with self._service_lock:
+                if self._youtube is None:
+                    self._youtube = self._get_authenticated_service()
+        return self._youtube
+
+    @youtube.setter
+    def youtube(self, service) -> None:
+        self._youtube = service
 
     def _get_authenticated_service(self):
         """Authenticate the user via OAuth and return an authorized YouTube service."""
-        creds: Optional[Credentials] = None
+        if self.credentials is not None:
+            return build_service("youtube", "v3", credentials=self.credentials, request_builder=self._build_request)
+
+        from google_auth_oauthlib.flow import InstalledAppFlow
 
-        # Load saved credentials, if they exist
-        if os.path.exists(TOKEN_FILE):
-            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        # Saved credentials, already refreshed if they are (nearly) expired
+        creds = self.credential_manager.load()
 
         # If there are no (valid) credentials available, let the user log in.
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
-                creds.refresh(Request())
-            else:
-                if not os.path.exists(CLIENT_SECRETS_FILE):
-                    raise FileNotFoundError(
-                        f"OAuth client configuration not found: {CLIENT_SECRETS_FILE}. "
-                        "Please create a Project in Google Cloud Console, enable the YouTube Data API, "
-                        "and download the OAuth 2.0 Client ID JSON file as client_secret.json."
-                    )
-                flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
-                try:
-                    if hasattr(flow, "run_local_server"):
-                        # Attempt browser-based flow on a fixed port that you must also whitelist
-                        # in the OAuth client's Authorized redirect URIs (e.g., http://localhost:8080/).
-                        creds = flow.run_local_server(port=8080, prompt="consent")
-                    else:
-                        raise AttributeError("run_local_server not available")
-                except (Exception, AttributeError) as auth_err:
-                    # Fallback to console-based flow if local server fails (e.g., redirect_uri_mismatch)
-                    print(
-                        "Could not complete browser-based OAuth flow (" + str(auth_err) + ").\n"
-                        "Falling back to console-based authorization. You will need to copy\n"
-                        "and paste a verification code from your browser."
-                    )
-                    creds = flow.run_console()
+        if creds is None:
+            if not os.path.exists(CLIENT_SECRETS_FILE):
+                raise FileNotFoundError(
+                    f"OAuth client configuration not found: {CLIENT_SECRETS_FILE}. "
+                    "Please create a Project in Google Cloud Console, enable the YouTube Data API, "
+                    "and download the OAuth 2.0 Client ID JSON file as client_secret.json."
+                )
+            flow = InstalledAppFlow.from_client_secrets_file(CLIENT_SECRETS_FILE, SCOPES)
+            try:
+                if hasattr(flow, "run_local_server"):
+                    # Attempt browser-based flow on a fixed port that you must also whitelist
+                    # in the OAuth client's Authorized redirect URIs (e.g., http://localhost:8080/).
+                    creds = flow.run_local_server(port=8080, prompt="consent")
+                else:
+                    raise AttributeError("run_local_server not available")
+            except (Exception, AttributeError) as auth_err:
+                # Fallback to console-based flow if local server fails (e.g., redirect_uri_mismatch)
+                print(
+                    "Could not complete browser-based OAuth flow (" + str(auth_err) + ").\n"
+                    "Falling back to console-based authorization. You will need to copy\n"
+                    "and paste a verification code from your browser."
+                )
+                creds = flow.run_console()
             # Save credentials for the next run
-            with open(TOKEN_FILE, "w") as token:
-                token.write(creds.to_json())
+            self.credential_manager.adopt(creds)
 
-        return build("youtube", "v3", credentials=creds, cache_discovery=False)
+        # Keep the token fresh in the background; the Data and Analytics services share it
+        self.credential_manager.start()
+        self.credentials = creds
+        return build_service("youtube", "v3", credentials=creds, request_builder=self._build_request)
 
     def upload_video(
         self,
@@ -79,9 +153,17 @@ class YouTubeUploader:
         tags: Optional[List[str]] = None,
         category_id: str = "22",
         privacy_status: str = "private",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[ProgressCallback] = None,
+        before_chunk: Optional[ChunkCallback] = None,
     ) -> dict:
         """Uploads a video to the authenticated user's channel.
 
+        The file is sent in fixed-size chunks. Transient errors retry the current
+        chunk with exponential backoff, and the session URI is kept in
+        ``self.upload_sessions`` so calling again after a crash or restart resumes
+        where the server stopped instead of from byte zero.
+
         Args:
             file_path: Path to the video file.
             title: Video title.
@@ -89,6 +171,9 @@ class YouTubeUploader:
             tags: List of tags.
             category_id: Numeric YouTube category ID. Defaults to 22 (People & Blogs).
             privacy_status: one of "public", "private", "unlisted".
+            chunk_size: Bytes per request (rounded up to a multiple of 256 KiB).
+            progress_callback: Called with (bytes_uploaded, total_bytes) after each chunk.
+            before_chunk: Called with the size of each chunk before it is sent (e.g. to rate-limit).
 
         Returns:
             The API response with the newly created video resource.
@@ -109,71 +194,120 @@ class YouTubeUploader:
             "status": {"privacyStatus": privacy_status},
         }
 
-        media_body = MediaFileUpload(file_path, chunksize=-1, resumable=True)
-
-        request = self.youtube.videos().insert(
-            part=",".join(body.keys()),
-            body=body,
-            media_body=media_body,
+        return resumable_insert(
+            self.youtube,
+            file_path,
+            body,
+            chunk_size=chunk_size,
+            progress_callback=progress_callback,
+            sessions=self.upload_sessions,
+            before_chunk=before_chunk,
         )
 
-        print("Initiating upload...")
-        response = None
-        while response is None:
-            try:
-                status, response = request.next_chunk()
-                if status:
-                    progress = int(status.progress() * 100)
-                    print(f"Upload progress: {progress}%")
-            except HttpError as err:
-                if err.resp.status in {500, 502, 503, 504}:
-                    print(f"Retriable HTTP error {err.resp.status}: {err.content}. Retrying...")
-                    time.sleep(random.random() * 5 + 1)
-                else:
-                    raise
-
-        print(f"Upload complete. Video ID: {response.get('id')}")
-        return response
-
     # --------------------------------------------
     # Additional helper methods
     # --------------------------------------------
 
-    def search_videos(self, query: str, max_results: int = 10) -> list:
-        """Search YouTube videos by a query string."""
-        response = (
-            self.youtube.search()
-            .list(q=query, part="id,snippet", type="video", maxResults=max_results)
-            .execute()
-        )
+    def search_videos(self, query: str, max_results: int = 10, fields: Optional[Sequence[str]] = None) -> list:
+        """Search YouTube videos by a query string.
+
+        ``fields`` (dotted paths such as "snippet.title") limits each result to those fields.
+        """
+        params = {"q": query, "part": "id,snippet", "type": "video", "maxResults": max_results}
+        if fields:
+            params["part"], params["fields"] = youtube_params(fields)
+        response = self.youtube.search().list(**params).execute()
         return response.get("items", [])
 
-    def get_video_details(self, video_id: str) -> dict:
+    def get_video_details(self, video_id: str, fields: Optional[Sequence[str]] = None) -> dict:
         """Retrieve detailed metadata for a single video.
 
-        Returns the full item dict. Raises ValueError if the video is not found
-        or if the response does not include the requested parts.
+        Returns the full item dict (or only ``fields`` of it). Raises ValueError if the
+        video is not found or if the response does not include the requested parts.
         """
-        response = (
-            self.youtube.videos()
-            .list(id=video_id, part="snippet,statistics,contentDetails,status")
-            .execute()
-        )
-
-        items = response.get("items", [])
-        if not items:
+        item = self.get_videos_details([video_id], fields=fields)[0]
+        if item.get("notFound"):
             raise ValueError(f"Video '{video_id}' not found or unavailable in API response.")
+        return item
+
+    def _thread_http(self):
+        """Authorized httplib2 client for the calling thread (httplib2.Http is not thread-safe)"""
+        http = getattr(self._http_local, "http", None)
+        if http is None:
+            import google_auth_httplib2
+            import httplib2
+            http = self._http_local.http = google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+        return http
+
+    def _build_request(self, http, *args, **kwargs):
+        """requestBuilder for the services: each request uses the calling thread's own connection,
+        so one service object can be shared by the MCP tool pool and the concurrent helpers.
+
+        Every Data API request is also admitted by ``self.quota`` when it is sent, so a call
+        that doesn't fit the remaining daily budget raises QuotaExceededError without going out
+        (resuming a saved upload session is not charged again, see ``charge_on_send``).
+        GET requests are made conditional on the ETag in ``self.etag_cache``.
+        """
+        from googleapiclient.http import HttpRequest
+        method_id = kwargs.get("methodId")
+        request = HttpRequest(self._thread_http(), *args, **kwargs)
+        if self.quota is not None:
+            if method_id:
+                charge_on_send(request, self.quota, method_id, timeout=self.quota_wait)
+            track_exhaustion(request, self.quota.ledger)
+        if self.etag_cache is not None:
+            self.etag_cache.wrap(request)
+        return request
+
+    def get_quota_status(self) -> dict:
+        """Today's Data API quota: used, remaining, what each priority may still spend, reset time."""
+        if self.quota is None:
+            return {"error": "Quota tracking is disabled"}
+        return self.quota.status()
+
+    def get_videos_details(self, video_ids: List[str], part: str = VIDEO_DETAIL_PARTS,
+                           max_workers: int = 4, fields: Optional[Sequence[str]] = None) -> List[dict]:
+        """Retrieve metadata for many videos in as few calls as possible.
+
+        IDs are de-duplicated and sent 50 per ``videos.list`` call; the calls run
+        concurrently on up to ``max_workers`` threads. ``fields`` (dotted paths such
+        as "statistics.viewCount") replaces ``part`` with the parts and fields they need.
+
+        Returns one item per input ID, in input order. Videos that don't exist
+        or aren't visible come back as ``{"id": ..., "notFound": True}``.
+        """
+        unique_ids = list(dict.fromkeys(video_ids))
+        chunks = [unique_ids[i:i + MAX_IDS_PER_VIDEOS_LIST]
+                  for i in range(0, len(unique_ids), MAX_IDS_PER_VIDEOS_LIST)]
 
-        item = items[0]
-        # Ensure statistics are present; if not, this usually indicates the channel disabled stats
-        if "statistics" not in item:
-            # Populate empty statistics object so code accessing item["statistics"] doesn't crash
-            item["statistics"] = {}
+        params = {"part": part}
+        if fields:
+            params["part"], params["fields"] = youtube_params(with_fields(fields, "id"), list_fields=())
 
-        return item
+        def fetch(chunk: List[str]) -> List[dict]:
+            return self.youtube.videos().list(id=",".join(chunk), **params).execute().get("items", [])
 
-    def get_channel_info(self, channel_id: Optional[str] = None, for_username: Optional[str] = None, mine: bool = False) -> dict:
-        """Fetch channel information by ID, username, or the authenticated user's channel (mine=True)."""
+        found = {}
+        if len(chunks) <= 1:
+            results = map(fetch, chunks)
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as pool:
+                results = list(pool.map(fetch, chunks))
+        for items in results:
+            for item in items:
+                # Populate empty statistics object so code accessing item["statistics"] doesn't crash
+                # (missing statistics usually means the channel disabled them)
+                item.setdefault("statistics", {})
+                found[item["id"]] = item
+
+        return [found.get(video_id, {"id": video_id, "notFound": True}) for video_id in video_ids]
+
+    def get_channel_info(self, channel_id: Optional[str] = None, for_username: Optional[str] = None, mine: bool = False,
+                         fields: Optional[Sequence[str]] = None) -> dict:
+        """Fetch channel information by ID, username, or the authenticated user's channel (mine=True).
+
+        ``fields`` (dotted paths such as "statistics.subscriberCount") limits the response to those fields.
+        """
         if sum(bool(x) for x in [channel_id, for_username, mine]) != 1:
             raise ValueError("Provide exactly one of channel_id, for_username, or set mine=True")
 
@@ -184,10 +318,18 @@ class YouTubeUploader:
             params["forUsername"] = for_username
         else:
             params["mine"] = True
+        if fields:
+            params["part"], params["fields"] = youtube_params(fields, list_fields=())
 
         response = self.youtube.channels().list(**params).execute()
         return response.get("items", [None])[0] if response.get("items") else {}
 
+    def _my_channel_id(self) -> Optional[str]:
+        """ID of the authenticated user's channel (looked up once), or None if the account has none"""
+        if self._channel_id is None:
+            self._channel_id = self.get_channel_info(mine=True, fields=["id"]).get("id")
+        return self._channel_id
+
     def list_comments(self, video_id: str, max_results: int = 20) -> list:
         """Retrieve top-level comments (threads) for a video."""
         response = (
@@ -197,6 +339,17 @@ class YouTubeUploader:
         )
         return response.get("items", [])
 
+    def iter_comments(self, video_id: str, expand_replies: bool = True, max_workers: int = 4,
+                      limit: Optional[int] = None, order: str = "time") -> Iterator[CommentRow]:
+        """Stream every comment and reply of a video as flat CommentRow tuples.
+
+        Follows ``nextPageToken`` through all comment threads and fetches full
+        reply threads concurrently (see youtube_comments.iter_comments). Memory
+        stays bounded by one page of threads, however many comments the video has.
+        """
+        return iter_comments(self.youtube, video_id, expand_replies=expand_replies,
+                             max_workers=max_workers, limit=limit, order=order)
+
     def delete_video(self, video_id: str) -> None:
         """Permanently delete a video owned by the authenticated user."""
         self.youtube.videos().delete(id=video_id).execute()
@@ -205,8 +358,12 @@ class YouTubeUploader:
     # ------------------ Analytics ------------------
     def _get_analytics_service(self):
         """Lazily build a YouTube Analytics API client using existing creds."""
-        if not hasattr(self, "_yt_analytics"):
-            self._yt_analytics = build("youtubeAnalytics", "v2", credentials=self.youtube._http.credentials, cache_discovery=False)
+        if self._yt_analytics is None:
+            self.youtube  # make sure credentials are loaded (takes the service lock itself)
+            with self._service_lock:
+                if self._yt_analytics is None:
+                    self._yt_analytics = build_service("youtubeAnalytics", "v2", credentials=self.credentials,
+                                                       request_builder=self._build_request)
         return self._yt_analytics
 
     def get_analytics_report(
@@ -217,9 +374,16 @@ class YouTubeUploader:
         dimensions: str = "day",
         ids: str = "channel==MINE",
         filters: Optional[str] = None,
-        max_results: int = 100
+        max_results: int = 100,
+        use_cache: bool = True
     ) -> dict:
-        """Query YouTube Analytics. Dates must be YYYY-MM-DD."""
+        """Query YouTube Analytics. Dates must be YYYY-MM-DD.
+
+        Reports broken down by ``day`` go through ``analytics_store``: only days
+        that are not stored yet, or recent enough to still change, are queried.
+        Rows for ``MINE`` are stored under the resolved channel ID, so another
+        login sharing the store never reads them.
+        """
         analytics = self._get_analytics_service()
         query_params = {
             "ids": ids,
@@ -231,12 +395,30 @@ class YouTubeUploader:
         }
         if filters:
             query_params["filters"] = filters
-        return analytics.reports().query(**query_params).execute()
+        cacheable = use_cache and self.analytics_store is not None and is_cacheable(dimensions)
+        store_ids = ids
+        if cacheable and "MINE" in ids:
+            channel_id = self._my_channel_id()
+            cacheable = bool(channel_id)
+            store_ids = ids.replace("MINE", channel_id or "")
+        if not cacheable:
+            return analytics.reports().query(**query_params).execute()
+
+        def fetch(start: str, end: str) -> dict:
+            # Stored days must be complete, so ranges are fetched without maxResults
+            params = {**query_params, "startDate": start, "endDate": end}
+            del params["maxResults"]
+            return analytics.reports().query(**params).execute()
+
+        return self.analytics_store.query(fetch, store_ids, metrics, dimensions, start_date, end_date,
+                                          filters=filters, max_results=max_results)
 
 
 if __name__ == "__main__":
     import argparse
 
+    from googleapiclient.errors import HttpError
+
     parser = argparse.ArgumentParser(description="Upload a video to YouTube.")
     parser.add_argument("--file",  help="Path to the video file to upload")
     parser.add_argument("--title", default="Test Title", help="Video title")
@@ -260,13 +442,15 @@ if __name__ == "__main__":
 
     uploader = YouTubeUploader()
     try:
-        uploader.upload_video(
+        response = uploader.upload_video(
             file_path="Base APIs/media/AI Marketer.mp4",
             title=args.title,
             description=args.description,
             tags=tags_list,
             category_id=args.category,
             privacy_status=args.privacy,
+            progress_callback=lambda sent, total: print(f"Upload progress: {sent * 100 // total}%"),
         )
+        print(f"Upload complete. Video ID: {response.get('id')}")
     except HttpError as e:
         print(f"An HTTP error {e.resp.status} occurred: {e.content}")
@@ -0,0 +1,199 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import Optional, Dict, Any, List, Callable, Tuple
+
+ANALYTICS_DB = os.getenv('YOUTUBE_ANALYTICS_DB',
+                         os.path.join(os.path.dirname(__file__), '.youtube_analytics.sqlite3'))
+# YouTube Analytics keeps revising the most recent days (data lands 2-3 days
+# late, in Pacific time); a day is only final once it was fetched this many
+# days after it ended.
+MUTABLE_DAYS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queries (
+    query_key TEXT PRIMARY KEY,
+    headers   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS days (
+    query_key  TEXT NOT NULL,
+    day        TEXT NOT NULL,
+    rows       TEXT NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (query_key, day)
+) WITHOUT ROWID;
+"""
+
+# fetch(start_date, end_date) -> reports.query response for that range
+ReportFetcher = Callable[[str, str], Dict[str, Any]]
+
+
+def query_key(ids: str, metrics: str, dimensions: str, filters: Optional[str] = None) -> str:
+    """Stable key for everything that determines a report's rows except the dates"""
+    split = lambda value: [part.strip() for part in (value or '').split(',') if part.strip()]
+    return json.dumps({
+        'ids': ids.strip(),
+        # Metric and dimension order decides the column order, so keep it
+        'metrics': split(metrics),
+        'dimensions': split(dimensions),
+        'filters': sorted(part.strip() for part in (filters or '').split(';') if part.strip()),
+    }, sort_keys=True)
+
+
+def is_cacheable(dimensions: str) -> bool:
+    """Only reports broken down by ``day`` can be stored and merged per day"""
+    return 'day' in [part.strip() for part in dimensions.split(',')]
+
+
+def _day_runs(days: List[date]) -> List[Tuple[date, date]]:
+    """Collapse sorted days into contiguous (first, last) ranges"""
+    runs: List[Tuple[date, date]] = []
+    for day in days:
+        if runs and day == runs[-1][1] + timedelta(days=1):
+            runs[-1] = (runs[-1][0], day)
+        else:
+            runs.append((day, day))
+    return runs
+
+
+class AnalyticsStore:
+    """
+    Per-day store of YouTube Analytics report rows in SQLite.
+
+    Rows are kept per (ids, metrics, dimensions, filters) and day. A query only
+    asks the API for the days that are missing or not yet final - one request
+    per contiguous run of such days - and merges the answer with the stored
+    days. A day counts as final when it was fetched at least ``mutable_days``
+    after it ended; until then every query re-fetches it.
+    """
+
+    def __init__(self, path: Optional[str] = None, mutable_days: int = MUTABLE_DAYS, timeout: float = 30.0):
+        self.path = path or ANALYTICS_DB
+        self.mutable_days = mutable_days
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def _is_final(self, day: date, fetched_at: date) -> bool:
+        return (fetched_at - day).days >= self.mutable_days
+
+    def missing_days(self, key: str, start: date, end: date) -> List[date]:
+        """Days of ``start..end`` that have to come from the API"""
+        stored = dict(self._connect().execute(
+            'SELECT day, fetched_at FROM days WHERE query_key = ? AND day BETWEEN ? AND ?',
+            (key, start.isoformat(), end.isoformat())).fetchall())
+        missing = []
+        day = start
+        while day <= end:
+            fetched_at = stored.get(day.isoformat())
+            if fetched_at is None or not self._is_final(day, date.fromisoformat(fetched_at)):
+                missing.append(day)
+            day += timedelta(days=1)
+        return missing
+
+    def store(self, key: str, start: date, end: date, response: Dict[str, Any],
+              today: Optional[date] = None) -> None:
+        """Record the rows of a response covering ``start..end`` (days without rows included)"""
+        headers = response.get('columnHeaders', [])
+        names = [header.get('name') for header in headers]
+        if 'day' not in names:
+            raise ValueError("Response has no 'day' column")
+        day_column = names.index('day')
+        by_day: Dict[str, List[list]] = {}
+        day = start
+        while day <= end:
+            by_day[day.isoformat()] = []
+            day += timedelta(days=1)
+        for row in response.get('rows') or []:
+            by_day.setdefault(row[day_column], []).append(row)
+
+        fetched_at = (today or date.today()).isoformat()
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('INSERT OR REPLACE INTO queries (query_key, headers) VALUES (?, ?)',
+                         (key, json.dumps(headers)))
+            conn.executemany('INSERT OR REPLACE INTO days (query_key, day, rows, fetched_at) VALUES (?, ?, ?, ?)',
+                             [(key, day_key, json.dumps(rows), fetched_at) for day_key, rows in by_day.items()])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def load(self, key: str, start: date, end: date) -> Tuple[List[Dict[str, Any]], List[list]]:
+        """Stored column headers and rows of ``start..end``, in day order"""
+        conn = self._connect()
+        headers = conn.execute('SELECT headers FROM queries WHERE query_key = ?', (key,)).fetchone()
+        rows: List[list] = []
+        for (day_rows,) in conn.execute('SELECT rows FROM days WHERE query_key = ? AND day BETWEEN ? AND ? '
+                                        'ORDER BY day', (key, start.isoformat(), end.isoformat())):
+            rows.extend(json.loads(day_rows))
+        return (json.loads(headers[0]) if headers else []), rows
+
+    def query(self, fetch: ReportFetcher, ids: str, metrics: str, dimensions: str, start_date: str,
+              end_date: str, filters: Optional[str] = None, max_results: Optional[int] = None,
+              today: Optional[date] = None) -> Dict[str, Any]:
+        """
+        Report for ``start_date..end_date`` built from stored days plus API
+        calls (through ``fetch``) for the missing or still-mutable ones.
+
+        The response has the shape of ``reports.query`` with an extra ``cache``
+        entry counting stored and fetched days.
+        """
+        if not is_cacheable(dimensions):
+            raise ValueError("Only reports with a 'day' dimension can be cached")
+        start, end = date.fromisoformat(start_date), date.fromisoformat(end_date)
+        if end < start:
+            raise ValueError("end_date must not be before start_date")
+        key = query_key(ids, metrics, dimensions, filters)
+        missing = self.missing_days(key, start, end)
+        for run_start, run_end in _day_runs(missing):
+            response = fetch(run_start.isoformat(), run_end.isoformat())
+            self.store(key, run_start, run_end, response, today)
+
+        headers, rows = self.load(key, start, end)
+        total_days = (end - start).days + 1
+        return {
+            'kind': 'youtubeAnalytics#resultTable',
+            'columnHeaders': headers,
+            'rows': rows[:max_results] if max_results else rows,
+            'cache': {'stored_days': total_days - len(missing), 'fetched_days': len(missing),
+                      'requests': len(_day_runs(missing))},
+        }
+
+    def invalidate(self, key: Optional[str] = None, since: Optional[str] = None) -> int:
+        """Drop stored days (of one query key, and/or from ``since`` on). Returns the number removed."""
+        clauses, params = [], []
+        if key is not None:
+            clauses.append('query_key = ?')
+            params.append(key)
+        if since is not None:
+            clauses.append('day >= ?')
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._connect().execute(f'DELETE FROM days{where}', params).rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        queries, days = conn.execute('SELECT COUNT(DISTINCT query_key), COUNT(*) FROM days').fetchone()
+        return {'queries': queries, 'days': days, 'path': self.path}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
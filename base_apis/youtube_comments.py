@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, NamedTuple, Optional
+
+# Largest page commentThreads.list / comments.list will return
+MAX_PAGE_SIZE = 100
+
+
+class CommentRow(NamedTuple):
+    """
+    One comment in a flat stream. ``parent`` is the ``index`` of the top-level
+    comment a reply belongs to (-1 for top-level comments), so a whole video's
+    discussion fits in tuples instead of nested API dicts.
+    """
+    index: int
+    parent: int
+    id: str
+    author: str
+    text: str
+    published_at: str
+    like_count: int
+    reply_count: int
+
+
+def _row(index: int, parent: int, comment: dict, reply_count: int = 0) -> CommentRow:
+    snippet = comment.get("snippet", {})
+    return CommentRow(
+        index,
+        parent,
+        comment.get("id", ""),
+        snippet.get("authorDisplayName", ""),
+        snippet.get("textDisplay", ""),
+        snippet.get("publishedAt", ""),
+        int(snippet.get("likeCount", 0)),
+        reply_count,
+    )
+
+
+def fetch_replies(youtube, parent_id: str, text_format: str = "plainText") -> List[dict]:
+    """Every reply of one thread via comments.list (the thread itself only inlines a few)"""
+    replies: List[dict] = []
+    page_token: Optional[str] = None
+    while True:
+        params = {"parentId": parent_id, "part": "snippet", "maxResults": MAX_PAGE_SIZE, "textFormat": text_format}
+        if page_token:
+            params["pageToken"] = page_token
+        response = youtube.comments().list(**params).execute()
+        replies.extend(response.get("items", []))
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return replies
+
+
+def iter_comments(youtube, video_id: str, expand_replies: bool = True, max_workers: int = 4,
+                  limit: Optional[int] = None, order: str = "time",
+                  text_format: str = "plainText") -> Iterator[CommentRow]:
+    """
+    Stream every comment of a video as CommentRow tuples.
+
+    Walks all commentThreads pages. Threads whose inline ``replies`` are
+    incomplete get their full reply list from comments.list, fetched
+    concurrently for the threads of the current page. Rows come out in thread
+    order, each top-level comment followed by its replies, and only one page
+    of threads is held in memory at a time.
+
+    Args:
+        youtube: YouTube Data API service (must be safe to use from several threads)
+        video_id: Video to read
+        expand_replies: Fetch complete reply threads (False: inline replies only)
+        max_workers: Concurrent comments.list calls
+        limit: Stop after this many rows
+        order: "time" or "relevance"
+        text_format: "plainText" or "html"
+    """
+    index = 0
+    page_token: Optional[str] = None
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="yt-replies")
+    try:
+        while True:
+            params = {"videoId": video_id, "part": "snippet,replies", "maxResults": MAX_PAGE_SIZE,
+                      "order": order, "textFormat": text_format}
+            if page_token:
+                params["pageToken"] = page_token
+            response = youtube.commentThreads().list(**params).execute()
+            threads = response.get("items", [])
+
+            # Start every reply expansion of this page before emitting anything
+            pending = {}
+            if expand_replies:
+                for thread in threads:
+                    snippet = thread.get("snippet", {})
+                    inline = thread.get("replies", {}).get("comments", [])
+                    if snippet.get("totalReplyCount", 0) > len(inline):
+                        top_id = snippet.get("topLevelComment", {}).get("id", thread.get("id"))
+                        pending[thread.get("id")] = pool.submit(fetch_replies, youtube, top_id, text_format)
+
+            for thread in threads:
+                snippet = thread.get("snippet", {})
+                parent = index
+                yield _row(index, -1, snippet.get("topLevelComment", {}), snippet.get("totalReplyCount", 0))
+                index += 1
+                if limit is not None and index >= limit:
+                    return
+                future = pending.pop(thread.get("id"), None)
+                if future is not None:
+                    replies = future.result()
+                else:
+                    replies = thread.get("replies", {}).get("comments", [])
+                for reply in replies:
+                    yield _row(index, parent, reply)
+                    index += 1
+                    if limit is not None and index >= limit:
+                        return
+
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return
+    finally:
+        # Don't wait on expansions nobody will read (limit reached or consumer stopped early)
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,201 @@
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import List, Optional
+
+# Refresh this long before the access token expires (tokens last an hour)
+REFRESH_MARGIN_SECS = 5 * 60
+# Re-read the token file at least this often, in case another process refreshed it
+RECHECK_SECS = 10 * 60
+RETRY_BASE_SECS = 15.0
+RETRY_CAP_SECS = 5 * 60
+
+
+def _utcnow() -> datetime:
+    # google-auth keeps expiry as a naive UTC datetime
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock on ``path`` across processes (blocks until acquired)"""
+    with open(path, 'a+') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class CredentialManager:
+    """
+    One live set of user OAuth credentials, refreshed ahead of expiry.
+
+    A background thread refreshes the access token ``refresh_margin`` seconds
+    before it expires, so requests never wait on the token endpoint. Refreshes
+    that google-auth triggers on the request path (expired token, 401) go
+    through the same lock and are de-duplicated: threads that raced to refresh
+    simply pick up the new token. Across processes, refreshes are serialized by
+    a lock file and a process first adopts a fresher token another one already
+    wrote. The token file is replaced atomically.
+
+    The Credentials object itself is updated in place, so every service and
+    http built on ``credentials`` sees the new token.
+    """
+
+    def __init__(self, token_file: str, scopes: List[str], refresh_margin: float = REFRESH_MARGIN_SECS):
+        self.token_file = token_file
+        self.scopes = scopes
+        self.refresh_margin = refresh_margin
+        self.credentials = None
+        self.refreshes = 0
+        self.adopted = 0
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def _lock_file(self) -> str:
+        return f"{self.token_file}.lock"
+
+    def _read_file(self):
+        from google.oauth2.credentials import Credentials
+        if not os.path.exists(self.token_file):
+            return None
+        try:
+            return Credentials.from_authorized_user_file(self.token_file, self.scopes)
+        except (OSError, ValueError):
+            return None
+
+    def _write_file(self, creds) -> None:
+        tmp_path = f"{self.token_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(creds.to_json())
+        os.replace(tmp_path, self.token_file)
+
+    def _seconds_left(self, creds) -> float:
+        if creds is None or creds.expiry is None:
+            return 0.0
+        return (creds.expiry - _utcnow()).total_seconds()
+
+    def load(self):
+        """
+        Credentials from the token file, refreshed now if they are close to
+        expiry. Returns None if there is no usable token (a new login is needed).
+        """
+        with self._lock, _file_lock(self._lock_file):
+            creds = self._read_file()
+            if creds is None:
+                return None
+            if self._seconds_left(creds) <= self.refresh_margin:
+                if not creds.refresh_token:
+                    return None
+                self._refresh_locked(creds)
+        return self.adopt(creds, save=False)
+
+    def adopt(self, creds, save: bool = True):
+        """Manage ``creds`` (e.g. fresh from a login flow) and optionally save them"""
+        if save:
+            with self._lock, _file_lock(self._lock_file):
+                self._write_file(creds)
+        # Refreshes google-auth would do on the request path come to us instead
+        creds.refresh = lambda request: self._refresh_from_request(creds, request)
+        self.credentials = creds
+        return creds
+
+    def _refresh_locked(self, creds, request=None) -> None:
+        # Caller holds both locks
+        from google.auth.transport.requests import Request
+        type(creds).refresh(creds, request or Request())
+        self._write_file(creds)
+        self.refreshes += 1
+
+    def _adopt_newer_locked(self, creds) -> bool:
+        """Take over a token another process wrote, if it is good for longer than ours"""
+        stored = self._read_file()
+        if stored is None or stored.token == creds.token:
+            return False
+        if self._seconds_left(stored) <= max(self.refresh_margin, self._seconds_left(creds)):
+            return False
+        creds.token = stored.token
+        creds.expiry = stored.expiry
+        if stored.refresh_token:
+            creds._refresh_token = stored.refresh_token
+        self.adopted += 1
+        return True
+
+    def _refresh_from_request(self, creds, request) -> None:
+        seen = creds.token
+        with self._lock:
+            if creds.token != seen:
+                return  # another thread refreshed while we waited
+            with _file_lock(self._lock_file):
+                if not self._adopt_newer_locked(creds):
+                    self._refresh_locked(creds, request)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Refresh (or adopt a fresher stored token) if within the margin of expiry. True if the token changed."""
+        creds = self.credentials
+        if creds is None:
+            return False
+        with self._lock, _file_lock(self._lock_file):
+            if self._adopt_newer_locked(creds):
+                return True
+            if not force and self._seconds_left(creds) > self.refresh_margin:
+                return False
+            self._refresh_locked(creds)
+            return True
+
+    def _run(self) -> None:
+        failures = 0
+        while True:
+            wait = self._seconds_left(self.credentials) - self.refresh_margin
+            if failures:
+                wait = min(RETRY_BASE_SECS * 2 ** (failures - 1), RETRY_CAP_SECS)
+            if self._stop.wait(max(1.0, min(wait, RECHECK_SECS))):
+                return
+            try:
+                self.refresh()
+                failures = 0
+                self.last_error = None
+            except Exception as e:
+                # Keep the old token; the request path can still refresh on its own
+                failures += 1
+                self.last_error = str(e)
+
+    def start(self) -> None:
+        """Start the background refresher (idempotent)"""
+        if self.credentials is None or not self.credentials.refresh_token:
+            return
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='youtube-token-refresh', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def status(self) -> dict:
+        creds = self.credentials
+        return {
+            'expires_in_secs': round(self._seconds_left(creds)) if creds is not None else None,
+            'refreshes': self.refreshes,
+            'adopted_from_file': self.adopted,
+            'background_refresh': self._thread is not None and self._thread.is_alive(),
+            'last_error': self.last_error,
+        }
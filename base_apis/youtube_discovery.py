@@ -0,0 +1,174 @@
+"""
+Discovery documents for the YouTube clients, served from disk.
+
+``build_service`` builds a googleapiclient service from the newest document
+available locally - the on-disk cache or the copy bundled with
+google-api-python-client, compared by ``revision`` - so starting a client never
+waits on the network. When the cached copy is older than REFRESH_AFTER_SECS a
+background thread re-downloads it (conditional on its ETag) for the next start.
+
+    python youtube_discovery.py            # refresh every cached document now
+"""
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Optional, Dict, Any, Tuple
+
+DISCOVERY_DIR = os.getenv('YOUTUBE_DISCOVERY_DIR',
+                          os.path.join(os.path.dirname(__file__), '.youtube_discovery'))
+REFRESH_AFTER_SECS = 7 * 24 * 3600
+FETCH_TIMEOUT_SECS = 10.0
+
+DISCOVERY_URLS: Dict[Tuple[str, str], str] = {
+    ('youtube', 'v3'): 'https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest',
+    ('youtubeAnalytics', 'v2'): 'https://youtubeanalytics.googleapis.com/$discovery/rest?version=v2',
+}
+
+_refreshing = set()
+_refresh_lock = threading.Lock()
+
+
+def _paths(service: str, version: str) -> Tuple[str, str]:
+    base = os.path.join(DISCOVERY_DIR, f"{service}.{version}")
+    return f"{base}.json", f"{base}.meta.json"
+
+
+def _write_atomic(path: str, content: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _read_cached(service: str, version: str) -> Tuple[Optional[str], Dict[str, Any]]:
+    doc_path, meta_path = _paths(service, version)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+        with open(doc_path, encoding='utf-8') as f:
+            return f.read(), meta
+    except (OSError, ValueError):
+        return None, {}
+
+
+def _bundled(service: str, version: str) -> Optional[str]:
+    try:
+        from googleapiclient.discovery_cache import get_static_doc
+    except ImportError:
+        return None
+    return get_static_doc(service, version)
+
+
+def _revision(document: str) -> str:
+    return json.loads(document).get('revision', '')
+
+
+def refresh_document(service: str, version: str, timeout: float = FETCH_TIMEOUT_SECS) -> bool:
+    """
+    Download the current document into the cache.
+
+    Sends the cached ETag so an unchanged document costs a 304, and never
+    replaces the cache with an older revision. Returns True if the cache now
+    holds a fresh copy.
+    """
+    url = DISCOVERY_URLS.get((service, version))
+    if url is None:
+        return False
+    cached, meta = _read_cached(service, version)
+    request = urllib.request.Request(url)
+    if cached is not None and meta.get('etag'):
+        request.add_header('If-None-Match', meta['etag'])
+    doc_path, meta_path = _paths(service, version)
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            document = response.read().decode('utf-8')
+            etag = response.headers.get('ETag')
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and cached is not None:
+            _write_atomic(meta_path, json.dumps({**meta, 'checked_at': time.time()}))
+            return True
+        return False
+    except (urllib.error.URLError, OSError):
+        return False
+
+    revision = _revision(document)
+    if cached is not None and revision < meta.get('revision', ''):
+        return False
+    _write_atomic(doc_path, document)
+    _write_atomic(meta_path, json.dumps({'revision': revision, 'etag': etag, 'checked_at': time.time()}))
+    return True
+
+
+def _refresh_in_background(service: str, version: str) -> None:
+    with _refresh_lock:
+        if (service, version) in _refreshing:
+            return
+        _refreshing.add((service, version))
+
+    def run() -> None:
+        try:
+            refresh_document(service, version)
+        finally:
+            with _refresh_lock:
+                _refreshing.discard((service, version))
+
+    threading.Thread(target=run, name=f'discovery-refresh-{service}', daemon=True).start()
+
+
+def load_document(service: str, version: str, refresh: bool = True) -> str:
+    """
+    Newest locally available discovery document for ``service``/``version``.
+
+    Falls back to a blocking download only when neither a cached nor a bundled
+    copy exists. With ``refresh``, a stale cache is re-checked in the background.
+    """
+    cached, meta = _read_cached(service, version)
+    bundled = _bundled(service, version)
+    if cached is not None and bundled is not None and _revision(bundled) > meta.get('revision', ''):
+        # The installed client library ships a newer document than our cache
+        cached = None
+    document = cached if cached is not None else bundled
+    if document is not None:
+        if refresh and time.time() - meta.get('checked_at', 0) > REFRESH_AFTER_SECS:
+            _refresh_in_background(service, version)
+        return document
+    if refresh_document(service, version):
+        return _read_cached(service, version)[0]
+    raise FileNotFoundError(f"No discovery document available for {service} {version}")
+
+
+def preload(services=tuple(DISCOVERY_URLS)) -> threading.Thread:
+    """
+    Import the Google client stack and read the discovery documents on a
+    background thread, so a server can start answering immediately and still
+    have a warm first call.
+    """
+    def run() -> None:
+        import googleapiclient.discovery  # noqa: F401
+        import google.oauth2.credentials  # noqa: F401
+        for service, version in services:
+            try:
+                load_document(service, version)
+            except FileNotFoundError:
+                pass
+
+    thread = threading.Thread(target=run, name='discovery-preload', daemon=True)
+    thread.start()
+    return thread
+
+
+def build_service(service: str, version: str, credentials=None, refresh: bool = True, request_builder=None):
+    """googleapiclient service built from a local discovery document"""
+    from googleapiclient.discovery import build_from_document
+    kwargs = {'requestBuilder': request_builder} if request_builder is not None else {}
+    return build_from_document(load_document(service, version, refresh), credentials=credentials, **kwargs)
+
+
+if __name__ == '__main__':
+    for service_name, service_version in DISCOVERY_URLS:
+        ok = refresh_document(service_name, service_version)
+        print(f"{service_name} {service_version}: {'up to date' if ok else 'refresh failed'}")
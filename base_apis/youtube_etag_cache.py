@@ -0,0 +1,109 @@
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional
+
+DEFAULT_MAX_ENTRIES = 512
+# Bound on the summed size of the cached response bodies (as sent over the wire)
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class _Entry(NamedTuple):
+    etag: str
+    body: Any
+    size: int
+
+
+class ConditionalRequestCache:
+    """
+    ETag cache for GET requests of the Google API clients.
+
+    ``wrap`` hooks into a googleapiclient HttpRequest: a request for a URI we
+    already hold sends ``If-None-Match`` and a 304 answer is served from the
+    stored body, so polling unchanged resources moves headers only. Entries are
+    evicted least-recently-used beyond ``max_entries`` or ``max_bytes``.
+    Callers get their own copy of a cached body and may mutate it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.not_modified = 0
+        self.modified = 0
+        self.evictions = 0
+        self._bytes = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _put(self, key: str, entry: _Entry) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def wrap(self, request):
+        """Make a GET ``HttpRequest`` conditional; other requests are returned untouched"""
+        if request.method != 'GET' or request.resumable is not None:
+            return request
+        from googleapiclient.errors import HttpError
+
+        key = request.uri
+        execute, postproc = request.execute, request.postproc
+
+        def store(resp, content):
+            body = postproc(resp, content)
+            etag = resp.get('etag') or (body.get('etag') if isinstance(body, dict) else None)
+            if etag:
+                with self._lock:
+                    self.modified += 1
+                self._put(key, _Entry(etag, copy.deepcopy(body), len(content or b'')))
+            return body
+
+        def conditional_execute(*args, **kwargs):
+            entry = self._get(key)
+            if entry is not None:
+                request.headers['If-None-Match'] = entry.etag
+            try:
+                return execute(*args, **kwargs)
+            except HttpError as e:
+                if entry is None or e.resp.status != 304:
+                    raise
+                with self._lock:
+                    self.not_modified += 1
+                return copy.deepcopy(entry.body)
+
+        request.postproc = store
+        request.execute = conditional_execute
+        return request
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            answered = self.not_modified + self.modified
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'not_modified': self.not_modified,
+                'modified': self.modified,
+                'not_modified_rate': round(self.not_modified / answered, 3) if answered else 0.0,
+                'evictions': self.evictions,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
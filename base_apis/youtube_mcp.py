@@ -1,7 +1,14 @@
 from typing import Any, List, Optional
+import itertools
 import json
+import threading
 from mcp.server.fastmcp import FastMCP
-from youtube import YouTubeUploader
+from tool_executor import ToolExecutor
+from youtube import CHANNEL_INFO_FIELDS, SEARCH_RESULT_FIELDS, VIDEO_DETAIL_FIELDS, YouTubeUploader
+from youtube_comments import CommentRow
+from youtube_discovery import preload
+from youtube_upload import UploadCancelled
+from youtube_upload_scheduler import UploadScheduler
 
 # Initialize FastMCP server
 mcp = FastMCP("youtube")
@@ -9,6 +16,9 @@ mcp = FastMCP("youtube")
 # Global YouTube uploader instance
 youtube_uploader = None
 
+# Blocking API calls run here so one long upload can't stall the stdio server
+executor = ToolExecutor()
+
 def get_youtube_uploader():
     """Get or create YouTube uploader instance."""
     global youtube_uploader
@@ -16,6 +26,18 @@ def get_youtube_uploader():
         youtube_uploader = YouTubeUploader()
     return youtube_uploader
 
+# Background batch uploads; its bandwidth cap (YOUTUBE_UPLOAD_RATE_LIMIT) also paces upload_video
+upload_scheduler = None
+_upload_scheduler_lock = threading.Lock()
+
+def get_upload_scheduler():
+    """Get or create the upload scheduler."""
+    global upload_scheduler
+    with _upload_scheduler_lock:
+        if upload_scheduler is None:
+            upload_scheduler = UploadScheduler(get_youtube_uploader())
+    return upload_scheduler
+
 def format_video_search_results(videos: List[dict]) -> str:
     """Format video search results into a readable string."""
     if not videos:
@@ -84,24 +106,20 @@ View Count: {statistics.get("viewCount", "0")}
 Keywords: {branding.get("channel", {}).get("keywords", "None")}
 """
 
-def format_comments(comments: List[dict]) -> str:
-    """Format comments into a readable string."""
+def format_comments(comments: List[CommentRow]) -> str:
+    """Format comment rows into a readable string (replies indented under their comment)."""
     if not comments:
         return "No comments found."
     
     formatted_comments = []
-    for comment_thread in comments:
-        top_comment = comment_thread.get("snippet", {}).get("topLevelComment", {}).get("snippet", {})
-        author = top_comment.get("authorDisplayName", "Unknown author")
-        text = top_comment.get("textDisplay", "No text")
-        published = top_comment.get("publishedAt", "Unknown date")
-        likes = top_comment.get("likeCount", 0)
-        
+    for comment in comments:
+        indent = "    " if comment.parent >= 0 else ""
+        replies = f"\n{indent}Replies: {comment.reply_count}" if comment.parent < 0 else ""
         formatted_comments.append(f"""
-Author: {author}
-Published: {published}
-Likes: {likes}
-Comment: {text}
+{indent}Author: {comment.author or "Unknown author"}
+{indent}Published: {comment.published_at or "Unknown date"}
+{indent}Likes: {comment.like_count}{replies}
+{indent}Comment: {comment.text or "No text"}
 """)
     
     return "\n---\n".join(formatted_comments)
@@ -127,15 +145,27 @@ async def upload_video(
     """
     try:
         uploader = get_youtube_uploader()
+        limiter = get_upload_scheduler().limiter
         tags_list = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
-        
-        response = uploader.upload_video(
+        cancelled = threading.Event()
+
+        def stop_if_cancelled(sent: int, total: int) -> None:
+            # The session is kept, so retrying the same upload later resumes it
+            if cancelled.is_set():
+                raise UploadCancelled(f"Upload cancelled after {sent} of {total} bytes")
+
+        response = await executor.run(
+            "upload",
+            uploader.upload_video,
             file_path=file_path,
             title=title,
             description=description,
             tags=tags_list,
             category_id=category_id,
-            privacy_status=privacy_status
+            privacy_status=privacy_status,
+            progress_callback=stop_if_cancelled,
+            before_chunk=lambda size: limiter.consume(size, cancel_event=cancelled),
+            cancel_event=cancelled,
         )
         
         video_id = response.get("id", "Unknown")
@@ -149,6 +179,65 @@ YouTube URL: https://www.youtube.com/watch?v={video_id}
     except Exception as e:
         return f"Upload failed: {str(e)}"
 
+@mcp.tool()
+async def queue_video_upload(
+    file_path: str,
+    title: str,
+    description: str = "",
+    tags: str = "",
+    category_id: str = "22",
+    privacy_status: str = "private",
+    priority: int = 0
+) -> str:
+    """Queue a video for background upload; several queued uploads run in parallel under one bandwidth cap.
+
+    Args:
+        file_path: Path to the video file
+        title: Video title
+        description: Video description
+        tags: Comma-separated list of tags
+        category_id: YouTube category ID (default: 22 for People & Blogs)
+        privacy_status: Privacy status (public, private, unlisted)
+        priority: Higher values start first and get bandwidth first (default: 0)
+    """
+    try:
+        tags_list = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
+        job = get_upload_scheduler().submit(file_path, title, priority=priority, description=description,
+                                            tags=tags_list, category_id=category_id,
+                                            privacy_status=privacy_status)
+        return f"Queued upload {job.id}: {title} ({job.size} bytes, priority {priority})"
+    except Exception as e:
+        return f"Failed to queue upload: {str(e)}"
+
+@mcp.tool()
+async def get_upload_queue_status() -> str:
+    """Show queued and running uploads with their progress, aggregate throughput and ETA."""
+    return json.dumps(get_upload_scheduler().stats(), indent=2)
+
+@mcp.tool()
+async def cancel_queued_upload(job_id: int) -> str:
+    """Cancel a queued upload, or stop a running one at its next chunk (it can be resumed later).
+
+    Args:
+        job_id: ID returned by queue_video_upload
+    """
+    if get_upload_scheduler().cancel(job_id):
+        return f"Cancelled upload {job_id}"
+    return f"Upload {job_id} is not queued or running"
+
+@mcp.tool()
+async def set_upload_rate_limit(bytes_per_second: float = 0) -> str:
+    """Cap the total upload bandwidth of all YouTube uploads, leaving room for other traffic.
+
+    Args:
+        bytes_per_second: New cap; 0 removes it
+    """
+    try:
+        get_upload_scheduler().set_rate_limit(bytes_per_second)
+    except ValueError as e:
+        return f"Failed to set upload rate limit: {str(e)}"
+    return f"Upload rate limit: {f'{bytes_per_second:.0f} bytes/s' if bytes_per_second else 'unlimited'}"
+
 @mcp.tool()
 async def search_videos(query: str, max_results: int = 10) -> str:
     """Search for YouTube videos.
@@ -159,22 +248,34 @@ async def search_videos(query: str, max_results: int = 10) -> str:
     """
     try:
         uploader = get_youtube_uploader()
-        videos = uploader.search_videos(query, max_results)
+        videos = await executor.run("read", uploader.search_videos, query, max_results,
+                                     fields=SEARCH_RESULT_FIELDS)
         return format_video_search_results(videos)
     except Exception as e:
         return f"Search failed: {str(e)}"
 
 @mcp.tool()
-async def get_video_details(video_id: str) -> str:
-    """Get detailed information about a specific YouTube video.
+async def get_video_details(video_id: str = "", video_ids: Optional[List[str]] = None) -> str:
+    """Get detailed information about one or more YouTube videos.
 
     Args:
-        video_id: YouTube video ID
+        video_id: YouTube video ID (or several, comma-separated)
+        video_ids: List of YouTube video IDs; fetched 50 per API call
     """
     try:
         uploader = get_youtube_uploader()
-        video = uploader.get_video_details(video_id)
-        return format_video_details(video)
+        ids = [v.strip() for v in video_id.split(",") if v.strip()] + list(video_ids or [])
+        if not ids:
+            return "Failed to get video details: provide video_id or video_ids"
+        if len(ids) == 1:
+            return format_video_details(await executor.run("read", uploader.get_video_details, ids[0],
+                                                                  fields=VIDEO_DETAIL_FIELDS))
+        videos = await executor.run("read", uploader.get_videos_details, ids, fields=VIDEO_DETAIL_FIELDS)
+        return "\n---\n".join(
+            f"\nVideo ID: {video['id']}\nNot found or unavailable.\n" if video.get("notFound")
+            else format_video_details(video)
+            for video in videos
+        )
     except Exception as e:
         return f"Failed to get video details: {str(e)}"
 
@@ -193,26 +294,38 @@ async def get_channel_info(
     """
     try:
         uploader = get_youtube_uploader()
-        channel = uploader.get_channel_info(
+        channel = await executor.run(
+            "read",
+            uploader.get_channel_info,
             channel_id=channel_id,
             for_username=username,
-            mine=mine
+            mine=mine,
+            fields=CHANNEL_INFO_FIELDS
         )
         return format_channel_info(channel)
     except Exception as e:
         return f"Failed to get channel info: {str(e)}"
 
 @mcp.tool()
-async def list_video_comments(video_id: str, max_results: int = 20) -> str:
+async def list_video_comments(video_id: str, max_results: int = 20, include_replies: bool = False) -> str:
     """Get comments for a YouTube video.
 
     Args:
         video_id: YouTube video ID
-        max_results: Maximum number of comments to return (default: 20)
+        max_results: Maximum number of comments to return (default: 20); follows pagination
+        include_replies: Also return every reply, indented under its comment
     """
     try:
         uploader = get_youtube_uploader()
-        comments = uploader.list_comments(video_id, max_results)
+
+        def read_comments() -> list:
+            # iter_comments touches uploader.youtube, which may build the service (OAuth, discovery)
+            rows = uploader.iter_comments(video_id, expand_replies=include_replies)
+            if not include_replies:
+                rows = (row for row in rows if row.parent == -1)
+            return list(itertools.islice(rows, max_results))
+
+        comments = await executor.run("read", read_comments)
         return format_comments(comments)
     except Exception as e:
         return f"Failed to get comments: {str(e)}"
@@ -226,7 +339,7 @@ async def delete_video(video_id: str) -> str:
     """
     try:
         uploader = get_youtube_uploader()
-        uploader.delete_video(video_id)
+        await executor.run("write", uploader.delete_video, video_id)
         return f"Successfully deleted video: {video_id}"
     except Exception as e:
         return f"Failed to delete video: {str(e)}"
@@ -239,7 +352,8 @@ async def get_analytics_report(
     dimensions: str = "day",
     ids: str = "channel==MINE",
     filters: Optional[str] = None,
-    max_results: int = 100
+    max_results: int = 100,
+    use_cache: bool = True
 ) -> str:
     """Get YouTube Analytics report.
 
@@ -251,17 +365,21 @@ async def get_analytics_report(
         ids: Channel or content owner ID (default: "channel==MINE")
         filters: Optional filters for the report
         max_results: Maximum number of results (default: 100)
+        use_cache: Reuse stored days of "day" reports and only query new or recent days (default: True)
     """
     try:
         uploader = get_youtube_uploader()
-        report = uploader.get_analytics_report(
+        report = await executor.run(
+            "read",
+            uploader.get_analytics_report,
             metrics=metrics,
             start_date=start_date,
             end_date=end_date,
             dimensions=dimensions,
             ids=ids,
             filters=filters,
-            max_results=max_results
+            max_results=max_results,
+            use_cache=use_cache
         )
         
         # Format the analytics report
@@ -273,6 +391,10 @@ async def get_analytics_report(
         
         # Create a formatted table
         formatted_report = "Analytics Report:\n\n"
+        cache = report.get("cache")
+        if cache:
+            formatted_report += (f"({cache['stored_days']} days from local store, "
+                                 f"{cache['fetched_days']} fetched in {cache['requests']} requests)\n\n")
         
         # Add headers
         header_names = [header.get("name", "") for header in headers]
@@ -288,6 +410,22 @@ async def get_analytics_report(
     except Exception as e:
         return f"Failed to get analytics report: {str(e)}"
 
+@mcp.tool()
+async def get_quota_status() -> str:
+    """Show today's YouTube Data API quota: units used and remaining, what each priority may still spend, and when it resets."""
+    try:
+        uploader = get_youtube_uploader()
+        return json.dumps(await executor.run("read", uploader.get_quota_status), indent=2)
+    except Exception as e:
+        return f"Failed to get quota status: {str(e)}"
+
+@mcp.tool()
+async def get_tool_executor_stats() -> str:
+    """Show queue depth, running calls and wait times of the YouTube tool thread pool."""
+    return json.dumps(executor.stats(), indent=2)
+
 if __name__ == "__main__":
+    # Warm the Google client stack in the background while the server starts
+    preload()
     # Initialize and run the server
     mcp.run(transport='stdio') 
\ No newline at end of file
@@ -0,0 +1,356 @@
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List
+
+QUOTA_DB = os.getenv('YOUTUBE_QUOTA_DB',
+                     os.path.join(os.path.dirname(__file__), '.youtube_quota.sqlite3'))
+DAILY_QUOTA = int(os.getenv('YOUTUBE_DAILY_QUOTA', '10000'))
+
+# Units charged per Data API method (methodId as used by googleapiclient).
+# Unlisted youtube.* methods cost 1 for list calls and 50 for writes.
+QUOTA_COSTS: Dict[str, int] = {
+    'youtube.search.list': 100,
+    'youtube.videos.insert': 1600,
+    'youtube.videos.update': 50,
+    'youtube.videos.delete': 50,
+    'youtube.videos.rate': 50,
+    'youtube.thumbnails.set': 50,
+    'youtube.captions.insert': 400,
+    'youtube.captions.update': 450,
+    'youtube.commentThreads.insert': 50,
+    'youtube.comments.insert': 50,
+}
+DEFAULT_LIST_COST = 1
+DEFAULT_WRITE_COST = 50
+
+# Lower rank is served first. Searches are the expensive calls nobody is
+# waiting on, so they go last and are the first to be turned away.
+PRIORITIES: Dict[str, int] = {'high': 0, 'normal': 1, 'low': 2}
+METHOD_PRIORITIES: Dict[str, str] = {
+    'youtube.videos.insert': 'high',
+    'youtube.videos.update': 'high',
+    'youtube.videos.delete': 'high',
+    'youtube.search.list': 'low',
+}
+# Share of the daily quota a call of each priority must leave untouched
+DEFAULT_RESERVES: Dict[str, float] = {'high': 0.0, 'normal': 0.02, 'low': 0.2}
+
+_EXHAUSTED = '(quotaExceeded)'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    project TEXT NOT NULL,
+    day     TEXT NOT NULL,
+    method  TEXT NOT NULL,
+    calls   INTEGER NOT NULL DEFAULT 0,
+    units   INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (project, day, method)
+) WITHOUT ROWID;
+"""
+
+
+def _pacific() -> timezone:
+    # The quota day runs midnight to midnight Pacific time
+    try:
+        from zoneinfo import ZoneInfo
+        return ZoneInfo('America/Los_Angeles')
+    except Exception:
+        return timezone(timedelta(hours=-8))
+
+
+QUOTA_TIMEZONE = _pacific()
+
+
+def quota_cost(method: str) -> int:
+    """Units a Data API call costs (0 for calls against other APIs, e.g. Analytics)"""
+    if method in QUOTA_COSTS:
+        return QUOTA_COSTS[method]
+    if not method.startswith('youtube.'):
+        return 0
+    return DEFAULT_LIST_COST if method.endswith('.list') else DEFAULT_WRITE_COST
+
+
+def is_quota_exceeded(error: Exception) -> bool:
+    """True for the 403 the API returns once the project's daily quota is gone"""
+    status = getattr(getattr(error, 'resp', None), 'status', None)
+    content = getattr(error, 'content', b'') or b''
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', 'replace')
+    return status == 403 and ('quotaExceeded' in content or 'dailyLimitExceeded' in content)
+
+
+def charge_on_send(request, scheduler: 'QuotaScheduler', method: str, timeout: float = 0.0):
+    """
+    Admit ``request`` through ``scheduler`` when it is first sent, not when it
+    is built. Resumable uploads are charged on the first ``next_chunk`` of a new
+    session; continuing a persisted session (``resumable_uri`` already set)
+    costs nothing, as the upload was charged when that session was created.
+    """
+    charged = False
+
+    def admit() -> None:
+        nonlocal charged
+        if not charged:
+            scheduler.acquire(method, timeout=timeout)
+            charged = True
+
+    execute = request.execute
+
+    def charged_execute(*args, **kwargs):
+        admit()
+        return execute(*args, **kwargs)
+
+    request.execute = charged_execute
+    if request.resumable is not None:
+        next_chunk = request.next_chunk
+
+        def charged_next_chunk(*args, **kwargs):
+            nonlocal charged
+            if request.resumable_uri is None:
+                admit()
+            charged = True
+            return next_chunk(*args, **kwargs)
+
+        request.next_chunk = charged_next_chunk
+    return request
+
+
+def track_exhaustion(request, ledger: 'QuotaLedger'):
+    """
+    Make ``request.execute`` (and ``next_chunk``, which resumable uploads call
+    directly) book the rest of today's budget when the API reports quotaExceeded
+    """
+    def tracked(call):
+        def tracked_call(*args, **kwargs):
+            try:
+                return call(*args, **kwargs)
+            except Exception as e:
+                if is_quota_exceeded(e):
+                    ledger.mark_exhausted()
+                raise
+        return tracked_call
+
+    request.execute = tracked(request.execute)
+    if request.resumable is not None:
+        request.next_chunk = tracked(request.next_chunk)
+    return request
+
+
+class QuotaExceededError(RuntimeError):
+    """A call was turned away because it would eat into the budget kept for higher priorities"""
+
+    def __init__(self, method: str, cost: int, priority: str, remaining: int, resets_at: str):
+        super().__init__(f"{method} needs {cost} quota units ({priority} priority) but only {remaining} "
+                         f"are available to it; the daily quota resets at {resets_at}")
+        self.method = method
+        self.cost = cost
+        self.priority = priority
+        self.remaining = remaining
+        self.resets_at = resets_at
+
+
+class QuotaLedger:
+    """
+    Per-project record of quota units spent today, in SQLite so that every
+    process using the same project shares one count. Charges are checked and
+    written in a single transaction.
+    """
+
+    def __init__(self, project: str = 'default', daily_quota: int = DAILY_QUOTA,
+                 path: Optional[str] = None, timeout: float = 30.0):
+        self.project = project
+        self.daily_quota = daily_quota
+        self.path = path or QUOTA_DB
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def today() -> str:
+        return datetime.now(QUOTA_TIMEZONE).date().isoformat()
+
+    @staticmethod
+    def resets_at() -> datetime:
+        now = datetime.now(QUOTA_TIMEZONE)
+        return datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=QUOTA_TIMEZONE)
+
+    def seconds_until_reset(self) -> float:
+        return max(0.0, (self.resets_at() - datetime.now(QUOTA_TIMEZONE)).total_seconds())
+
+    def _used(self, conn: sqlite3.Connection, day: str) -> int:
+        return conn.execute('SELECT COALESCE(SUM(units), 0) FROM usage WHERE project = ? AND day = ?',
+                            (self.project, day)).fetchone()[0]
+
+    def used(self) -> int:
+        return self._used(self._connect(), self.today())
+
+    def remaining(self) -> int:
+        return max(0, self.daily_quota - self.used())
+
+    def _add(self, conn: sqlite3.Connection, day: str, method: str, units: int, calls: int = 1) -> None:
+        conn.execute('INSERT INTO usage (project, day, method, calls, units) VALUES (?, ?, ?, ?, ?) '
+                     'ON CONFLICT (project, day, method) DO UPDATE SET calls = calls + excluded.calls, '
+                     'units = units + excluded.units', (self.project, day, method, calls, units))
+
+    def try_charge(self, method: str, units: int, floor: float = 0) -> bool:
+        """Record a call if today's remaining budget stays at or above ``floor`` after it"""
+        conn = self._connect()
+        day = self.today()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if self.daily_quota - self._used(conn, day) - units < floor:
+                conn.execute('ROLLBACK')
+                return False
+            self._add(conn, day, method, units)
+            conn.execute('COMMIT')
+            return True
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def charge(self, method: str, units: Optional[int] = None) -> None:
+        """Record a call unconditionally (e.g. one made outside the scheduler)"""
+        self._add(self._connect(), self.today(), method, quota_cost(method) if units is None else units)
+
+    def mark_exhausted(self) -> None:
+        """The API says the quota is gone: book whatever we thought was left"""
+        conn = self._connect()
+        day = self.today()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            left = self.daily_quota - self._used(conn, day)
+            if left > 0:
+                self._add(conn, day, _EXHAUSTED, left)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def breakdown(self, day: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """Calls and units per method for ``day`` (default today)"""
+        rows = self._connect().execute('SELECT method, calls, units FROM usage WHERE project = ? AND day = ? '
+                                       'ORDER BY units DESC', (self.project, day or self.today()))
+        return {method: {'calls': calls, 'units': units} for method, calls, units in rows}
+
+    def close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class _Waiter:
+    __slots__ = ('key', 'method', 'cost', 'priority', 'floor', 'granted')
+
+    def __init__(self, key, method: str, cost: int, priority: str, floor: float):
+        self.key = key
+        self.method = method
+        self.cost = cost
+        self.priority = priority
+        self.floor = floor
+        self.granted = False
+
+
+class QuotaScheduler:
+    """
+    Admits Data API calls against the daily budget in a QuotaLedger.
+
+    Each call has a priority (from METHOD_PRIORITIES unless given) and may only
+    spend down to that priority's reserve, so searches stop well before the
+    budget an upload needs is gone. Calls that don't fit either fail at once
+    with QuotaExceededError or, given a ``timeout``, queue; queued calls are
+    admitted in (priority, cost) order as budget becomes available, i.e. after
+    the daily reset.
+    """
+
+    def __init__(self, ledger: Optional[QuotaLedger] = None, reserves: Optional[Dict[str, float]] = None,
+                 method_priorities: Optional[Dict[str, str]] = None):
+        self.ledger = ledger if ledger is not None else QuotaLedger()
+        self.reserves = {**DEFAULT_RESERVES, **(reserves or {})}
+        self.method_priorities = {**METHOD_PRIORITIES, **(method_priorities or {})}
+        self.rejected = 0
+        self._waiting: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def priority_of(self, method: str) -> str:
+        return self.method_priorities.get(method, 'normal')
+
+    def available(self, priority: str = 'normal') -> int:
+        """Units a call of ``priority`` may still spend today"""
+        return max(0, int(self.ledger.remaining() - self.reserves[priority] * self.ledger.daily_quota))
+
+    def _dispatch(self) -> None:
+        # Caller holds the condition. Best-ranked calls get the budget first.
+        granted = False
+        for waiter in sorted(self._waiting, key=lambda w: w.key):
+            if not waiter.granted and self.ledger.try_charge(waiter.method, waiter.cost, waiter.floor):
+                waiter.granted = granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def acquire(self, method: str, priority: Optional[str] = None, timeout: float = 0.0) -> int:
+        """
+        Charge ``method`` to the ledger, waiting up to ``timeout`` seconds for
+        budget. Returns the units charged; raises QuotaExceededError if the
+        call could not be admitted in time.
+        """
+        cost = quota_cost(method)
+        if cost == 0:
+            return 0
+        priority = priority or self.priority_of(method)
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        waiter = _Waiter((PRIORITIES[priority], cost, next(self._seq)), method, cost, priority,
+                         self.reserves[priority] * self.ledger.daily_quota)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._waiting.append(waiter)
+            try:
+                while True:
+                    self._dispatch()
+                    if waiter.granted:
+                        return cost
+                    left = deadline - time.monotonic()
+                    if left <= 0:
+                        self.rejected += 1
+                        raise QuotaExceededError(method, cost, priority, self.available(priority),
+                                                 self.ledger.resets_at().isoformat())
+                    # Budget only comes back at the reset (or from another process's ledger changes)
+                    self._cond.wait(min(left, self.ledger.seconds_until_reset() + 1, 60.0))
+            finally:
+                self._waiting.remove(waiter)
+
+    def status(self) -> Dict[str, Any]:
+        """Today's budget, spend per method and what each priority may still use"""
+        used = self.ledger.used()
+        with self._cond:
+            waiting = len(self._waiting)
+        return {
+            'project': self.ledger.project,
+            'day': self.ledger.today(),
+            'daily_quota': self.ledger.daily_quota,
+            'used': used,
+            'remaining': max(0, self.ledger.daily_quota - used),
+            'available': {priority: self.available(priority) for priority in PRIORITIES},
+            'resets_at': self.ledger.resets_at().isoformat(),
+            'waiting': waiting,
+            'rejected': self.rejected,
+            'by_method': self.ledger.breakdown(),
+        }
@@ -0,0 +1,186 @@
+import hashlib
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+# Resumable chunks must be a multiple of 256 KiB. Bigger chunks mean fewer round
+# trips; smaller ones mean less data re-sent after a failure.
+CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_CHUNK_SIZE = 32 * CHUNK_ALIGNMENT  # 8 MiB
+
+SESSION_DIR = os.getenv('YOUTUBE_UPLOAD_SESSION_DIR',
+                        os.path.join(os.path.dirname(__file__), '.youtube_upload_sessions'))
+# Google keeps resumable sessions for about a week; stop trusting them a little earlier
+SESSION_TTL_SECS = 6 * 24 * 3600
+
+RETRIABLE_STATUS = {500, 502, 503, 504}
+# httplib2.HttpLib2Error is added at call time (the Google client stack is imported lazily)
+RETRIABLE_EXCEPTIONS = (http.client.HTTPException, OSError)
+# The session URI itself is gone (expired or already consumed): start a new one
+EXPIRED_SESSION_STATUS = {404, 410}
+MAX_RETRIES = 10
+BACKOFF_BASE_SECS = 1.0
+BACKOFF_CAP_SECS = 64.0
+
+ProgressCallback = Callable[[int, int], None]
+# Called with the size of the chunk about to be sent; may block (bandwidth shaping) or raise UploadCancelled
+ChunkCallback = Callable[[int], None]
+
+
+class UploadCancelled(Exception):
+    """Raised from a progress callback to stop an upload; its session stays resumable"""
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SECS, cap: float = BACKOFF_CAP_SECS) -> float:
+    """Exponential backoff with jitter for retry ``attempt`` (1-based), capped at ``cap``"""
+    return min(cap, base * (2 ** (attempt - 1))) * random.uniform(0.5, 1.0)
+
+
+def align_chunk_size(chunk_size: int) -> int:
+    """Round a requested chunk size up to the 256 KiB multiple the API requires"""
+    if chunk_size <= 0:
+        return DEFAULT_CHUNK_SIZE
+    return -(-chunk_size // CHUNK_ALIGNMENT) * CHUNK_ALIGNMENT
+
+
+def upload_fingerprint(file_path: str, body: dict) -> str:
+    """Identity of an upload: the file (path, size, mtime) plus the metadata sent with it"""
+    stat = os.stat(file_path)
+    key = json.dumps([os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, body], sort_keys=True)
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+class UploadSessionStore:
+    """
+    Resumable-session URIs on disk, one JSON file per upload fingerprint.
+
+    Written atomically as soon as the session is opened, so a new process can
+    pick up an interrupted upload where the server says it stopped.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or SESSION_DIR
+        self._lock = threading.Lock()
+
+    def _path(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"{fingerprint}.json")
+
+    def load(self, fingerprint: str) -> Optional[str]:
+        """Saved session URI for an upload, or None"""
+        try:
+            with open(self._path(fingerprint)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('created_at', 0) + SESSION_TTL_SECS <= time.time():
+            self.discard(fingerprint)
+            return None
+        return entry.get('resumable_uri')
+
+    def save(self, fingerprint: str, resumable_uri: str, file_path: str) -> None:
+        entry = {'resumable_uri': resumable_uri, 'file_path': file_path, 'created_at': time.time()}
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(fingerprint)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+
+    def discard(self, fingerprint: str) -> None:
+        try:
+            os.remove(self._path(fingerprint))
+        except OSError:
+            pass
+
+
+def resumable_insert(youtube, file_path: str, body: dict, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     progress_callback: Optional[ProgressCallback] = None,
+                     sessions: Optional[UploadSessionStore] = None,
+                     max_retries: int = MAX_RETRIES,
+                     before_chunk: Optional[ChunkCallback] = None) -> dict:
+    """
+    videos.insert in fixed-size chunks, resuming from the server's offset.
+
+    A transient failure (5xx or dropped connection) retries only the current
+    chunk after an exponential backoff; the retry budget resets whenever a chunk
+    lands. With a session store, the session URI is persisted so an upload cut
+    off by a restart continues from the last byte the server acknowledged.
+
+    Args:
+        youtube: Authorized YouTube Data API service
+        file_path: Video file
+        body: videos.insert resource (snippet, status, ...)
+        chunk_size: Bytes per request, rounded up to a multiple of 256 KiB
+        progress_callback: Called with (bytes_uploaded, total_bytes) after every chunk
+        sessions: Where to persist the resumable session; None disables resuming
+        max_retries: Consecutive failed attempts before giving up
+        before_chunk: Called with the byte count of every chunk (or retry) before it is sent
+    """
+    import httplib2
+    from googleapiclient.errors import HttpError
+    from googleapiclient.http import MediaFileUpload
+
+    retriable_exceptions = RETRIABLE_EXCEPTIONS + (httplib2.HttpLib2Error,)
+    fingerprint = upload_fingerprint(file_path, body) if sessions is not None else None
+    total = os.path.getsize(file_path)
+    aligned_chunk_size = align_chunk_size(chunk_size)
+
+    def new_request():
+        media_body = MediaFileUpload(file_path, chunksize=aligned_chunk_size, resumable=True)
+        return youtube.videos().insert(part=",".join(body.keys()), body=body, media_body=media_body)
+
+    request = new_request()
+    saved_uri = sessions.load(fingerprint) if sessions is not None else None
+    if saved_uri:
+        request.resumable_uri = saved_uri
+        # Makes the next call ask the server for its offset ("bytes */size") before sending
+        request._in_error_state = True
+
+    def remember_session() -> None:
+        nonlocal saved_uri
+        if sessions is not None and request.resumable_uri and request.resumable_uri != saved_uri:
+            saved_uri = request.resumable_uri
+            sessions.save(fingerprint, saved_uri, file_path)
+
+    attempt = 0
+    response = None
+    while response is None:
+        try:
+            if before_chunk is not None:
+                before_chunk(min(aligned_chunk_size, total - request.resumable_progress))
+            status, response = request.next_chunk()
+            attempt = 0
+            remember_session()
+            if progress_callback is not None:
+                progress_callback(total if response is not None else status.resumable_progress, total)
+            continue
+        except HttpError as err:
+            if saved_uri and err.resp.status in EXPIRED_SESSION_STATUS:
+                # The stored session no longer exists: start over with a fresh one
+                sessions.discard(fingerprint)
+                saved_uri = None
+                request = new_request()
+                continue
+            if err.resp.status not in RETRIABLE_STATUS:
+                raise
+            error: Exception = err
+        except retriable_exceptions as err:
+            error = err
+            # next_chunk only flags transport errors raised while sending a chunk
+            if request.resumable_uri:
+                request._in_error_state = True
+
+        remember_session()
+        attempt += 1
+        if attempt > max_retries:
+            raise error
+        time.sleep(backoff_delay(attempt))
+
+    if sessions is not None:
+        sessions.discard(fingerprint)
+    return response
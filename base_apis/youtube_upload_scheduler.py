@@ -0,0 +1,334 @@
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, List, Callable
+
+from youtube_upload import CHUNK_ALIGNMENT, DEFAULT_CHUNK_SIZE, UploadCancelled
+
+DEFAULT_PARALLEL_UPLOADS = 3
+# Global upload cap in bytes per second (unset: unlimited)
+UPLOAD_RATE_LIMIT = float(os.getenv('YOUTUBE_UPLOAD_RATE_LIMIT', '0')) or None
+# With a rate limit, smaller chunks keep the line from bursting a whole 8 MiB at once
+SHAPED_CHUNK_SIZE = 4 * CHUNK_ALIGNMENT  # 1 MiB
+THROUGHPUT_WINDOW_SECS = 30.0
+PROGRESS_INTERVAL_SECS = 5.0
+
+
+def _check_rate(value: Optional[float]) -> Optional[float]:
+    """Validated bytes-per-second cap; None or 0 means unlimited"""
+    if value is not None and value < 0:
+        raise ValueError(f"Upload rate limit must be positive, or 0 for unlimited (got {value})")
+    return value or None
+
+
+class ByteRateLimiter:
+    """
+    Token bucket in bytes per second shared by concurrent uploads.
+
+    Callers waiting for budget are served highest priority first (FIFO within
+    a priority), so the uploads that matter most get the bandwidth and finish
+    first. A chunk larger than the bucket is let through and paid back before
+    anyone else may send. ``rate`` can be changed while uploads run.
+    """
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        self._rate = _check_rate(rate)
+        self.burst = burst
+        self._tokens = self._capacity()
+        self._updated = time.monotonic()
+        self._waiting: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def _capacity(self) -> float:
+        return self.burst or self._rate or 0.0
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    @rate.setter
+    def rate(self, value: Optional[float]) -> None:
+        value = _check_rate(value)
+        with self._cond:
+            self._refill()
+            self._rate = value
+            self._tokens = min(self._tokens, self._capacity())
+            self._cond.notify_all()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._rate:
+            self._tokens = min(self._capacity(), self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def consume(self, size: int, priority: int = 0, cancel_event: Optional[threading.Event] = None) -> None:
+        """Block until ``size`` bytes may be sent; raises UploadCancelled if ``cancel_event`` gets set"""
+        if not self._rate:
+            return
+        entry = (-priority, next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    if cancel_event is not None and cancel_event.is_set():
+                        raise UploadCancelled("Upload cancelled while waiting for bandwidth")
+                    if not self._rate:
+                        return
+                    self._refill()
+                    if self._waiting[0] == entry and self._tokens >= 0:
+                        self._tokens -= size
+                        return
+                    deficit = -self._tokens if self._tokens < 0 else 0.0
+                    self._cond.wait(min(max(deficit / self._rate, 0.01), 0.5))
+            finally:
+                self._waiting.remove(entry)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+
+
+class UploadJob:
+    """One queued video upload and its progress"""
+
+    def __init__(self, job_id: int, file_path: str, title: str, priority: int, upload_kwargs: Dict[str, Any]):
+        self.id = job_id
+        self.file_path = file_path
+        self.title = title
+        self.priority = priority
+        self.upload_kwargs = upload_kwargs
+        self.size = os.path.getsize(file_path)
+        self.sent = 0
+        # Size of the chunk being sent, and whether progress was reported yet (see _record)
+        self.chunk_bytes = 0
+        self.reported = False
+        self.state = 'queued'
+        self.error: Optional[str] = None
+        self.submitted = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        # Resolves to the videos.insert response
+        self.future: Future = Future()
+        self.cancel_event = threading.Event()
+
+    def summary(self) -> Dict[str, Any]:
+        summary = {'id': self.id, 'file': os.path.basename(self.file_path), 'title': self.title,
+                   'priority': self.priority, 'state': self.state, 'size': self.size, 'sent': self.sent,
+                   'progress': round(self.sent / self.size, 3) if self.size else 1.0}
+        if self.future.done() and not self.future.cancelled() and self.future.exception() is None:
+            summary['video_id'] = self.future.result().get('id')
+        if self.error:
+            summary['error'] = self.error
+        return summary
+
+
+def print_upload_progress(stats: Dict[str, Any]) -> None:
+    """Progress reporter for scripts; writes to stderr, as stdout carries the MCP stdio protocol"""
+    eta = f"{stats['eta_secs']:.0f}s" if stats['eta_secs'] is not None else '?'
+    print(f"[uploads] running={stats['running']} queued={stats['queued']} done={stats['done']} "
+          f"failed={stats['failed']}  {stats['bytes_sent'] / 2**20:.1f}/{stats['bytes_total'] / 2**20:.1f} MiB  "
+          f"{stats['throughput_bps'] / 2**20:.2f} MiB/s  eta={eta}", file=sys.stderr)
+
+
+class UploadScheduler:
+    """
+    Runs many resumable YouTube uploads in parallel under one bandwidth cap.
+
+    Jobs start in priority order (higher ``priority`` first) on up to
+    ``max_parallel`` workers, and running uploads draw every chunk from a
+    shared ByteRateLimiter that also favours higher priorities, so important
+    videos finish first. Each upload keeps the resumable-session handling of
+    ``upload_video`` (retries, resume after restart). Aggregate throughput and
+    ETA are available from ``stats`` and optionally reported as uploads run.
+    """
+
+    def __init__(self, uploader, max_parallel: int = DEFAULT_PARALLEL_UPLOADS,
+                 rate_limit: Optional[float] = UPLOAD_RATE_LIMIT, chunk_size: Optional[int] = None,
+                 progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+                 progress_interval: float = PROGRESS_INTERVAL_SECS):
+        """
+        Args:
+            uploader: YouTubeUploader the uploads go through
+            max_parallel: Uploads in flight at once
+            rate_limit: Total upload bytes per second across all jobs (None: unlimited)
+            chunk_size: Bytes per request (default: 1 MiB when rate-limited, else 8 MiB)
+            progress: Called with ``stats()`` every progress_interval seconds while uploading
+            progress_interval: Seconds between progress reports
+        """
+        self.uploader = uploader
+        self.max_parallel = max(1, max_parallel)
+        self.limiter = ByteRateLimiter(rate_limit)
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._jobs: Dict[int, UploadJob] = {}
+        self._queue: List[tuple] = []
+        self._ids = itertools.count(1)
+        self._samples: deque = deque()
+        self._last_report = 0.0
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def set_rate_limit(self, bytes_per_sec: Optional[float]) -> None:
+        """Change the global cap while uploads run (None or 0: unlimited)"""
+        self.limiter.rate = bytes_per_sec
+
+    def submit(self, file_path: str, title: str, priority: int = 0, **upload_kwargs) -> UploadJob:
+        """Queue an upload; ``upload_kwargs`` go to ``upload_video`` (description, tags, privacy_status, ...)"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Video file not found: {file_path}")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Upload scheduler is shut down")
+            job = UploadJob(next(self._ids), file_path, title, priority, upload_kwargs)
+            self._jobs[job.id] = job
+            heapq.heappush(self._queue, (-priority, job.id))
+            if len(self._workers) < self.max_parallel:
+                worker = threading.Thread(target=self._work, name=f'youtube-upload-{len(self._workers) + 1}',
+                                          daemon=True)
+                self._workers.append(worker)
+                worker.start()
+            self._cond.notify()
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a queued job, or stop a running one at its next chunk (its session stays resumable)"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or job.state not in ('queued', 'running'):
+                return False
+            job.cancel_event.set()
+            if job.state == 'queued':
+                job.state = 'cancelled'
+                job.future.cancel()
+            self._cond.notify_all()
+        return True
+
+    def _next_job(self) -> Optional[UploadJob]:
+        with self._cond:
+            while True:
+                while self._queue:
+                    _, job_id = heapq.heappop(self._queue)
+                    job = self._jobs[job_id]
+                    if job.state == 'queued':
+                        job.state = 'running'
+                        job.started = time.time()
+                        return job
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+    def _work(self) -> None:
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            self._run(job)
+
+    def _record(self, job: UploadJob, sent: int) -> None:
+        now = time.monotonic()
+        report = None
+        with self._cond:
+            delta = sent - job.sent
+            if not job.reported:
+                # A resumed upload's first report includes the bytes an earlier run sent;
+                # only the chunk just sent counts towards throughput
+                delta = min(delta, job.chunk_bytes)
+                job.reported = True
+            self._samples.append((now, delta))
+            job.sent = sent
+            while self._samples and now - self._samples[0][0] > THROUGHPUT_WINDOW_SECS:
+                self._samples.popleft()
+            if self.progress and now - self._last_report >= self.progress_interval:
+                self._last_report = now
+                report = True
+        if report:
+            self.progress(self.stats())
+
+    def _run(self, job: UploadJob) -> None:
+        chunk_size = self.chunk_size or (SHAPED_CHUNK_SIZE if self.limiter.rate else DEFAULT_CHUNK_SIZE)
+
+        def before_chunk(size: int) -> None:
+            if job.cancel_event.is_set():
+                raise UploadCancelled(f"Upload of {job.file_path} cancelled")
+            self.limiter.consume(size, job.priority, job.cancel_event)
+            job.chunk_bytes = size
+
+        try:
+            response = self.uploader.upload_video(job.file_path, job.title, chunk_size=chunk_size,
+                                                  progress_callback=lambda sent, total: self._record(job, sent),
+                                                  before_chunk=before_chunk, **job.upload_kwargs)
+        except UploadCancelled as e:
+            self._finish(job, 'cancelled', error=str(e))
+            job.future.cancel()
+        except Exception as e:
+            self._finish(job, 'failed', error=str(e))
+            job.future.set_exception(e)
+        else:
+            self._finish(job, 'done')
+            job.future.set_result(response)
+
+    def _finish(self, job: UploadJob, state: str, error: Optional[str] = None) -> None:
+        with self._cond:
+            job.state = state
+            job.error = error
+            job.finished = time.time()
+            self._cond.notify_all()
+
+    def jobs(self) -> List[UploadJob]:
+        with self._cond:
+            return list(self._jobs.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Counts per state, bytes, aggregate throughput over the last THROUGHPUT_WINDOW_SECS and ETA"""
+        with self._cond:
+            jobs = list(self._jobs.values())
+            now = time.monotonic()
+            window = [(t, n) for t, n in self._samples if now - t <= THROUGHPUT_WINDOW_SECS]
+        counts = {state: sum(1 for job in jobs if job.state == state)
+                  for state in ('queued', 'running', 'done', 'failed', 'cancelled')}
+        active = [job for job in jobs if job.state in ('queued', 'running', 'done')]
+        total = sum(job.size for job in active)
+        sent = sum(job.sent if job.state != 'done' else job.size for job in active)
+        span = (now - window[0][0]) if len(window) > 1 else 0.0
+        throughput = sum(n for _, n in window[1:]) / span if span > 0 else 0.0
+        remaining = total - sent
+        return {
+            **counts,
+            'bytes_total': total,
+            'bytes_sent': sent,
+            'throughput_bps': round(throughput, 1),
+            'eta_secs': round(remaining / throughput, 1) if throughput > 0 else (0.0 if not remaining else None),
+            'rate_limit_bps': self.limiter.rate,
+            'jobs': [job.summary() for job in sorted(jobs, key=lambda j: (-j.priority, j.id))],
+        }
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every submitted job has finished; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while any(job.state in ('queued', 'running') for job in self._jobs.values()):
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._cond.wait(left)
+        return True
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """Stop accepting jobs; optionally cancel the queued ones and wait for the rest"""
+        with self._cond:
+            self._closed = True
+            if cancel_pending:
+                for job in self._jobs.values():
+                    if job.state == 'queued':
+                        job.state = 'cancelled'
+                        job.future.cancel()
+            self._cond.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()